@@ -0,0 +1,112 @@
+"""
+Samples per second of the packed KLM estimator as the clause count grows,
+scanning every clause mask versus the variable -> clause coverage index.
+
+Formulas are drawn like DNFGenerator.cpp (distinct variables, width
+uniform in [2, clause_width], random signs) and each configuration runs a
+fixed number of samples through klm_estimate.
+
+    python bench_coverage.py --num-vars 25 --clause-width 8 --output coverage.png
+"""
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from dnf_format import DNFFile, write_formulas
+from klm_packed import build_coverage_index, klm_estimate, pack_formula
+
+CLAUSE_COUNTS = [20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Coverage counting throughput vs clause count.")
+    parser.add_argument("--num-vars", type=int, default=25)
+    parser.add_argument("--clause-width", type=int, default=8)
+    parser.add_argument("--clauses", type=int, nargs="+", default=CLAUSE_COUNTS)
+    parser.add_argument("--samples", type=int, default=200_000, help="Samples per run.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", type=Path, default=Path("coverage_throughput.csv"))
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Optional path to save the plot; if not given the plot is shown.",
+    )
+    return parser.parse_args()
+
+
+def random_formula(num_vars: int, num_clauses: int, clause_width: int,
+                   rng: np.random.Generator) -> List[List[tuple]]:
+    formula = []
+    for _ in range(num_clauses):
+        width = int(rng.integers(2, clause_width + 1))
+        variables = rng.choice(np.arange(1, num_vars + 1), size=width, replace=False)
+        formula.append([(int(v), int(rng.integers(0, 2))) for v in variables])
+    return formula
+
+
+def plot_throughput(rows: List[dict], output_path: Optional[Path]) -> None:
+    fig, ax = plt.subplots(figsize=(8, 5))
+    clauses = [row["clauses"] for row in rows]
+    ax.loglog(clauses, [row["scan_samples_per_s"] for row in rows], marker="o",
+              label="mask scan (t clauses per sample)")
+    ax.loglog(clauses, [row["index_samples_per_s"] for row in rows], marker="o",
+              label="coverage index (n/k bitset gathers)")
+    ax.set_xlabel("Number of clauses")
+    ax.set_ylabel("Samples per second")
+    ax.set_title("KLM coverage counting throughput")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+
+    if output_path:
+        fig.savefig(output_path, dpi=200)
+        print(f"Saved plot to {output_path.resolve()}")
+    else:
+        plt.show()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.bin"
+        write_formulas(path, (random_formula(args.num_vars, t, args.clause_width, rng)
+                              for t in args.clauses))
+        with DNFFile(path) as dnf:
+            for t, formula in zip(args.clauses, dnf):
+                packed = pack_formula(formula, args.num_vars)
+                start = time.perf_counter()
+                index = build_coverage_index(packed)
+                build_seconds = time.perf_counter() - start
+
+                row = {"clauses": t, "index_group_bits": index.group_bits,
+                       "index_build_seconds": build_seconds}
+                for name, use_index in (("scan", False), ("index", True)):
+                    result = klm_estimate(formula, args.num_vars, samples=args.samples,
+                                          rng=rng, use_index=use_index)
+                    row[f"{name}_samples_per_s"] = args.samples / result.seconds
+                rows.append(row)
+                print(f"t={t:>6}: scan {row['scan_samples_per_s']:>12,.0f}/s  "
+                      f"index {row['index_samples_per_s']:>12,.0f}/s  "
+                      f"({row['index_samples_per_s'] / row['scan_samples_per_s']:.1f}x, "
+                      f"k={index.group_bits}, built in {build_seconds * 1e3:.1f}ms)")
+
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved table to {args.csv}")
+
+    plot_throughput(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
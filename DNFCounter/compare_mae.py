@@ -1,13 +1,32 @@
+import argparse
 import math
 from pathlib import Path
 
+import numpy as np
+
+from result_store import ResultStore, mae_table
+
 
 def load_numbers(path):
     with open(path, "r") as f:
         return [float(line.strip()) for line in f if line.strip()]
 
 
-def main():
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="MAE of estimates against exact counts.")
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Read the columnar result store (result_store.py) instead of two text files.",
+    )
+    parser.add_argument("--estimator", default="monte")
+    parser.add_argument("--eps", type=float, default=0.1)
+    parser.add_argument("--delta", type=float, default=0.1)
+    return parser.parse_args()
+
+
+def compare_files():
     base = Path("Data")
     file_a = base / "samples1000_literals20_clauses-1_var_width1_sol.txt"
     file_b = base / "samples1000_literals20_clauses-1_var_width1_output.txt"
@@ -22,5 +41,26 @@ def main():
     print(f"MAE: {mae}")
 
 
+def compare_store(store: ResultStore, estimator: str, eps: float, delta: float):
+    table = mae_table(store, estimator, eps, delta)
+    if not len(table["formulas"]):
+        raise SystemExit(f"No {estimator} eps={eps:g} delta={delta:g} estimates with exact counts.")
+    for row in zip(*(table[name].tolist() for name in
+                     ("literals", "clauses", "formulas", "mae", "mean_rel_error"))):
+        literals, clauses, formulas, mae, rel = row
+        print(f"literals={literals} clauses={clauses}: {formulas} formulas, "
+              f"MAE {mae:.6g}, mean rel. error {rel:.4%}")
+    total = np.sum(table["mae"] * table["formulas"]) / np.sum(table["formulas"])
+    print(f"MAE: {total}")
+
+
+def main():
+    args = parse_args()
+    if args.store is None:
+        compare_files()
+    else:
+        compare_store(ResultStore(args.store), args.estimator, args.eps, args.delta)
+
+
 if __name__ == "__main__":
     main()
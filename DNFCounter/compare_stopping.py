@@ -0,0 +1,181 @@
+"""
+Samples used and runtime of the fixed-m KLM estimator versus the
+Dagum-Karp-Luby-Ross stopping rule, at the same (eps, delta).
+
+For every instance with ground truth (Output/<file>_sol.txt from solveDNF
+or exact_count.py; --exact computes missing ones), both stopping rules run
+on every formula and the script reports the mean samples per formula, the
+total seconds and the MAE / mean relative error against the exact counts,
+so the saving is read next to the accuracy actually reached. The fixed m
+is a worst case and usually lands far inside eps; --dklr-eps tightens the
+stopping rule to compare at matching MAE.
+
+    python compare_stopping.py --eps 0.1 --delta 0.1 --output stopping.png
+"""
+import argparse
+import csv
+import re
+from pathlib import Path
+from typing import List, Optional
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from dnf_format import DNFFile
+from exact_count import count_models
+from klm_packed import klm_estimate
+
+PAIR_RE = re.compile(r"literals(?P<literals>\d+)_clauses(?P<clauses>-?\d+)")
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare fixed-m and DKLR stopping for the packed KLM estimator."
+    )
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR / "Data")
+    parser.add_argument("--truth-dir", type=Path, default=BASE_DIR / "Output")
+    parser.add_argument("--eps", type=float, default=0.1)
+    parser.add_argument("--delta", type=float, default=0.1)
+    parser.add_argument(
+        "--dklr-eps",
+        type=float,
+        default=None,
+        help="eps for the stopping rule (default: --eps); lower it to match the fixed-m error.",
+    )
+    parser.add_argument("--estimator", choices=["coverage", "first"], default="coverage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Compute missing ground truth with exact_count (and save it to --truth-dir).",
+    )
+    parser.add_argument(
+        "--csv",
+        type=Path,
+        default=BASE_DIR / "stopping_comparison.csv",
+        help="Where to write the comparison table.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Optional path to save the plot; if not given the plot is shown.",
+    )
+    return parser.parse_args()
+
+
+def load_truth(path: Path, truth_dir: Path, num_vars: int, compute: bool) -> Optional[List[int]]:
+    truth_path = truth_dir / f"{path.name}_sol.txt"
+    if truth_path.exists():
+        return [int(line) for line in truth_path.read_text().split()]
+    if not compute:
+        return None
+    with DNFFile(path) as dnf:
+        counts = [count_models(formula, num_vars) for formula in dnf]
+    truth_dir.mkdir(parents=True, exist_ok=True)
+    truth_path.write_text("".join(f"{count}\n" for count in counts))
+    return counts
+
+
+def compare_file(path: Path, truth: List[int], num_vars: int, args: argparse.Namespace,
+                 rng: np.random.Generator) -> List[dict]:
+    rows = []
+    with DNFFile(path) as dnf:
+        for stopping, eps in (("fixed", args.eps), ("dklr", args.dklr_eps or args.eps)):
+            results = [klm_estimate(formula, num_vars, eps, args.delta,
+                                    estimator=args.estimator, rng=rng, stopping=stopping)
+                       for formula in dnf]
+            errors = [abs(r.estimate - t) for r, t in zip(results, truth)]
+            rows.append({
+                "file": path.name,
+                "stopping": stopping,
+                "eps": eps,
+                "samples_mean": sum(r.samples for r in results) / len(results),
+                "seconds": sum(r.seconds for r in results),
+                "mae": sum(errors) / len(errors),
+                "mean_rel_error": sum(e / t for e, t in zip(errors, truth) if t) / len(truth),
+            })
+    return rows
+
+
+def plot_comparison(rows: List[dict], output_path: Optional[Path]) -> None:
+    fig, (ax_samples, ax_time) = plt.subplots(1, 2, figsize=(12, 5))
+    by_file = {}
+    for row in rows:
+        by_file.setdefault(row["file"], {})[row["stopping"]] = row
+    files = sorted(by_file, key=lambda f: (by_file[f]["fixed"]["literals"],
+                                           by_file[f]["fixed"]["clauses"]))
+    labels = [f"{by_file[f]['fixed']['literals']}/{by_file[f]['fixed']['clauses']}" for f in files]
+    x = np.arange(len(files))
+    width = 0.4
+    for offset, stopping in ((-width / 2, "fixed"), (width / 2, "dklr")):
+        ax_samples.bar(x + offset, [by_file[f][stopping]["samples_mean"] for f in files],
+                       width=width, label=stopping)
+        ax_time.bar(x + offset, [by_file[f][stopping]["seconds"] for f in files],
+                    width=width, label=stopping)
+
+    for ax, ylabel, title in ((ax_samples, "Samples per formula", "Samples used"),
+                              (ax_time, "Time (seconds)", "Runtime")):
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=45, ha="right")
+        ax.set_xlabel("literals / clauses")
+        ax.set_ylabel(ylabel)
+        ax.set_yscale("log")
+        ax.set_title(f"{title}: fixed m vs DKLR stopping rule")
+        ax.grid(True, axis="y", alpha=0.3)
+        ax.legend()
+    fig.tight_layout()
+
+    if output_path:
+        fig.savefig(output_path, dpi=200)
+        print(f"Saved plot to {output_path.resolve()}")
+    else:
+        plt.show()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    rows = []
+    for path in sorted(args.data_dir.glob("*.bin")):
+        match = PAIR_RE.search(path.name)
+        if not match:
+            continue
+        num_vars = int(match.group("literals"))
+        truth = load_truth(path, args.truth_dir, num_vars, args.exact)
+        if truth is None:
+            continue
+        for row in compare_file(path, truth, num_vars, args, rng):
+            row["literals"] = num_vars
+            row["clauses"] = int(match.group("clauses"))
+            rows.append(row)
+            print(f"{path.name} {row['stopping']:>5}: {row['samples_mean']:>10.0f} samples/formula "
+                  f"{row['seconds']:8.3f}s  MAE {row['mae']:.4g}  "
+                  f"rel {row['mean_rel_error']:.4%}")
+
+    if not rows:
+        raise SystemExit("No instances with ground truth (use --exact to compute it).")
+
+    fields = ["file", "literals", "clauses", "stopping", "eps", "samples_mean", "seconds", "mae",
+              "mean_rel_error"]
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Saved table to {args.csv}")
+
+    fixed = [r for r in rows if r["stopping"] == "fixed"]
+    dklr = [r for r in rows if r["stopping"] == "dklr"]
+    ratio = sum(r["samples_mean"] for r in fixed) / sum(r["samples_mean"] for r in dklr)
+    speedup = sum(r["seconds"] for r in fixed) / sum(r["seconds"] for r in dklr)
+    print(f"Overall: DKLR uses {ratio:.1f}x fewer samples, {speedup:.1f}x less time "
+          f"(mean rel. error fixed {np.mean([r['mean_rel_error'] for r in fixed]):.4%}, "
+          f"DKLR {np.mean([r['mean_rel_error'] for r in dklr]):.4%})")
+
+    plot_comparison(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Reader and writer for the DNF binary format of DNFGenerator.cpp.
+
+Each formula is one write2DVector call:
+
+    uint64 rows
+    rows x [ uint64 length, length x pair<int32 var, int32 sign> ]
+
+and a .bin file is the concatenation of all formulas (sign 1 = negated
+literal, variables are 1..n). Every field is 8 bytes (a header word or one
+packed literal), so the file is read as ONE memory-mapped uint64 array.
+A single pass over the header words builds an offset index; after that a
+formula is a set of NumPy views into the mapping, nothing is copied:
+
+    dnf = DNFFile("Data/samples20_literals5_clauses20_var_width1.bin")
+    f = dnf[3]
+    variables, signs = f.clause(0)
+    for f in dnf: ...
+"""
+import argparse
+import mmap
+import os
+import re
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+WORD = np.dtype(np.uint64)        # Header words and packed literals
+LITERAL = np.dtype(np.int32)      # (var, sign) halves of a literal word
+
+LITERALS_RE = re.compile(r"literals(?P<literals>\d+)")
+
+
+class Formula(NamedTuple):
+    """
+    One DNF formula as views into the mapped file.
+
+    variables/signs cover the formula's whole body, header words included
+    (a header shows up as one bogus entry), so clause j is
+    variables[clause_starts[j] : clause_starts[j] + clause_lengths[j]].
+    """
+    variables: np.ndarray
+    signs: np.ndarray
+    clause_starts: np.ndarray
+    clause_lengths: np.ndarray
+
+    @property
+    def num_clauses(self) -> int:
+        return len(self.clause_starts)
+
+    def clause(self, j: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(variables, signs) views of clause j."""
+        start = int(self.clause_starts[j])
+        end = start + int(self.clause_lengths[j])
+        return self.variables[start:end], self.signs[start:end]
+
+    def compact(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Contiguous (variables, signs, offsets) arrays in CSR layout, with
+        clause j at offsets[j]:offsets[j+1]. This one COPIES the literals.
+        """
+        offsets = np.zeros(self.num_clauses + 1, dtype=np.int64)
+        np.cumsum(self.clause_lengths, out=offsets[1:])
+        if offsets[-1] == 0:
+            empty = np.zeros(0, dtype=LITERAL)
+            return empty, empty.copy(), offsets
+        # Mask out the header word in front of every clause
+        keep = np.ones(len(self.variables), dtype=bool)
+        keep[self.clause_starts - 1] = False
+        return self.variables[keep], self.signs[keep], offsets
+
+    def to_lists(self) -> List[List[Tuple[int, int]]]:
+        """The vector<vector<pair<int, int>>> the C++ tools read."""
+        return [list(zip(v.tolist(), s.tolist()))
+                for v, s in (self.clause(j) for j in range(self.num_clauses))]
+
+
+class DNFFile:
+    """
+    Memory-mapped .bin file with random access to every formula.
+
+    Index arrays (one entry per formula / per clause):
+        formula_starts[i]       word of formula i's row count (plus the end)
+        clause_offsets[i]       first clause of formula i in the clause arrays
+        clause_starts[c]        first literal of clause c, relative to its formula body
+        clause_lengths[c]       literals in clause c
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        size = os.path.getsize(self.path)
+        if size % WORD.itemsize:
+            raise ValueError(f"{self.path}: size {size} is not a multiple of 8 bytes")
+
+        if size:
+            with open(self.path, "rb") as fp:
+                self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            self.words = np.frombuffer(self._mmap, dtype=WORD)
+        else:
+            self._mmap = None
+            self.words = np.zeros(0, dtype=WORD)
+
+        start = time.perf_counter()
+        (self.formula_starts, self.clause_offsets,
+         self.clause_starts, self.clause_lengths) = _build_index(self.words)
+        self.index_seconds = time.perf_counter() - start
+
+    def __len__(self) -> int:
+        return len(self.formula_starts) - 1
+
+    def __getitem__(self, i: int) -> Formula:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"formula {i} is out of range for {len(self)} formulas")
+        body = self.words[self.formula_starts[i] + 1:self.formula_starts[i + 1]]
+        pairs = body.view(LITERAL).reshape(-1, 2)
+        first, last = self.clause_offsets[i], self.clause_offsets[i + 1]
+        return Formula(pairs[:, 0], pairs[:, 1],
+                       self.clause_starts[first:last], self.clause_lengths[first:last])
+
+    def __iter__(self) -> Iterator[Formula]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def num_clauses(self) -> int:
+        return len(self.clause_starts)
+
+    @property
+    def num_literals(self) -> int:
+        return int(self.clause_lengths.sum())
+
+    def close(self) -> None:
+        """Releases the mapping (views handed out must not be used afterwards)."""
+        self.words = np.zeros(0, dtype=WORD)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views still alive: the mapping goes away with the last of them
+                pass
+            self._mmap = None
+
+    def __enter__(self) -> "DNFFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _build_index(words: np.ndarray):
+    """One pass over the header words (the literals are jumped over)."""
+    headers = memoryview(words).cast("B").cast("Q") if len(words) else []
+    total = len(words)
+
+    formula_starts = array("q")
+    clause_offsets = array("q", [0])
+    clause_starts = array("q")
+    clause_lengths = array("q")
+
+    pos = 0
+    while pos < total:
+        formula_starts.append(pos)
+        rows = headers[pos]
+        body = pos + 1
+        pos = body
+        for _ in range(rows):
+            if pos >= total:
+                raise ValueError(f"truncated formula {len(formula_starts) - 1}: "
+                                 f"expected {rows} clauses")
+            length = headers[pos]
+            clause_starts.append(pos + 1 - body)
+            clause_lengths.append(length)
+            pos += 1 + length
+        if pos > total:
+            raise ValueError(f"truncated formula {len(formula_starts) - 1}: "
+                             f"clause runs past the end of the file")
+        clause_offsets.append(len(clause_starts))
+    formula_starts.append(pos)
+
+    return (np.frombuffer(formula_starts, dtype=np.int64),
+            np.frombuffer(clause_offsets, dtype=np.int64),
+            np.frombuffer(clause_starts, dtype=np.int64),
+            np.frombuffer(clause_lengths, dtype=np.int64))
+
+
+def encode_formula(variables: Sequence[int], signs: Sequence[int],
+                   offsets: Sequence[int]) -> np.ndarray:
+    """
+    Packs one formula in CSR layout (clause j = offsets[j]:offsets[j+1])
+    into the uint64 words write2DVector would produce.
+    """
+    variables = np.asarray(variables, dtype=LITERAL)
+    signs = np.asarray(signs, dtype=LITERAL)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(variables) != len(signs) or offsets[0] != 0 or offsets[-1] != len(variables):
+        raise ValueError("variables/signs must match offsets[0]=0 .. offsets[-1]=len")
+    lengths = np.diff(offsets)
+    if np.any(lengths < 0):
+        raise ValueError("offsets must be non-decreasing")
+
+    num_clauses = len(lengths)
+    words = np.empty(1 + num_clauses + len(variables), dtype=WORD)
+    words[0] = num_clauses
+    # Clause j's header sits after j earlier headers and offsets[j] literals
+    header_pos = 1 + offsets[:-1] + np.arange(num_clauses)
+    words[header_pos] = lengths
+    is_literal = np.ones(len(words), dtype=bool)
+    is_literal[0] = False
+    is_literal[header_pos] = False
+    pairs = np.empty((len(variables), 2), dtype=LITERAL)
+    pairs[:, 0] = variables
+    pairs[:, 1] = signs
+    words[is_literal] = pairs.reshape(-1).view(WORD)
+    return words
+
+
+def write_formulas(path, formulas: Iterable[Sequence[Sequence[Tuple[int, int]]]],
+                   append: bool = False) -> int:
+    """
+    Writes formulas given as lists of clauses of (var, sign) pairs, in the
+    exact layout of DNFGenerator.cpp. Returns the number written.
+    """
+    count = 0
+    with open(path, "ab" if append else "wb") as fp:
+        for formula in formulas:
+            lengths = [len(clause) for clause in formula]
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            literals = [lit for clause in formula for lit in clause]
+            variables = [v for v, _ in literals]
+            signs = [s for _, s in literals]
+            encode_formula(variables, signs, offsets).tofile(fp)
+            count += 1
+    return count
+
+
+def num_vars_from_name(path) -> int:
+    """Variables of a .bin file as the C++ tools take them: '_literals<N>_' in the name, else 20."""
+    match = LITERALS_RE.search(Path(path).name)
+    return int(match.group("literals")) if match else 20
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize a DNF .bin file.")
+    parser.add_argument("path", type=Path, help="Path to the .bin file.")
+    parser.add_argument(
+        "--show",
+        type=int,
+        default=None,
+        help="Print formula SHOW clause by clause.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with DNFFile(args.path) as dnf:
+        print(f"{args.path.name}: {len(dnf)} formulas, {dnf.num_clauses} clauses, "
+              f"{dnf.num_literals} literals (indexed in {dnf.index_seconds:.3f}s)")
+        if args.show is not None:
+            for j, clause in enumerate(dnf[args.show].to_lists()):
+                print(f"  clause {j}: " + " ".join(
+                    f"{'~' if sign else ''}x{var}" for var, sign in clause))
+
+
+if __name__ == "__main__":
+    main()
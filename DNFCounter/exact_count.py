@@ -0,0 +1,356 @@
+"""
+Exact DNF model counter for instances past solveDNF.cpp's brute force.
+
+solve_dnf checks all 2^n assignments against every clause, which caps
+ground truth at ~20 variables. Here the count comes from the assignments
+that falsify EVERY clause, U(F), with #models = 2^n - U(F):
+
+- Shannon expansion on a variable x of the shortest clauses:
+      U(F) = U(F | x=1) + U(F | x=0)
+  (conditioning drops the clauses x falsifies and shortens the others; a
+  clause that becomes empty makes F true, so that branch contributes 0).
+- Components: clauses that share no variable are independent, and U of
+  their disjunction is the PRODUCT of the components' U.
+- Memo: sub-formulas (frozensets of clause masks) repeat across branches.
+- Unit propagation: a one-literal clause must be falsified, so its variable
+  is fixed without branching.
+- Small sub-formulas (2^v assignments x clauses under BRUTE_FORCE_CELLS)
+  are finished by a vectorized brute force over the packed masks.
+
+Clauses are (care, pos) bitmasks as in klm_packed.py: bit v-1 for variable
+v, and an assignment a satisfies (care, pos) iff a & care == pos.
+
+    python exact_count.py Data/samples20_literals30_clauses50_var_width1.bin
+
+With --cache, formulas already counted (in any file) are read from the
+result cache instead of being solved again, and new counts are added to it.
+--store appends the counts to the columnar result store (result_store.py).
+"""
+import argparse
+import csv
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from dnf_format import DNFFile, Formula, num_vars_from_name
+from result_cache import ResultCache
+from result_store import EXACT, ResultStore
+
+# Largest (assignments x clauses) job handed to the vectorized brute force
+BRUTE_FORCE_CELLS = 1 << 16
+
+# Every assignment the brute force can enumerate (sliced, never rebuilt)
+_ASSIGNMENTS = np.arange(BRUTE_FORCE_CELLS, dtype=np.uint64)
+
+Clause = Tuple[int, int]   # (care, pos) bitmasks
+
+
+def clause_masks(formula: Formula) -> Tuple[List[Clause], int]:
+    """
+    (care, pos) masks of the formula's clauses and its highest variable.
+    Repeated literals count once; contradictory clauses (x & ~x) are
+    dropped and variables <= 0 are skipped, as in KLM.cpp.
+    """
+    clauses = []
+    highest = 0
+    for j in range(formula.num_clauses):
+        variables, signs = formula.clause(j)
+        care = pos = neg = 0
+        for var, sign in zip(variables.tolist(), signs.tolist()):
+            if var <= 0:
+                continue
+            bit = 1 << (var - 1)
+            care |= bit
+            if sign:
+                neg |= bit
+            else:
+                pos |= bit
+            highest = max(highest, var)
+        if not pos & neg:
+            clauses.append((care, pos))
+    return clauses, highest
+
+
+def count_models(formula: Formula, num_vars_hint: int) -> int:
+    """Exact number of satisfying assignments over max(num_vars_hint, highest var) variables."""
+    clauses, highest = clause_masks(formula)
+    num_vars = max(num_vars_hint, highest)
+    return count_models_masks(clauses, num_vars)
+
+
+def count_models_masks(clauses: List[Clause], num_vars: int) -> int:
+    formula = frozenset(clauses)
+    used = _variables(formula)
+    unsat = _count_falsifying(formula, {}) << (num_vars - used.bit_count())
+    return (1 << num_vars) - unsat
+
+
+def _variables(formula: FrozenSet[Clause]) -> int:
+    used = 0
+    for care, _ in formula:
+        used |= care
+    return used
+
+
+def _count_falsifying(formula: FrozenSet[Clause], memo: Dict[FrozenSet[Clause], int]) -> int:
+    """Assignments of the formula's own variables that satisfy no clause."""
+    if not formula:
+        return 1
+    cached = memo.get(formula)
+    if cached is not None:
+        return cached
+
+    used = _variables(formula)
+    num_used = used.bit_count()
+    if any(care == 0 for care, _ in formula):
+        memo[formula] = 0   # An empty clause: the formula is always true
+        return 0
+
+    propagated, fixed = _propagate_units(formula)
+    if fixed:
+        if propagated is None:
+            result = 0
+        else:
+            free = num_used - fixed - _variables(propagated).bit_count()
+            result = _count_falsifying(propagated, memo) << free
+    elif len(formula) == 1:
+        result = (1 << num_used) - 1
+    elif (len(formula) << num_used) <= BRUTE_FORCE_CELLS:
+        result = _brute_force(formula, used)
+    else:
+        components = _components(formula)
+        if len(components) > 1:
+            result = 1
+            for component in components:
+                result *= _count_falsifying(component, memo)
+        else:
+            x = _branch_variable(formula)
+            result = 0
+            for value in (x, 0):
+                branch = _condition(formula, x, value)
+                if branch is None:
+                    continue    # Some clause became empty: no falsifying assignment
+                free = num_used - 1 - _variables(branch).bit_count()
+                result += _count_falsifying(branch, memo) << free
+
+    memo[formula] = result
+    return result
+
+
+def _condition(formula: FrozenSet[Clause], x: int, value: int) -> Optional[FrozenSet[Clause]]:
+    """F with variable x (a single bit) set to value (x or 0); None if F became true."""
+    out = set()
+    for care, pos in formula:
+        if not care & x:
+            out.add((care, pos))
+        elif pos & x == value:
+            care ^= x
+            if care == 0:
+                return None
+            out.add((care, pos & ~x))
+        # else: the literal is false, so is the clause
+    return frozenset(out)
+
+
+def _propagate_units(formula: FrozenSet[Clause]) -> Tuple[Optional[FrozenSet[Clause]], int]:
+    """
+    Fixes the variable of every one-literal clause to the value that
+    falsifies it, repeatedly. Returns (formula left, variables fixed); the
+    formula is None when some clause became empty (always true).
+    """
+    current = formula
+    fixed = 0
+    while current:
+        unit = next(((care, pos) for care, pos in current if care & (care - 1) == 0), None)
+        if unit is None:
+            break
+        care, pos = unit
+        current = _condition(current, care, care ^ pos)
+        fixed += 1
+    return current, fixed
+
+
+def _branch_variable(formula: FrozenSet[Clause]) -> int:
+    """
+    Jeroslow-Wang: the variable with the largest sum of 2^-width over its
+    clauses, so short clauses are shortened (and propagated) first.
+    """
+    scores: Dict[int, float] = {}
+    for care, _ in formula:
+        weight = 1.0 / (1 << care.bit_count())
+        while care:
+            bit = care & -care
+            scores[bit] = scores.get(bit, 0.0) + weight
+            care ^= bit
+    return max(scores, key=scores.get)
+
+
+def _components(formula: FrozenSet[Clause]) -> List[FrozenSet[Clause]]:
+    """Splits the clauses into groups that share no variable."""
+    groups: List[Tuple[int, List[Clause]]] = []
+    for clause in formula:
+        mask = clause[0]
+        members = [clause]
+        rest = []
+        for group_mask, group in groups:
+            if group_mask & mask:
+                mask |= group_mask
+                members.extend(group)
+            else:
+                rest.append((group_mask, group))
+        rest.append((mask, members))
+        groups = rest
+    return [frozenset(group) for _, group in groups]
+
+
+def _brute_force(formula: FrozenSet[Clause], used: int) -> int:
+    """Counts the falsifying assignments of the used variables by enumeration."""
+    bits = []
+    mask = used
+    while mask:
+        bit = mask & -mask
+        bits.append(bit)
+        mask ^= bit
+    # Compress the masks onto bits 0..v-1
+    care = np.zeros(len(formula), dtype=np.uint64)
+    pos = np.zeros(len(formula), dtype=np.uint64)
+    for j, (c, p) in enumerate(formula):
+        care[j] = sum(1 << i for i, bit in enumerate(bits) if c & bit)
+        pos[j] = sum(1 << i for i, bit in enumerate(bits) if p & bit)
+
+    # Assignments still falsifying every clause seen so far
+    assignments = _ASSIGNMENTS[:1 << len(bits)]
+    alive = np.ones(len(assignments), dtype=bool)
+    for c, p in zip(care, pos):
+        alive &= (assignments & c) != p
+    return int(np.count_nonzero(alive))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Exact model counts for every formula of DNF .bin files."
+    )
+    parser.add_argument("paths", type=Path, nargs="+", help=".bin files to count.")
+    parser.add_argument(
+        "--num-vars",
+        type=int,
+        default=None,
+        help="Number of variables (default: from '_literals<N>_' in the file name, else 20).",
+    )
+    parser.add_argument("--output-dir", type=Path, default=Path("Output"))
+    parser.add_argument(
+        "--timings",
+        type=Path,
+        default=Path("Output") / "solve_times_exact.csv",
+        help="CSV the per-file timings are appended to.",
+    )
+    parser.add_argument(
+        "--bruteforce",
+        type=Path,
+        default=None,
+        help="solveDNF binary to time on the same files (its counts are cross-checked).",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="Result cache (result_cache.py) to reuse and store exact counts.",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Columnar result store (result_store.py) to append the counts to.",
+    )
+    return parser.parse_args()
+
+
+class FileCounts(NamedTuple):
+    counts: List[int]
+    seconds: List[float]            # Per formula; 0 for the ones found in the cache
+    hashes: Optional[List[str]]     # Formula hashes, when the cache computed them
+    hits: int
+
+
+def count_file(path: Path, num_vars: int, cache: Optional[ResultCache]) -> FileCounts:
+    """Counts of every formula in the file, reusing (and filling) the cache if given."""
+    with DNFFile(path) as dnf:
+        keys = cache.register_file(path, num_vars) if cache is not None else None
+        counts = cache.exact_many(keys, num_vars) if cache is not None else [None] * len(dnf)
+        seconds = [0.0] * len(counts)
+        hits = sum(count is not None for count in counts)
+        solved: Dict[str, int] = {}
+        for idx, formula in enumerate(dnf):
+            if counts[idx] is not None:
+                continue
+            if keys is not None and keys[idx] in solved:   # The same formula earlier in this file
+                counts[idx] = solved[keys[idx]]
+                hits += 1
+                continue
+            start = time.perf_counter()
+            counts[idx] = count_models(formula, num_vars)
+            seconds[idx] = time.perf_counter() - start
+            if cache is not None:
+                solved[keys[idx]] = counts[idx]
+                cache.put_exact(keys[idx], num_vars, counts[idx], seconds[idx], "exact_count")
+    if cache is not None:
+        cache.commit()
+    return FileCounts(counts, seconds, keys, hits)
+
+
+def main() -> None:
+    args = parse_args()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    write_header = not args.timings.exists()
+    cache = ResultCache(args.cache) if args.cache is not None else None
+    store = ResultStore(args.store) if args.store is not None else None
+    with open(args.timings, "a", newline="") as timings:
+        writer = csv.writer(timings)
+        if write_header:
+            writer.writerow(["file", "num_vars", "formulas", "seconds", "seconds_bruteforce"])
+
+        for path in args.paths:
+            num_vars = args.num_vars
+            if num_vars is None:
+                num_vars = num_vars_from_name(path)
+
+            start = time.perf_counter()
+            result = count_file(path, num_vars, cache)
+            counts = result.counts
+            seconds = time.perf_counter() - start
+            if store is not None:
+                store.append_file(*EXACT, path, counts, seconds=result.seconds,
+                                  hashes=result.hashes)
+            out_path = args.output_dir / f"{path.name}_sol.txt"
+            out_path.write_text("".join(f"{count}\n" for count in counts))
+
+            seconds_bf = ""
+            if args.bruteforce is not None:
+                start = time.perf_counter()
+                proc = subprocess.run([str(args.bruteforce.resolve()), str(path.resolve())],
+                                      capture_output=True, text=True,
+                                      cwd=Path(__file__).resolve().parent)
+                seconds_bf = f"{time.perf_counter() - start:.6f}"
+                reference = [int(line.rsplit(":", 1)[1]) for line in proc.stdout.splitlines()
+                             if "satisfying assignments" in line]
+                if reference != counts:
+                    print(f"  MISMATCH with {args.bruteforce.name} on {path.name}", file=sys.stderr)
+
+            writer.writerow([str(path), num_vars, len(counts), f"{seconds:.6f}", seconds_bf])
+            timings.flush()
+            print(f"{path.name}: {len(counts)} formulas in {seconds:.3f}s"
+                  + (f" ({result.hits} cached)" if cache is not None else "")
+                  + (f" (brute force {float(seconds_bf):.3f}s)" if seconds_bf else "")
+                  + f" -> {out_path}")
+    if cache is not None:
+        cache.close()
+    if store is not None:
+        store.compact(*EXACT)
+
+
+if __name__ == "__main__":
+    main()
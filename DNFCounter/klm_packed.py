@@ -0,0 +1,446 @@
+"""
+Bit-packed, block-vectorized KLM estimator (the Python counterpart of
+KLM.cpp's solve_dnf).
+
+Every clause becomes two bitmasks over the variables (bit v-1 of word
+(v-1) // 64):
+    care[c]  variables the clause mentions
+    pos[c]   variables it needs to be TRUE
+and an assignment is the same number of packed words, so
+
+    assignment satisfies clause c  <=>  (assignment & care[c]) == pos[c]
+
+word by word. Instead of one sample at a time, a whole block of samples is
+drawn at once (chosen clauses, raw random words forced onto the chosen
+clause) and its coverage counts come from one (samples x clauses) AND +
+compare over the mask matrices.
+
+With the coverage index (the default) no clause is scanned at all. Each
+variable/value pair gets the BITSET of clauses its value contradicts, so a
+sample's satisfied clauses are ~(OR of the bitsets of its n values). The
+bitsets of k variables are pre-ORed for all 2^k value patterns, which
+leaves n/k gathers of t/64 words per sample.
+
+    python klm_packed.py Data/samples20_literals25_clauses1000_var_width1.bin --eps 0.1 --delta 0.1
+"""
+import argparse
+import math
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from dnf_format import DNFFile, Formula, num_vars_from_name
+from result_cache import ResultCache
+from result_store import ResultStore
+
+# Cells of the (samples x clauses) matrix evaluated per block (bounds temporaries)
+BLOCK_CELLS = 1 << 20
+
+# Memory allowed for the pre-ORed bitsets of the coverage index
+INDEX_BYTES = 1 << 26
+
+# Bitset words per block on the index path (keeps the block's bitsets in cache)
+INDEX_BLOCK_WORDS = 1 << 17
+
+# Bits set in every byte (popcount fallback for NumPy < 2.0)
+_BYTE_POPCOUNT = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+class PackedDNF(NamedTuple):
+    """Clause bitmasks of one formula (W = words per assignment)."""
+    care: np.ndarray            # (C, W) uint64
+    pos: np.ndarray             # (C, W) uint64
+    weights: np.ndarray         # (C,) 2^(free_c - max_free), 0 for contradictions
+    log2_scale: int             # max_free: true weight_c = weights[c] * 2^log2_scale
+    num_vars: int
+
+    @property
+    def num_clauses(self) -> int:
+        return len(self.care)
+
+    @property
+    def total_weight(self) -> float:
+        """Sum of |SC_c| = 2^(n - width_c) over the non-contradictory clauses."""
+        return math.ldexp(float(self.weights.sum()), self.log2_scale)
+
+
+class CoverageIndex(NamedTuple):
+    """
+    Variable -> clause inverted index as clause bitsets (T = ceil(t/64) words).
+
+    tables[g, p] is the OR of the kill bitsets of variables g*k .. g*k+k-1
+    under value pattern p, where the kill bitset of (v, value) marks the
+    clauses holding the opposite literal of v.
+    """
+    tables: np.ndarray          # (G, 2^k, T) uint64
+    group_bits: int             # k (divides 64, so a group never spans two words)
+    last_word_mask: np.uint64   # Real clause bits of the last bitset word
+
+    def alive(self, assignments: np.ndarray) -> np.ndarray:
+        """(samples, T) bitsets of the clauses each assignment satisfies."""
+        k = self.group_bits
+        low = np.uint64((1 << k) - 1)
+        killed = None
+        for g in range(self.tables.shape[0]):
+            word, shift = divmod(g * k, 64)
+            patterns = ((assignments[:, word] >> np.uint64(shift)) & low).astype(np.intp)
+            if killed is None:
+                killed = self.tables[g][patterns]
+            else:
+                killed |= self.tables[g][patterns]
+        np.invert(killed, out=killed)
+        killed[:, -1] &= self.last_word_mask
+        return killed
+
+
+class KLMResult(NamedTuple):
+    estimate: float
+    samples: int
+    seconds: float
+
+
+def pack_formula(formula: Formula, num_vars_hint: int) -> PackedDNF:
+    """
+    Builds the clause masks: repeated literals count once and variables
+    <= 0 are skipped. n grows to the largest variable seen. The masks of a
+    contradictory clause (x & ~x) keep only its positive literal of x, so
+    they would match assignments with x = 1; such clauses are flagged by
+    weight 0 instead, and satisfied() leaves them out as solve_dnf skips
+    ClauseMeta::contradictory.
+    """
+    variables, signs, offsets = formula.compact()
+    num_clauses = len(offsets) - 1
+    clause_ids = np.repeat(np.arange(num_clauses), np.diff(offsets))
+    valid = variables > 0
+    variables = variables[valid].astype(np.int64)
+    signs = signs[valid]
+    clause_ids = clause_ids[valid]
+
+    num_vars = max(num_vars_hint, int(variables.max()) if len(variables) else 0)
+    num_words = max(1, (num_vars + 63) // 64)
+    word = (variables - 1) // 64
+    bit = np.left_shift(np.uint64(1), ((variables - 1) % 64).astype(np.uint64))
+
+    care = np.zeros((num_clauses, num_words), dtype=np.uint64)
+    pos = np.zeros((num_clauses, num_words), dtype=np.uint64)
+    neg = np.zeros((num_clauses, num_words), dtype=np.uint64)
+    np.bitwise_or.at(care, (clause_ids, word), bit)
+    positive = signs == 0
+    np.bitwise_or.at(pos, (clause_ids[positive], word[positive]), bit[positive])
+    np.bitwise_or.at(neg, (clause_ids[~positive], word[~positive]), bit[~positive])
+    contradictory = np.any(pos & neg, axis=1)
+
+    # Width = distinct variables per clause
+    distinct = np.unique(clause_ids * (num_vars + 1) + variables)
+    widths = np.bincount(distinct // (num_vars + 1), minlength=num_clauses)
+    free = num_vars - widths
+    max_free = int(free[~contradictory].max()) if np.any(~contradictory) else 0
+    weights = np.where(contradictory, 0.0, np.ldexp(1.0, free - max_free))
+    return PackedDNF(care, pos, weights, max_free, num_vars)
+
+
+def build_coverage_index(packed: PackedDNF, max_bytes: int = INDEX_BYTES) -> CoverageIndex:
+    """
+    Builds the kill bitsets of every (variable, value) and pre-ORs them in
+    groups of k variables; k is the largest of 8, 4, 2, 1 whose tables fit
+    in max_bytes (k = 1 is the plain per-variable index).
+    """
+    num_clauses, num_vars = packed.num_clauses, packed.num_vars
+    num_words = (num_clauses + 63) // 64
+
+    def as_bits(masks: np.ndarray) -> np.ndarray:
+        """(n, t) bool matrix: bit v of clause c's little-endian mask words."""
+        bits = np.unpackbits(masks.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        return bits[:, :num_vars].T.astype(bool)
+
+    in_clause = as_bits(packed.care)
+    positive = as_bits(packed.pos)
+
+    def to_bitsets(marks: np.ndarray) -> np.ndarray:
+        packed_bytes = np.packbits(marks, axis=1, bitorder="little")
+        padded = np.zeros((num_vars, num_words * 8), dtype=np.uint8)
+        padded[:, :packed_bytes.shape[1]] = packed_bytes
+        return padded.view("<u8").astype(np.uint64)
+
+    # value 0 kills the clauses needing v TRUE, value 1 those needing it FALSE;
+    # contradictory clauses (weight 0) are killed by every value
+    never = packed.weights == 0
+    kill = (to_bitsets((in_clause & positive) | never),
+            to_bitsets((in_clause & ~positive) | never))
+
+    k = 1
+    for bits in (8, 4, 2):
+        groups = -(-num_vars // bits)
+        if groups * (1 << bits) * num_words * 8 <= max_bytes:
+            k = bits
+            break
+    groups = -(-num_vars // k)
+    tables = np.empty((groups, 1 << k, num_words), dtype=np.uint64)
+    for g in range(groups):
+        table = np.zeros((1, num_words), dtype=np.uint64)
+        for j in range(k):
+            v = g * k + j
+            if v < num_vars:
+                # Patterns with bit j clear come first, then those with it set
+                table = np.concatenate((table | kill[0][v], table | kill[1][v]))
+            else:
+                table = np.concatenate((table, table))
+        tables[g] = table
+
+    tail = num_clauses % 64
+    last_word_mask = np.uint64((1 << tail) - 1 if tail else (1 << 64) - 1)
+    return CoverageIndex(tables, k, last_word_mask)
+
+
+def num_samples(num_clauses: int, eps: float, delta: float) -> int:
+    """m = ceil(3t / eps^2 * ln(2 / delta)), as in KLM.cpp."""
+    if eps <= 0.0 or not 0.0 < delta < 1.0:
+        raise ValueError("eps must be > 0 and delta in (0,1)")
+    return math.ceil((3.0 * num_clauses / (eps * eps)) * math.log(2.0 / delta))
+
+
+def draw_samples(packed: PackedDNF, count: int, rng: np.random.Generator):
+    """
+    Picks `count` clauses with probability weight_c / W and a uniform
+    assignment satisfying each: raw random words with the chosen clause's
+    variables forced. Returns (clauses, assignments (count, W)).
+    """
+    cumulative = np.cumsum(packed.weights)
+    chosen = np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side="right")
+    np.minimum(chosen, packed.num_clauses - 1, out=chosen)
+    num_words = packed.care.shape[1]
+    words = rng.bit_generator.random_raw(count * num_words).reshape(count, num_words)
+    assignments = (words & ~packed.care[chosen]) | packed.pos[chosen]
+    return chosen, assignments
+
+
+def satisfied(packed: PackedDNF, assignments: np.ndarray) -> np.ndarray:
+    """(samples x clauses) bool matrix: assignment i satisfies clause c."""
+    care, pos = packed.care, packed.pos
+    sat = np.equal(assignments[:, None, 0] & care[None, :, 0], pos[None, :, 0])
+    for w in range(1, care.shape[1]):
+        sat &= np.equal(assignments[:, None, w] & care[None, :, w], pos[None, :, w])
+    # Contradictory clauses (weight 0) have no model, whatever their masks say
+    sat &= packed.weights[None, :] > 0
+    return sat
+
+
+def dklr_threshold(eps: float, delta: float) -> float:
+    """
+    Upsilon_1 of the Dagum-Karp-Luby-Ross stopping rule: summing samples
+    Z in [0, 1] until the sum reaches it gives mu_hat = Upsilon_1 / N with
+    P(|mu_hat - mu| > eps * mu) <= delta.
+    """
+    if not 0.0 < eps < 1.0 or not 0.0 < delta < 1.0:
+        raise ValueError("the stopping rule needs eps and delta in (0,1)")
+    upsilon = 4.0 * (math.e - 2.0) * math.log(2.0 / delta) / (eps * eps)
+    return 1.0 + (1.0 + eps) * upsilon
+
+
+def contributions(packed: PackedDNF, chosen: np.ndarray, assignments: np.ndarray,
+                  estimator: str, index: Optional[CoverageIndex] = None) -> np.ndarray:
+    """
+    Per-sample Z in [0, 1] with E[Z] = #models / W:
+        "coverage"  1 / |{c : a satisfies c}|
+        "first"     1 if the chosen clause is the first clause a satisfies
+    Clauses are scanned with the masks, or looked up in `index` if given.
+    """
+    if index is None:
+        sat = satisfied(packed, assignments)
+        if estimator == "coverage":
+            return 1.0 / sat.sum(axis=1, dtype=np.int64)
+        return (sat.argmax(axis=1) == chosen).astype(np.float64)
+
+    alive = index.alive(assignments)
+    if estimator == "coverage":
+        return 1.0 / _popcount_rows(alive)
+    # Lowest set bit of the first non-zero word (the chosen clause is always set)
+    word = (alive != 0).argmax(axis=1)
+    value = alive[np.arange(len(alive)), word]
+    lowest = value & (~value + np.uint64(1))
+    first = word * 64 + np.log2(lowest.astype(np.float64)).astype(np.int64)
+    return (first == chosen).astype(np.float64)
+
+
+def _popcount_rows(bitsets: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitsets).sum(axis=1, dtype=np.int64)
+    return _BYTE_POPCOUNT[bitsets.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+def klm_estimate(formula: Formula, num_vars_hint: int, eps: float = 0.1, delta: float = 0.1,
+                 samples: Optional[int] = None, estimator: str = "coverage",
+                 rng: Optional[np.random.Generator] = None,
+                 stopping: str = "fixed", use_index: bool = True) -> KLMResult:
+    """
+    Estimates the number of satisfying assignments of one formula.
+
+    estimator:
+        "coverage"  KLM.cpp: average of 1 / |{c : a satisfies c}|
+        "first"     MonteCarloCounter.cpp: fraction of samples whose chosen
+                    clause is the first clause they satisfy
+    Both are multiplied by the total weight W = sum of 2^(n - width_c).
+
+    stopping:
+        "fixed"     m = ceil(3t / eps^2 * ln(2 / delta)) samples (or `samples`),
+                    the worst case over all formulas with t clauses
+        "dklr"      Dagum-Karp-Luby-Ross stopping rule: sample until the sum
+                    of Z reaches dklr_threshold(eps, delta); needs about
+                    Upsilon_1 * W / #models samples, so formulas with little
+                    clause overlap stop far earlier
+
+    use_index: count coverage through build_coverage_index (False scans the
+    clause masks).
+    """
+    if estimator not in ("coverage", "first"):
+        raise ValueError(f"unknown estimator {estimator!r}")
+    if stopping not in ("fixed", "dklr"):
+        raise ValueError(f"unknown stopping rule {stopping!r}")
+    rng = np.random.default_rng() if rng is None else rng
+    start = time.perf_counter()
+
+    packed = pack_formula(formula, num_vars_hint)
+    if stopping == "dklr":
+        threshold = dklr_threshold(eps, delta)
+        m = 0
+    else:
+        m = num_samples(packed.num_clauses, eps, delta) if samples is None else samples
+    if packed.num_clauses == 0 or not np.any(packed.weights) or (stopping == "fixed" and m <= 0):
+        return KLMResult(0.0, m, time.perf_counter() - start)
+
+    if use_index:
+        index = build_coverage_index(packed)
+        max_block = max(1, INDEX_BLOCK_WORDS // index.tables.shape[2])
+    else:
+        index = None
+        max_block = max(1, BLOCK_CELLS // packed.num_clauses)
+    if stopping == "dklr":
+        # Blocks start small and double, so at most about half of the samples
+        # drawn past the stopping point are wasted
+        block = min(max_block, 1024)
+        total = 0.0
+        while True:
+            z = contributions(packed, *draw_samples(packed, block, rng), estimator, index)
+            running = total + np.cumsum(z)
+            stop = int(np.searchsorted(running, threshold))
+            if stop < block:
+                m += stop + 1
+                break
+            m += block
+            total = float(running[-1])
+            block = min(2 * block, max_block)
+        estimate = (threshold / m) * packed.total_weight
+        return KLMResult(estimate, m, time.perf_counter() - start)
+
+    total = 0.0
+    done = 0
+    while done < m:
+        count = min(max_block, m - done)
+        chosen, assignments = draw_samples(packed, count, rng)
+        total += float(np.sum(contributions(packed, chosen, assignments, estimator, index)))
+        done += count
+
+    estimate = (total / m) * packed.total_weight
+    return KLMResult(estimate, m, time.perf_counter() - start)
+
+
+def cache_name(estimator: str, stopping: str) -> str:
+    """Estimator name in the cache and store ("coverage+dklr" is run_sweep's "dklr")."""
+    return estimator if stopping == "fixed" else f"{estimator}+{stopping}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Bit-packed KLM estimate for every formula of a DNF .bin file."
+    )
+    parser.add_argument("path", type=Path, help="Path to the .bin file.")
+    parser.add_argument("--eps", type=float, default=0.1)
+    parser.add_argument("--delta", type=float, default=0.1)
+    parser.add_argument(
+        "--num-vars",
+        type=int,
+        default=None,
+        help="Number of variables (default: from '_literals<N>_' in the file name, else 20).",
+    )
+    parser.add_argument("--estimator", choices=["coverage", "first"], default="coverage")
+    parser.add_argument(
+        "--stopping",
+        choices=["fixed", "dklr"],
+        default="fixed",
+        help="fixed = worst-case m samples; dklr = Dagum-Karp-Luby-Ross stopping rule.",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Scan every clause mask instead of using the coverage index.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("OutputKLMPacked"),
+        help="Directory for the per-formula estimates.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="Result cache (result_cache.py) to store the estimates in.",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Columnar result store (result_store.py) to append the estimates to.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    num_vars = args.num_vars
+    if num_vars is None:
+        num_vars = num_vars_from_name(args.path)
+
+    rng = np.random.default_rng(args.seed)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = "_dklr" if args.stopping == "dklr" else ""
+    out_path = (args.output_dir /
+                f"{args.path.name}_klm{args.eps:.2f}_{args.delta:.2f}{suffix}.txt")
+
+    results = []
+    with DNFFile(args.path) as dnf, open(out_path, "w") as out:
+        for idx, formula in enumerate(dnf):
+            result = klm_estimate(formula, num_vars, args.eps, args.delta,
+                                  estimator=args.estimator, rng=rng, stopping=args.stopping,
+                                  use_index=not args.no_index)
+            results.append(result)
+            print(f"Matrix #{idx} satisfying assignments (approx): {round(result.estimate)}")
+            out.write(f"{round(result.estimate)}\n")
+
+    name = cache_name(args.estimator, args.stopping)
+    hashes = None
+    if args.cache is not None:
+        # Written in one short transaction: sweep jobs may share the cache
+        with ResultCache(args.cache) as cache:
+            hashes = cache.register_file(args.path, num_vars)
+            for key, result in zip(hashes, results):
+                cache.put_estimate(key, num_vars, name, args.eps, args.delta, result.estimate,
+                                   result.samples, result.seconds)
+    if args.store is not None:
+        ResultStore(args.store).append_file(
+            name, args.eps, args.delta, args.path, [r.estimate for r in results],
+            samples=[r.samples for r in results], seconds=[r.seconds for r in results],
+            hashes=hashes)
+
+    total_samples = sum(r.samples for r in results)
+    total_seconds = sum(r.seconds for r in results)
+
+    rate = total_samples / total_seconds if total_seconds else math.nan
+    print(f"{total_samples} samples in {total_seconds:.3f}s ({rate:,.0f} samples/s)")
+    print(f"Saved estimates to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
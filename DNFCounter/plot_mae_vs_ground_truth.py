@@ -6,6 +6,11 @@ from typing import Dict, List, Tuple
 
 import matplotlib.pyplot as plt
 
+from result_cache import DEFAULT_CACHE, ResultCache
+from result_store import DEFAULT_STORE, ResultStore, mae_table
+
+RUNS = {"eps0.1_delta0.1": (0.1, 0.1), "eps0.05_delta0.05": (0.05, 0.05)}
+
 PAIR_RE = re.compile(r"literals(?P<literals>\d+)_clauses(?P<clauses>\d+)")
 
 
@@ -55,6 +60,32 @@ def build_mae_table(pairs: Dict[Tuple[int, int], Dict[str, Path]]):
     return rows
 
 
+def build_mae_table_cached(cache: ResultCache, estimator: str):
+    """Same rows as build_mae_table, from the exact counts and estimates in the cache."""
+    maes: Dict[Tuple[int, int], Dict[str, float]] = {}
+    for run, (eps, delta) in RUNS.items():
+        for file, pairs in cache.mae_rows(estimator, eps, delta).items():
+            match = PAIR_RE.search(Path(file).name)
+            if not match:
+                continue
+            key = (int(match.group("literals")), int(match.group("clauses")))
+            maes.setdefault(key, {})[run] = sum(abs(t - p) for t, p in pairs) / len(pairs)
+    return [(f"L{literals}-C{clauses}", runs["eps0.1_delta0.1"], runs["eps0.05_delta0.05"])
+            for (literals, clauses), runs in sorted(maes.items()) if len(runs) == len(RUNS)]
+
+
+def build_mae_table_store(store: ResultStore, estimator: str):
+    """Same rows as build_mae_table, from the columnar result store."""
+    maes: Dict[Tuple[int, int], Dict[str, float]] = {}
+    for run, (eps, delta) in RUNS.items():
+        table = mae_table(store, estimator, eps, delta)
+        for literals, clauses, mae in zip(table["literals"].tolist(), table["clauses"].tolist(),
+                                          table["mae"].tolist()):
+            maes.setdefault((literals, clauses), {})[run] = mae
+    return [(f"L{literals}-C{clauses}", runs["eps0.1_delta0.1"], runs["eps0.05_delta0.05"])
+            for (literals, clauses), runs in sorted(maes.items()) if len(runs) == len(RUNS)]
+
+
 def plot_mae(rows, output_path: Path | None) -> None:
     labels = [r[0] for r in rows]
     mae_01 = [r[1] for r in rows]
@@ -111,17 +142,44 @@ def parse_args() -> argparse.Namespace:
         default=Path(__file__).resolve().parent,
         help="Directory containing Monte Carlo outputs with eps/delta suffixes.",
     )
+    parser.add_argument(
+        "--source",
+        choices=["store", "cache", "text"],
+        default="store",
+        help=("store = columnar result store (result_store.py), cache = result cache "
+              "(result_cache.py), text = pair *_sol.txt and Monte Carlo output files."),
+    )
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE)
+    parser.add_argument(
+        "--estimator",
+        default="monte",
+        help="Estimator name in the store/cache (monte, coverage, first, coverage+dklr).",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
 
-    pairs = collect_pairs(args.output_dir, args.monte_dir)
-    if not pairs:
-        raise SystemExit("No matching literal/clause pairs found in Output directory.")
-
-    rows = build_mae_table(pairs)
+    if args.source == "text":
+        pairs = collect_pairs(args.output_dir, args.monte_dir)
+        if not pairs:
+            raise SystemExit("No matching literal/clause pairs found in Output directory.")
+        rows = build_mae_table(pairs)
+    else:
+        location = args.store if args.source == "store" else args.cache
+        if not location.exists():
+            raise SystemExit(f"No result {args.source} at {location} "
+                             f"(see result_{args.source}.py import).")
+        if args.source == "store":
+            rows = build_mae_table_store(ResultStore(location), args.estimator)
+        else:
+            with ResultCache(location) as cache:
+                rows = build_mae_table_cached(cache, args.estimator)
+        if not rows:
+            raise SystemExit(f"No {args.estimator} literal/clause pairs with ground truth "
+                             f"at both eps/delta settings in {location}.")
     plot_mae(rows, args.output)
 
 
@@ -5,6 +5,8 @@ from typing import Optional
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from result_store import ResultStore, file_totals
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -19,6 +21,17 @@ def parse_args() -> argparse.Namespace:
         type=Path,
         help="Path to the monte_summary CSV file.",
     )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Read the columnar result store (result_store.py) instead of a CSV.",
+    )
+    parser.add_argument(
+        "--estimator",
+        default="monte",
+        help="Estimator partition to read from --store.",
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -35,6 +48,12 @@ def extract_metadata(file_col: pd.Series) -> pd.DataFrame:
     return meta
 
 
+def load_store(store_path: Path, estimator: str) -> pd.DataFrame:
+    """Per-file samples and seconds of the eps=0.1, delta=0.1 partition."""
+    df = pd.DataFrame(file_totals(ResultStore(store_path), estimator, 0.1, 0.1))
+    return df[df["clauses"] >= 0]
+
+
 def plot_metrics(df: pd.DataFrame, output_path: Optional[Path]) -> None:
     fig, (ax_samples, ax_time) = plt.subplots(1, 2, figsize=(12, 5), sharex=False)
 
@@ -77,6 +96,10 @@ def plot_metrics(df: pd.DataFrame, output_path: Optional[Path]) -> None:
 
 def main() -> None:
     args = parse_args()
+    if args.store is not None:
+        plot_metrics(load_store(args.store, args.estimator), args.output)
+        return
+
     csv_path = (
         args.csv
         if args.csv
@@ -3,6 +3,11 @@
 The script builds bar charts per literal count where the x-axis is the number
 of clauses and each group has bars for eps=0.1, eps=0.05, and brute force.
 Only instances with available brute-force timings are included.
+
+With --store the timings come from the columnar result store instead of the
+CSVs: MonteCarloCounter at both settings and, in place of brute force, the
+timings of the exact counter (exact_count.py), which the store holds. The
+third bar is labelled accordingly.
 """
 
 import argparse
@@ -12,6 +17,8 @@ from typing import Optional
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from result_store import EXACT, ResultStore, file_totals
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Compare Monte Carlo and brute-force runtimes.")
@@ -33,6 +40,12 @@ def parse_args() -> argparse.Namespace:
         default=Path(__file__).resolve().parent.parent / "Output" / "solve_times_literals_le_20.csv",
         help="Path to brute-force timing CSV.",
     )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Read the columnar result store (result_store.py) instead of the CSVs.",
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -70,14 +83,23 @@ def load_bruteforce(csv_path: Path) -> pd.DataFrame:
     return df[["file_bruteforce", "literals", "clauses", "seconds_bruteforce"]]
 
 
-def merge_available(df_bf: pd.DataFrame, df_eps01: pd.DataFrame, df_eps005: pd.DataFrame) -> pd.DataFrame:
-    merged = df_bf.merge(df_eps01, on=["literals", "clauses"], how="inner")
+def load_store(store: ResultStore, estimator: str, eps: float, delta: float,
+               label: str) -> pd.DataFrame:
+    df = pd.DataFrame(file_totals(store, estimator, eps, delta))
+    df = df[df["clauses"] >= 0]
+    df = df.rename(columns={"seconds": f"seconds_{label}", "file": f"file_{label}"})
+    return df[[f"file_{label}", "literals", "clauses", f"seconds_{label}"]]
+
+
+def merge_available(df_ref: pd.DataFrame, df_eps01: pd.DataFrame, df_eps005: pd.DataFrame) -> pd.DataFrame:
+    merged = df_ref.merge(df_eps01, on=["literals", "clauses"], how="inner")
     merged = merged.merge(df_eps005, on=["literals", "clauses"], how="inner")
     merged = merged.sort_values(["literals", "clauses"]).reset_index(drop=True)
     return merged
 
 
-def plot_bars(df: pd.DataFrame, output_path: Optional[Path]) -> None:
+def plot_bars(df: pd.DataFrame, output_path: Optional[Path],
+              reference: str = "bruteforce", reference_label: str = "brute force") -> None:
     literals_list = sorted(df["literals"].unique())
     n_rows = len(literals_list)
     fig, axes = plt.subplots(n_rows, 1, figsize=(10, 3 * n_rows), sharex=False)
@@ -103,9 +125,9 @@ def plot_bars(df: pd.DataFrame, output_path: Optional[Path]) -> None:
         )
         ax.bar(
             [xi + bar_width for xi in x],
-            subset["seconds_bruteforce"],
+            subset[f"seconds_{reference}"],
             width=bar_width,
-            label="brute force",
+            label=reference_label,
         )
 
         ax.set_title(f"Literals = {literals}")
@@ -128,15 +150,24 @@ def plot_bars(df: pd.DataFrame, output_path: Optional[Path]) -> None:
 def main() -> None:
     args = parse_args()
 
-    df_eps01 = load_monte(args.eps01, label="eps01")
-    df_eps005 = load_monte(args.eps005, label="eps005")
-    df_bf = load_bruteforce(args.deterministic)
+    if args.store is not None:
+        store = ResultStore(args.store)
+        df_eps01 = load_store(store, "monte", 0.1, 0.1, label="eps01")
+        df_eps005 = load_store(store, "monte", 0.05, 0.05, label="eps005")
+        # The store has no brute-force timings, only the exact counter's
+        reference, reference_label = "exact", "exact counter"
+        df_ref = load_store(store, *EXACT, label=reference)
+    else:
+        df_eps01 = load_monte(args.eps01, label="eps01")
+        df_eps005 = load_monte(args.eps005, label="eps005")
+        reference, reference_label = "bruteforce", "brute force"
+        df_ref = load_bruteforce(args.deterministic)
 
-    merged = merge_available(df_bf, df_eps01, df_eps005)
+    merged = merge_available(df_ref, df_eps01, df_eps005)
     if merged.empty:
-        raise SystemExit("No overlapping instances between brute force and Monte Carlo CSVs.")
+        raise SystemExit(f"No overlapping instances between {reference_label} and Monte Carlo timings.")
 
-    plot_bars(merged, args.output)
+    plot_bars(merged, args.output, reference, reference_label)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+"""
+Preprocessing of DNF .bin files before counting: every estimator draws
+m = O(t) samples, so each clause removed without changing the set of
+models is a straight saving.
+
+Per formula, over the (care, pos) masks of klm_packed.pack_formula:
+- normalize: repeated literals count once, variables <= 0 are skipped and
+  each clause is written back sorted by variable;
+- contradictory clauses (x & ~x) are dropped, they have no model;
+- identical clauses are deduplicated (np.unique over the mask rows);
+- subsumed clauses are removed: clause C subsumes D when every literal of C
+  is in D, i.e. care[C] & ~care[D] == 0 and pos[D] & care[C] == pos[C];
+  then D's models are all C's models and D adds nothing to the union.
+
+Clauses are sorted by width, so a clause can only be subsumed by a
+strictly shorter one (equal widths are duplicates), and it is enough to
+test it against the shorter clauses already kept.
+
+    python preprocess.py Data/*.bin --output-dir DataReduced
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+from dnf_format import DNFFile, Formula, num_vars_from_name, write_formulas
+from klm_packed import BLOCK_CELLS, klm_estimate, pack_formula
+
+Clause = List[Tuple[int, int]]   # (var, sign) pairs as in write_formulas
+
+
+class Reduction(NamedTuple):
+    clauses: List[Clause]
+    original: int           # t before preprocessing
+    contradictory: int
+    duplicates: int
+    subsumed: int
+
+    @property
+    def kept(self) -> int:
+        return len(self.clauses)
+
+
+def reduce_formula(formula: Formula, num_vars_hint: int) -> Reduction:
+    """The formula's clauses after normalization, dedupe and subsumption."""
+    packed = pack_formula(formula, num_vars_hint)
+    # pack_formula gives contradictory clauses weight 0
+    consistent = packed.weights > 0
+    care, pos = packed.care[consistent], packed.pos[consistent]
+
+    # Sorted signatures: unique (care, pos) rows, then stably by width
+    signatures = np.unique(np.concatenate((care, pos), axis=1), axis=0)
+    num_words = care.shape[1]
+    care, pos = signatures[:, :num_words], signatures[:, num_words:]
+    widths = _popcount(care)
+    order = np.argsort(widths, kind="stable")
+    care, pos, widths = care[order], pos[order], widths[order]
+
+    keep = _not_subsumed(care, pos, widths)
+    care, pos = care[keep], pos[keep]
+    num_clauses = packed.num_clauses
+    return Reduction(
+        clauses=[_decode(c, p) for c, p in zip(care, pos)],
+        original=num_clauses,
+        contradictory=num_clauses - int(np.count_nonzero(consistent)),
+        duplicates=int(np.count_nonzero(consistent)) - len(signatures),
+        subsumed=len(signatures) - int(np.count_nonzero(keep)),
+    )
+
+
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """Set bits per row of a (rows, words) uint64 matrix."""
+    bits = np.unpackbits(masks.astype("<u8").view(np.uint8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def _not_subsumed(care: np.ndarray, pos: np.ndarray, widths: np.ndarray) -> np.ndarray:
+    """
+    Keep-mask over width-sorted, distinct clauses. Each width is tested as a
+    block against all kept shorter clauses, in (candidates x kept) chunks of
+    at most BLOCK_CELLS. Subsumption is transitive, so testing against the
+    kept clauses only loses nothing.
+    """
+    keep = np.ones(len(care), dtype=bool)
+    for width in np.unique(widths):
+        shorter = np.flatnonzero(keep & (widths < width))
+        if len(shorter) == 0:
+            continue
+        kept_care, kept_pos = care[shorter][None], pos[shorter][None]
+        candidates = np.flatnonzero(widths == width)
+        chunk = max(1, BLOCK_CELLS // len(shorter))
+        for lo in range(0, len(candidates), chunk):
+            rows = candidates[lo:lo + chunk]
+            cand_care, cand_pos = care[rows][:, None], pos[rows][:, None]
+            covers = np.all((kept_care & ~cand_care) == 0, axis=2)
+            covers &= np.all((cand_pos & kept_care) == kept_pos, axis=2)
+            keep[rows[np.any(covers, axis=1)]] = False
+    return keep
+
+
+def _decode(care: np.ndarray, pos: np.ndarray) -> Clause:
+    """(var, sign) literals of a clause's mask words, sorted by variable."""
+    clause = []
+    for w, (c, p) in enumerate(zip(care.tolist(), pos.tolist())):
+        while c:
+            bit = c & -c
+            clause.append((64 * w + bit.bit_length(), 0 if p & bit else 1))
+            c ^= bit
+    return clause
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Remove contradictory, duplicate and subsumed clauses from DNF .bin files."
+    )
+    parser.add_argument("paths", type=Path, nargs="+", help=".bin files to reduce.")
+    parser.add_argument(
+        "--num-vars",
+        type=int,
+        default=None,
+        help="Number of variables (default: from '_literals<N>_' in the file name, else 20).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("DataReduced"),
+        help="Directory for the reduced files (same names as the inputs).",
+    )
+    parser.add_argument("--eps", type=float, default=0.1)
+    parser.add_argument("--delta", type=float, default=0.1)
+    parser.add_argument(
+        "--no-timing",
+        action="store_true",
+        help="Skip timing klm_packed on the original and reduced formulas.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+
+    for path in args.paths:
+        num_vars = args.num_vars
+        if num_vars is None:
+            num_vars = num_vars_from_name(path)
+        out_path = args.output_dir / path.name
+        if out_path.resolve() == path.resolve():
+            raise SystemExit(f"Refusing to overwrite {path} (choose another --output-dir)")
+
+        start = time.perf_counter()
+        with DNFFile(path) as dnf:
+            reductions = [reduce_formula(formula, num_vars) for formula in dnf]
+        seconds = time.perf_counter() - start
+        write_formulas(out_path, (r.clauses for r in reductions))
+
+        before = sum(r.original for r in reductions)
+        after = sum(r.kept for r in reductions)
+        print(f"{path.name}: t {before} -> {after} ({1 - after / before if before else 0:.1%} "
+              f"removed: {sum(r.contradictory for r in reductions)} contradictory, "
+              f"{sum(r.duplicates for r in reductions)} duplicate, "
+              f"{sum(r.subsumed for r in reductions)} subsumed) in {seconds:.3f}s -> {out_path}")
+
+        if args.no_timing:
+            continue
+        timings = []
+        for source in (path, out_path):
+            with DNFFile(source) as dnf:
+                results = [klm_estimate(formula, num_vars, args.eps, args.delta, rng=rng)
+                           for formula in dnf]
+            timings.append((sum(r.samples for r in results), sum(r.seconds for r in results)))
+        (samples_before, seconds_before), (samples_after, seconds_after) = timings
+        print(f"  klm_packed eps={args.eps} delta={args.delta}: "
+              f"{samples_before} -> {samples_after} samples, "
+              f"{seconds_before:.3f}s -> {seconds_after:.3f}s "
+              f"({seconds_before / seconds_after if seconds_after else float('inf'):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
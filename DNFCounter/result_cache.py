@@ -0,0 +1,243 @@
+"""
+Persistent cache of exact counts and estimates, keyed by the formula itself.
+
+Every formula is identified by a canonical hash: its clauses as sorted
+(var, sign) literal lists, the clause list sorted, hashed with BLAKE2b.
+Two files holding the same formula (or a regenerated copy of one) share
+the key, so a count is computed once whichever file it came from. The
+number of variables is part of every key, since the count depends on it.
+
+One SQLite file holds three tables:
+    instances   (file, formula)             -> hash, num_vars, clauses
+    exact       (hash, num_vars)            -> count, seconds, method
+    estimates   (hash, num_vars, estimator,
+                 eps, delta)                -> estimate, samples, seconds
+
+exact_count.py, klm_packed.py and run_sweep.py take --cache to read and
+fill it; plot_mae_vs_ground_truth.py reads the MAE table from it. Results
+written before the cache existed are imported with
+
+    python result_cache.py import Data/*.bin --truth-dir Output --monte-dir OutputMonte
+"""
+import argparse
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from dnf_format import DNFFile, Formula, num_vars_from_name
+
+BASE_DIR = Path(__file__).resolve().parent
+
+DEFAULT_CACHE = BASE_DIR / "results.sqlite"
+
+MONTE_RE = re.compile(r"_kl(?P<eps>[\d.]+)_(?P<delta>[\d.]+)\.txt$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    file TEXT NOT NULL,
+    formula INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    num_vars INTEGER NOT NULL,
+    clauses INTEGER NOT NULL,
+    PRIMARY KEY (file, formula)
+);
+CREATE TABLE IF NOT EXISTS exact (
+    hash TEXT NOT NULL,
+    num_vars INTEGER NOT NULL,
+    count TEXT NOT NULL,        -- decimal: counts pass 2^63 from 64 variables on
+    seconds REAL,
+    method TEXT,
+    PRIMARY KEY (hash, num_vars)
+);
+CREATE TABLE IF NOT EXISTS estimates (
+    hash TEXT NOT NULL,
+    num_vars INTEGER NOT NULL,
+    estimator TEXT NOT NULL,
+    eps REAL NOT NULL,
+    delta REAL NOT NULL,
+    estimate REAL NOT NULL,
+    samples INTEGER,
+    seconds REAL,
+    PRIMARY KEY (hash, num_vars, estimator, eps, delta)
+);
+"""
+
+
+def formula_hash(formula: Formula) -> str:
+    """Canonical hash of a formula: independent of literal and clause order."""
+    clauses = sorted(tuple(sorted(clause)) for clause in formula.to_lists())
+    return hashlib.blake2b(repr(clauses).encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed cache. Writes are committed by commit() or on leaving the
+    `with` block; one instance must not be shared between threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = Path(path)
+        # Several processes may share the file; wait on their locks
+        self._db = sqlite3.connect(self.path, timeout=60)
+        self._db.executescript(SCHEMA)
+
+    def register_file(self, path: Path, num_vars: int) -> List[str]:
+        """Hashes every formula of a .bin file and records where it lives."""
+        name = str(Path(path).resolve())
+        with DNFFile(path) as dnf:
+            rows = [(name, idx, formula_hash(formula), num_vars, formula.num_clauses)
+                    for idx, formula in enumerate(dnf)]
+        self._db.execute("DELETE FROM instances WHERE file = ?", (name,))
+        self._db.executemany("INSERT INTO instances VALUES (?, ?, ?, ?, ?)", rows)
+        return [row[2] for row in rows]
+
+    def exact_many(self, keys: Sequence[str], num_vars: int) -> List[Optional[int]]:
+        found = self._fetch("SELECT hash, count FROM exact WHERE num_vars = ? AND hash IN ({})",
+                            (num_vars,), keys)
+        return [int(found[key]) if key in found else None for key in keys]
+
+    def put_exact(self, key: str, num_vars: int, count: int, seconds: Optional[float] = None,
+                  method: Optional[str] = None) -> None:
+        self._db.execute("INSERT OR REPLACE INTO exact VALUES (?, ?, ?, ?, ?)",
+                         (key, num_vars, str(count), seconds, method))
+
+    def estimate_many(self, keys: Sequence[str], num_vars: int, estimator: str, eps: float,
+                      delta: float) -> List[Optional[float]]:
+        found = self._fetch(
+            "SELECT hash, estimate FROM estimates WHERE num_vars = ? AND estimator = ? "
+            "AND eps = ? AND delta = ? AND hash IN ({})", (num_vars, estimator, eps, delta), keys)
+        return [found.get(key) for key in keys]
+
+    def put_estimate(self, key: str, num_vars: int, estimator: str, eps: float, delta: float,
+                     estimate: float, samples: Optional[int] = None,
+                     seconds: Optional[float] = None) -> None:
+        self._db.execute("INSERT OR REPLACE INTO estimates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, num_vars, estimator, eps, delta, estimate, samples, seconds))
+
+    def mae_rows(self, estimator: str, eps: float,
+                 delta: float) -> Dict[str, List[Tuple[int, float]]]:
+        """(exact count, estimate) of every registered formula with both, by file."""
+        rows = self._db.execute(
+            "SELECT i.file, x.count, e.estimate FROM instances i "
+            "JOIN exact x ON x.hash = i.hash AND x.num_vars = i.num_vars "
+            "JOIN estimates e ON e.hash = i.hash AND e.num_vars = i.num_vars "
+            "WHERE e.estimator = ? AND e.eps = ? AND e.delta = ? "
+            "ORDER BY i.file, i.formula", (estimator, eps, delta))
+        by_file: Dict[str, List[Tuple[int, float]]] = {}
+        for file, count, estimate in rows:
+            by_file.setdefault(file, []).append((int(count), estimate))
+        return by_file
+
+    def summary(self) -> List[str]:
+        files, formulas = self._db.execute(
+            "SELECT COUNT(DISTINCT file), COUNT(DISTINCT hash) FROM instances").fetchone()
+        exact, seconds = self._db.execute("SELECT COUNT(*), SUM(seconds) FROM exact").fetchone()
+        lines = [f"{files} files, {formulas} distinct formulas",
+                 f"exact counts: {exact} ({seconds or 0:.3f}s of solving recorded)"]
+        for estimator, eps, delta, count in self._db.execute(
+                "SELECT estimator, eps, delta, COUNT(*) FROM estimates "
+                "GROUP BY estimator, eps, delta ORDER BY estimator, eps, delta"):
+            lines.append(f"{estimator} eps={eps:g} delta={delta:g}: {count} estimates")
+        return lines
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _fetch(self, query: str, params: tuple, keys: Sequence[str]) -> Dict[str, object]:
+        """Runs query for `hash IN (...)` in chunks under SQLite's parameter limit."""
+        found = {}
+        unique = list(set(keys))
+        for lo in range(0, len(unique), 500):
+            chunk = unique[lo:lo + 500]
+            sql = query.format(", ".join("?" * len(chunk)))
+            found.update(self._db.execute(sql, params + tuple(chunk)).fetchall())
+        return found
+
+
+def read_numbers(path: Path) -> List[float]:
+    return [float(line) for line in path.read_text().split()]
+
+
+def text_results(path: Path, truth_dir: Optional[Path],
+                 monte_dir: Optional[Path]) -> List[Tuple[str, float, float, Path]]:
+    """
+    The existing text outputs of a .bin file as (estimator, eps, delta, path):
+    <file>_sol.txt as ("exact", 0, 0) and MonteCarloCounter's
+    <file>_kl<eps>_<delta>.txt as ("monte", eps, delta).
+    """
+    found = []
+    if truth_dir is not None:
+        truth_path = truth_dir / f"{path.name}_sol.txt"
+        if truth_path.exists():
+            found.append(("exact", 0.0, 0.0, truth_path))
+    if monte_dir is not None:
+        for out_path in sorted(monte_dir.glob(f"{path.name}_kl*.txt")):
+            match = MONTE_RE.search(out_path.name)
+            if match:
+                found.append(("monte", float(match.group("eps")), float(match.group("delta")),
+                              out_path))
+    return found
+
+
+def import_results(cache: ResultCache, paths: Iterable[Path], truth_dir: Optional[Path],
+                   monte_dir: Optional[Path]) -> None:
+    """Loads <file>_sol.txt and MonteCarloCounter's <file>_kl<eps>_<delta>.txt into the cache."""
+    for path in paths:
+        num_vars = num_vars_from_name(path)
+        keys = cache.register_file(path, num_vars)
+        imported = []
+        for estimator, eps, delta, source in text_results(path, truth_dir, monte_dir):
+            if estimator == "exact":
+                counts = [int(value) for value in source.read_text().split()]
+                for key, count in zip(keys, counts):
+                    cache.put_exact(key, num_vars, count, method="import")
+            else:
+                for key, estimate in zip(keys, read_numbers(source)):
+                    cache.put_estimate(key, num_vars, estimator, eps, delta, estimate)
+            imported.append(source.name)
+        print(f"{path.name}: {len(keys)} formulas ({len(set(keys))} distinct)"
+              + (f", imported {', '.join(imported)}" if imported else ""))
+    cache.commit()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect or fill the DNF result cache.")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import existing text results for .bin files.")
+    importer.add_argument("paths", type=Path, nargs="+", help=".bin files the results belong to.")
+    importer.add_argument("--truth-dir", type=Path, default=BASE_DIR / "Output",
+                          help="Directory of <file>_sol.txt ground truth.")
+    importer.add_argument("--monte-dir", type=Path, default=BASE_DIR / "OutputMonte",
+                          help="Directory of MonteCarloCounter <file>_kl<eps>_<delta>.txt outputs.")
+
+    commands.add_parser("summary", help="Print what the cache holds.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with ResultCache(args.cache) as cache:
+        if args.command == "import":
+            import_results(cache, args.paths, args.truth_dir, args.monte_dir)
+            return
+        print(f"{args.cache}:")
+        for line in cache.summary():
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Columnar store of per-formula results, replacing the one-number-per-line
+text outputs for analysis.
+
+Results are partitioned by (estimator, eps, delta), one directory each:
+
+    Results/<estimator>/eps<eps>_delta<delta>/part-<time_ns>-<id>.npz
+
+and every append writes a new part, so concurrent sweep jobs never touch
+the same file. A part holds one row per formula in the columns
+
+    instance  name of the .bin file         formula   index in the file
+    hash      formula_hash, first 64 bits   literals  '_literals<N>_' of the name
+    clauses   '_clauses<N>_' of the name    value     estimate (or exact count)
+    samples   samples drawn (-1 unknown)    seconds   time for the formula (nan unknown)
+
+Exact counts are the partition ("exact", 0, 0); their value is a float64,
+exact up to 2^53 (53 variables). np.load reads the members of an .npz on
+access, so load() only reads the columns asked for. Many small parts are
+merged into one by compact().
+
+Running the same job again appends the same rows again. Across parts,
+load() and compact() keep only the newest row (by append time) of every
+(instance, formula, hash), so a re-run replaces its earlier results
+instead of counting twice.
+
+    python result_store.py import Data/*.bin --truth-dir Output --monte-dir OutputMonte
+    python result_store.py summary
+"""
+import argparse
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dnf_format import DNFFile, num_vars_from_name
+from result_cache import formula_hash, read_numbers, text_results
+
+BASE_DIR = Path(__file__).resolve().parent
+
+DEFAULT_STORE = BASE_DIR / "Results"
+
+EXACT = ("exact", 0.0, 0.0)
+
+COLUMNS = {
+    "instance": np.str_,   # Not "file": np.savez takes that keyword itself
+    "formula": np.int32,
+    "hash": np.uint64,      # Integer keys sort and join far faster than hex strings
+    "literals": np.int32,
+    "clauses": np.int32,
+    "value": np.float64,
+    "samples": np.int64,
+    "seconds": np.float64,
+}
+
+CLAUSES_RE = re.compile(r"clauses(?P<clauses>-?\d+)")
+PARTITION_RE = re.compile(r"eps(?P<eps>[^_]+)_delta(?P<delta>.+)")
+PART_RE = re.compile(r"part-(?P<stamp>\d+)-")
+
+# A row is the same result again when all of these match
+ROW_KEY = ("instance", "formula", "hash")
+
+
+class ResultStore:
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = Path(root)
+
+    def partition_dir(self, estimator: str, eps: float, delta: float) -> Path:
+        return self.root / estimator / f"eps{eps:g}_delta{delta:g}"
+
+    def partitions(self) -> List[Tuple[str, float, float]]:
+        """Every (estimator, eps, delta) with at least one part."""
+        found = []
+        for directory in sorted(self.root.glob("*/eps*_delta*")):
+            match = PARTITION_RE.fullmatch(directory.name)
+            if match and any(directory.glob("part-*.npz")):
+                found.append((directory.parent.name, float(match.group("eps")),
+                              float(match.group("delta"))))
+        return found
+
+    def append(self, estimator: str, eps: float, delta: float, **columns) -> Path:
+        """
+        Writes the rows given as equal-length columns (all of COLUMNS) as a
+        new part. The part appears atomically, under a unique name.
+        """
+        return self._write(estimator, eps, delta, time.time_ns(), columns)
+
+    def _write(self, estimator: str, eps: float, delta: float, stamp: int,
+               columns: Dict[str, Sequence]) -> Path:
+        missing = set(COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(sorted(missing))}")
+        arrays = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS.items()}
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"columns of different lengths: {sorted(lengths)}")
+
+        directory = self.partition_dir(estimator, eps, delta)
+        directory.mkdir(parents=True, exist_ok=True)
+        # The stamp orders the parts by append time (newest rows win)
+        name = f"part-{stamp:020d}-{uuid.uuid4().hex}.npz"
+        tmp = directory / f".{name}"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, directory / name)
+        return directory / name
+
+    def append_file(self, estimator: str, eps: float, delta: float, path: Path,
+                    values: Sequence[float], samples: Optional[Sequence[int]] = None,
+                    seconds: Optional[Sequence[float]] = None,
+                    hashes: Optional[Sequence[str]] = None) -> Path:
+        """
+        Appends one value per formula of a .bin file. hashes are the
+        formula_hash strings (computed from the file if not given). Rows
+        appended earlier for the same formulas of the file are superseded.
+        """
+        path = Path(path)
+        if hashes is None:
+            with DNFFile(path) as dnf:
+                hashes = [formula_hash(formula) for formula in dnf]
+        count = len(values)
+        clauses = CLAUSES_RE.search(path.name)
+        return self.append(
+            estimator, eps, delta,
+            instance=[path.name] * count,
+            formula=np.arange(count),
+            hash=[int(key[:16], 16) for key in hashes[:count]],
+            literals=np.full(count, num_vars_from_name(path)),
+            clauses=np.full(count, int(clauses.group("clauses")) if clauses else -1),
+            value=values,
+            samples=np.full(count, -1) if samples is None else samples,
+            seconds=np.full(count, np.nan) if seconds is None else seconds,
+        )
+
+    def load(self, estimator: str, eps: float, delta: float,
+             columns: Iterable[str] = ("literals", "clauses", "value")) -> Dict[str, np.ndarray]:
+        """
+        The requested columns of a partition, concatenated over its parts
+        (newest row of every (instance, formula, hash) only).
+        """
+        return self._read(self._parts(estimator, eps, delta), columns)
+
+    def compact(self, estimator: str, eps: float, delta: float) -> int:
+        """
+        Merges a partition's parts into one, dropping superseded rows;
+        returns the number of parts merged.
+        """
+        parts = self._parts(estimator, eps, delta)
+        if len(parts) > 1:
+            # Only the parts listed here are merged and removed: a part
+            # appended meanwhile by another job stays as it is, and stays
+            # newer than the merged part, which takes the newest stamp merged
+            self._write(estimator, eps, delta, _append_order(parts[-1])[0],
+                        self._read(parts, COLUMNS))
+            for part in parts:
+                part.unlink()
+        return len(parts)
+
+    def _parts(self, estimator: str, eps: float, delta: float) -> List[Path]:
+        """A partition's parts, oldest first."""
+        return sorted(self.partition_dir(estimator, eps, delta).glob("part-*.npz"),
+                      key=_append_order)
+
+    @staticmethod
+    def _read(parts: Sequence[Path], columns: Iterable[str]) -> Dict[str, np.ndarray]:
+        columns = list(columns)
+        # One part never repeats a row; across parts, the key columns are
+        # needed to drop the superseded ones
+        loaded = list(dict.fromkeys(columns + list(ROW_KEY))) if len(parts) > 1 else columns
+        chunks: Dict[str, List[np.ndarray]] = {name: [] for name in loaded}
+        for part in parts:
+            with np.load(part) as data:
+                for name in loaded:
+                    chunks[name].append(data[name])
+        result = {name: (np.concatenate(arrays) if arrays
+                         else np.empty(0, dtype=COLUMNS[name]))
+                  for name, arrays in chunks.items()}
+        if len(parts) > 1:
+            keep = _newest_rows(result)
+            result = {name: result[name][keep] for name in columns}
+        return result
+
+
+def _append_order(part: Path) -> Tuple[int, str]:
+    """Sort key of a part: its append stamp (0 for unstamped names), then its name."""
+    match = PART_RE.match(part.name)
+    return (int(match.group("stamp")) if match else 0), part.name
+
+
+def _newest_rows(data: Dict[str, np.ndarray]) -> np.ndarray:
+    """Indices of the last row of every (instance, formula, hash), in row order."""
+    _, instance_ids = np.unique(data["instance"], return_inverse=True)
+    _, hash_ids = np.unique(data["hash"], return_inverse=True)
+    # Dense ids keep both halves of each int64 key below 2^32
+    rows = (instance_ids.ravel().astype(np.int64) << 32) | data["formula"].astype(np.int64)
+    _, row_ids = np.unique(rows, return_inverse=True)
+    keys = (row_ids.ravel().astype(np.int64) << 32) | hash_ids.ravel()
+    # np.unique returns first occurrences; over the reversed keys, the last ones
+    _, last = np.unique(keys[::-1], return_index=True)
+    return np.sort(len(keys) - 1 - last)
+
+
+def mae_table(store: ResultStore, estimator: str, eps: float,
+              delta: float) -> Dict[str, np.ndarray]:
+    """
+    MAE and mean relative error per (literals, clauses), joining the
+    estimates with the exact counts on (formula hash, literals), all
+    vectorized: the count of a formula depends on its number of variables.
+    Formulas without an exact count are left out.
+    """
+    exact = store.load(*EXACT, columns=("hash", "literals", "value"))
+    est = store.load(estimator, eps, delta, columns=("hash", "literals", "clauses", "value"))
+
+    # One int64 key per (hash, literals): dense hash ids in the high half
+    _, ids = np.unique(np.concatenate((exact["hash"], est["hash"])), return_inverse=True)
+    keys = (ids.ravel().astype(np.int64) << 32) | np.concatenate((exact["literals"],
+                                                                 est["literals"]))
+    truth_keys, first = np.unique(keys[:len(exact["hash"])], return_index=True)
+    est_keys = keys[len(exact["hash"]):]
+    truth = exact["value"][first]
+    at = np.minimum(np.searchsorted(truth_keys, est_keys), max(len(truth_keys) - 1, 0))
+    known = (truth_keys[at] == est_keys if len(truth_keys)
+             else np.zeros(len(est_keys), dtype=bool))
+    errors = np.abs(est["value"][known] - truth[at[known]])
+    relative = np.divide(errors, truth[at[known]], out=np.zeros_like(errors),
+                         where=truth[at[known]] != 0)
+
+    # One int64 key per (literals, clauses) pair
+    pairs = (est["literals"][known].astype(np.int64) << 32) + est["clauses"][known] + (1 << 31)
+    groups, inverse = np.unique(pairs, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    return {
+        "literals": (groups >> 32).astype(np.int32),
+        "clauses": ((groups & 0xFFFFFFFF) - (1 << 31)).astype(np.int32),
+        "formulas": counts,
+        "mae": np.bincount(inverse, weights=errors, minlength=len(groups)) / counts,
+        "mean_rel_error": np.bincount(inverse, weights=relative, minlength=len(groups)) / counts,
+    }
+
+
+def file_totals(store: ResultStore, estimator: str, eps: float,
+                delta: float) -> Dict[str, np.ndarray]:
+    """
+    One row per file of a partition, like a run_sweep summary row: total
+    seconds and mean samples per formula (rows with unknown values skipped).
+    """
+    data = store.load(estimator, eps, delta,
+                      columns=("instance", "literals", "clauses", "samples", "seconds"))
+    files, first, inverse = np.unique(data["instance"], return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    has_samples = data["samples"] >= 0
+    sample_counts = np.bincount(inverse[has_samples], minlength=len(files))
+    sample_sums = np.bincount(inverse[has_samples], weights=data["samples"][has_samples],
+                              minlength=len(files))
+    timed = ~np.isnan(data["seconds"])
+    return {
+        "file": files,
+        "literals": data["literals"][first],
+        "clauses": data["clauses"][first],
+        "formulas": np.bincount(inverse, minlength=len(files)),
+        "samples_used": np.divide(sample_sums, sample_counts,
+                                  out=np.full(len(files), np.nan), where=sample_counts > 0),
+        "seconds": np.bincount(inverse[timed], weights=data["seconds"][timed],
+                               minlength=len(files)),
+    }
+
+
+def import_results(store: ResultStore, paths: Iterable[Path], truth_dir: Optional[Path],
+                   monte_dir: Optional[Path]) -> None:
+    """Loads <file>_sol.txt and MonteCarloCounter's <file>_kl<eps>_<delta>.txt into the store."""
+    for path in paths:
+        with DNFFile(path) as dnf:
+            hashes = [formula_hash(formula) for formula in dnf]
+        imported = []
+        for estimator, eps, delta, source in text_results(path, truth_dir, monte_dir):
+            store.append_file(estimator, eps, delta, path, read_numbers(source), hashes=hashes)
+            imported.append(source.name)
+        print(f"{path.name}: {len(hashes)} formulas"
+              + (f", imported {', '.join(imported)}" if imported else ""))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect or fill the columnar result store.")
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import existing text results for .bin files.")
+    importer.add_argument("paths", type=Path, nargs="+", help=".bin files the results belong to.")
+    importer.add_argument("--truth-dir", type=Path, default=BASE_DIR / "Output",
+                          help="Directory of <file>_sol.txt ground truth.")
+    importer.add_argument("--monte-dir", type=Path, default=BASE_DIR / "OutputMonte",
+                          help="Directory of MonteCarloCounter <file>_kl<eps>_<delta>.txt outputs.")
+
+    commands.add_parser("compact", help="Merge the parts of every partition.")
+    commands.add_parser("summary", help="Print the partitions and their sizes.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    store = ResultStore(args.store)
+    if args.command == "import":
+        import_results(store, args.paths, args.truth_dir, args.monte_dir)
+    elif args.command == "compact":
+        for partition in store.partitions():
+            merged = store.compact(*partition)
+            print(f"{partition[0]} eps={partition[1]:g} delta={partition[2]:g}: "
+                  f"merged {merged} parts")
+    else:
+        for partition in store.partitions():
+            parts = len(list(store.partition_dir(*partition).glob("part-*.npz")))
+            rows = len(store.load(*partition, columns=("formula",))["formula"])
+            print(f"{partition[0]} eps={partition[1]:g} delta={partition[2]:g}: "
+                  f"{rows} rows in {parts} parts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Parallel driver for DNF counting sweeps.
+
+Discovers the Data/*.bin instances and runs every (file, eps, delta,
+estimator) job of the grid, several at a time. Each job is its own process
+(the C++ MonteCarloCounter binary, or klm_packed.py), so a per-job timeout
+can kill it cleanly; the pool only waits on them. Rows are appended to the
+summary CSV as soon as a job ends, and a rerun skips every job already in
+the CSV, so an interrupted sweep resumes where it stopped:
+
+    python run_sweep.py --eps 0.1 0.05 --delta 0.1 0.05 --estimators monte coverage
+
+The CSV keeps the columns plot_monte_summary.py and plot_time_bars.py read
+(file, status, seconds, samples_used) plus the job parameters and the mean
+estimate over the file's formulas.
+
+With --cache the per-formula estimates also go to the result cache
+(result_cache.py), and a job is skipped when the cache already holds an
+estimate for every formula of its file, whichever file or sweep produced it.
+--store appends them to the columnar result store (result_store.py); each
+job adds a part, and the partitions the sweep touched are compacted at the end.
+"""
+import argparse
+import csv
+import itertools
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from dnf_format import num_vars_from_name
+from result_cache import ResultCache
+from result_store import ResultStore
+
+BASE_DIR = Path(__file__).resolve().parent
+
+FIELDS = ["file", "num_vars", "eps", "delta", "estimator", "status", "seconds",
+          "samples_used", "estimate", "output"]
+
+ESTIMATE_RE = re.compile(r"satisfying assignments \(approx\): (?P<value>\S+)")
+MONTE_SAMPLES_RE = re.compile(r"^(?P<m>\d+)$", re.MULTILINE)
+PACKED_SAMPLES_RE = re.compile(r"^(?P<total>\d+) samples in", re.MULTILINE)
+
+# Estimator names in the result cache and store (klm_packed.cache_name)
+CACHE_NAMES = {"monte": "monte", "coverage": "coverage", "first": "first",
+               "dklr": "coverage+dklr"}
+
+
+class Job(NamedTuple):
+    file: Path
+    eps: float
+    delta: float
+    estimator: str          # "monte" (C++), or "coverage"/"first"/"dklr" (klm_packed.py)
+
+    @property
+    def name(self) -> str:
+        """The file as recorded in the CSV: relative to this directory when inside it."""
+        try:
+            return str(self.file.relative_to(BASE_DIR))
+        except ValueError:
+            return str(self.file)
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        return (self.name, f"{self.eps:g}", f"{self.delta:g}", self.estimator)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run a DNF counting parameter sweep in parallel.")
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR / "Data")
+    parser.add_argument("--pattern", default="*.bin", help="Glob for instances inside --data-dir.")
+    parser.add_argument("--eps", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--delta", type=float, nargs="+", default=[0.1])
+    parser.add_argument(
+        "--estimators",
+        nargs="+",
+        choices=["monte", "coverage", "first", "dklr"],
+        default=["monte"],
+        help=("monte = MonteCarloCounter binary; coverage/first = klm_packed.py estimators; "
+              "dklr = coverage with the stopping rule."),
+    )
+    parser.add_argument("--monte-binary", type=Path, default=BASE_DIR / "MonteCarloCounter")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds per job.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=BASE_DIR / "monte_summary_sweep.csv",
+        help="Summary CSV (appended to; finished jobs are skipped on rerun).",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Rerun jobs whose recorded status is not 'ok'.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="Result cache (result_cache.py): store estimates, skip jobs it already covers.",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Columnar result store (result_store.py) to append the estimates to.",
+    )
+    return parser.parse_args()
+
+
+def finished_jobs(csv_path: Path, retry_failed: bool) -> Set[Tuple[str, str, str, str]]:
+    if not csv_path.exists():
+        return set()
+    done = set()
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if retry_failed and row["status"] != "ok":
+                continue
+            done.add((row["file"], f"{float(row['eps']):g}", f"{float(row['delta']):g}",
+                      row["estimator"]))
+    return done
+
+
+def build_command(job: Job, monte_binary: Path, cache: Optional[Path] = None,
+                  store: Optional[Path] = None) -> Tuple[List[str], Path]:
+    """The command line of a job and the file its per-formula estimates land in."""
+    if job.estimator == "monte":
+        out = (BASE_DIR / "OutputMonte" /
+               f"{job.file.name}_kl{job.eps:.2f}_{job.delta:.2f}.txt")
+        return [str(monte_binary), str(job.eps), str(job.delta), str(job.file)], out
+    out_dir = BASE_DIR / "OutputKLMPacked" / job.estimator
+    command = [sys.executable, str(BASE_DIR / "klm_packed.py"), str(job.file),
+               "--eps", str(job.eps), "--delta", str(job.delta), "--output-dir", str(out_dir)]
+    if job.estimator == "dklr":
+        command += ["--estimator", "coverage", "--stopping", "dklr"]
+        suffix = "_dklr"
+    else:
+        command += ["--estimator", job.estimator]
+        suffix = ""
+    if cache is not None:
+        command += ["--cache", str(cache)]
+    if store is not None:
+        command += ["--store", str(store)]
+    out = out_dir / f"{job.file.name}_klm{job.eps:.2f}_{job.delta:.2f}{suffix}.txt"
+    return command, out
+
+
+def run_job(job: Job, monte_binary: Path, timeout: float, cache: Optional[Path] = None,
+            store: Optional[Path] = None) -> Dict[str, object]:
+    command, out_path = build_command(job, monte_binary, cache, store)
+    row: Dict[str, object] = {
+        "file": job.name, "num_vars": num_vars_from_name(job.file), "eps": job.eps,
+        "delta": job.delta, "estimator": job.estimator, "samples_used": "",
+        "estimate": "", "output": str(out_path),
+    }
+    start = time.perf_counter()
+    try:
+        # cwd=BASE_DIR: MonteCarloCounter writes OutputMonte/ relative to it
+        proc = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True,
+                              timeout=timeout)
+    except subprocess.TimeoutExpired:
+        row.update(status="timeout", seconds=f"{time.perf_counter() - start:.6f}")
+        return row
+    except OSError as e:
+        row.update(status=f"error: {e.strerror}", seconds="0")
+        return row
+    row["seconds"] = f"{time.perf_counter() - start:.6f}"
+
+    estimates = [float(m.group("value")) for m in ESTIMATE_RE.finditer(proc.stdout)]
+    if proc.returncode != 0 or "Error reading" in proc.stderr:
+        row["status"] = "error"
+    else:
+        row["status"] = "ok"
+    if estimates:
+        row["estimate"] = sum(estimates) / len(estimates)
+        if job.estimator == "monte":
+            # MonteCarloCounter prints m before every formula; all share the clause count
+            samples = MONTE_SAMPLES_RE.findall(proc.stdout)
+            row["samples_used"] = int(samples[-1]) if samples else ""
+        else:
+            match = PACKED_SAMPLES_RE.search(proc.stdout)
+            row["samples_used"] = int(match.group("total")) // len(estimates) if match else ""
+    return row
+
+
+def cached_jobs(cache: ResultCache, jobs: List[Job]) -> Set[Job]:
+    """Jobs whose every formula already has an estimate in the cache."""
+    keys = {}
+    for path in sorted({job.file for job in jobs}):
+        keys[path] = cache.register_file(path, num_vars_from_name(path))
+    cache.commit()
+    return {job for job in jobs
+            if None not in cache.estimate_many(keys[job.file], num_vars_from_name(job.file),
+                                               CACHE_NAMES[job.estimator], job.eps, job.delta)}
+
+
+def store_monte_estimates(cache: Optional[ResultCache], store: Optional[ResultStore], job: Job,
+                          row: Dict[str, object]) -> None:
+    """
+    klm_packed.py jobs write the cache and store themselves; MonteCarloCounter's
+    estimates are read back from its output file (the job time is split evenly
+    over the formulas).
+    """
+    out_path = Path(str(row["output"]))
+    if job.estimator != "monte" or row["status"] != "ok" or not out_path.exists():
+        return
+    num_vars = num_vars_from_name(job.file)
+    estimates = [float(value) for value in out_path.read_text().split()]
+    samples = row["samples_used"] or None
+    hashes = None
+    if cache is not None:
+        hashes = cache.register_file(job.file, num_vars)
+        for key, estimate in zip(hashes, estimates):
+            cache.put_estimate(key, num_vars, "monte", job.eps, job.delta, estimate, samples)
+        cache.commit()
+    if store is not None and estimates:
+        count = len(estimates)
+        store.append_file("monte", job.eps, job.delta, job.file, estimates,
+                          samples=[samples or -1] * count,
+                          seconds=[float(row["seconds"]) / count] * count, hashes=hashes)
+
+
+def main() -> None:
+    args = parse_args()
+    # Absolute paths: jobs run with cwd=BASE_DIR
+    files = sorted(p.resolve() for p in args.data_dir.glob(args.pattern))
+    if not files:
+        raise SystemExit(f"No instances matching {args.pattern} in {args.data_dir}")
+    args.monte_binary = args.monte_binary.resolve()
+    if "monte" in args.estimators and not args.monte_binary.exists():
+        raise SystemExit(f"{args.monte_binary} not found (build MonteCarloCounter.cpp first)")
+
+    grid = [Job(f, eps, delta, est) for f, eps, delta, est in
+            itertools.product(files, args.eps, args.delta, args.estimators)]
+    done = finished_jobs(args.output, args.retry_failed)
+    pending = [job for job in grid if job.key not in done]
+    cache = None
+    store = None
+    if args.store is not None:
+        args.store = args.store.resolve()
+        store = ResultStore(args.store)
+    if args.cache is not None:
+        args.cache = args.cache.resolve()
+        cache = ResultCache(args.cache)
+        in_cache = cached_jobs(cache, pending)
+        pending = [job for job in pending if job not in in_cache]
+        print(f"{len(in_cache)} jobs covered by the cache {args.cache}")
+    print(f"{len(grid)} jobs in the grid, {len(grid) - len(pending)} already done, "
+          f"running {len(pending)} on {args.jobs} workers")
+    if not pending:
+        if cache is not None:
+            cache.close()
+        return
+
+    write_header = not args.output.exists() or args.output.stat().st_size == 0
+    wall_start = time.perf_counter()
+    busy_seconds = 0.0
+    with open(args.output, "a", newline="") as f, \
+            ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if write_header:
+            writer.writeheader()
+        futures = {pool.submit(run_job, job, args.monte_binary, args.timeout, args.cache,
+                               args.store): job
+                   for job in pending}
+        for count, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            writer.writerow(row)
+            f.flush()
+            store_monte_estimates(cache, store, futures[future], row)
+            busy_seconds += float(row["seconds"])
+            print(f"[{count}/{len(pending)}] {Path(row['file']).name} eps={row['eps']} "
+                  f"delta={row['delta']} {row['estimator']}: {row['status']} "
+                  f"({float(row['seconds']):.2f}s)")
+
+    if cache is not None:
+        cache.close()
+    if store is not None:
+        for partition in {(CACHE_NAMES[job.estimator], job.eps, job.delta) for job in pending}:
+            store.compact(*partition)
+    wall = time.perf_counter() - wall_start
+    print(f"Done in {wall:.2f}s wall, {busy_seconds:.2f}s of job time "
+          f"({busy_seconds / wall if wall else 0:.2f}x). Summary: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
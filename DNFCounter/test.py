@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dnf_format import DNFFile, write_formulas
+from exact_count import count_models
+from klm_packed import build_coverage_index, klm_estimate, pack_formula, satisfied
+from result_store import EXACT, ResultStore, mae_table
+
+# 1. A formula with contradictory clauses (x & ~x) among ordinary ones
+num_vars = 6
+clauses = [
+    [(1, 0), (1, 1)],            # x1 & ~x1
+    [(2, 0), (3, 1)],            # x2 & ~x3
+    [(1, 0), (4, 0)],            # x1 & x4
+    [(5, 1), (6, 0), (5, 0)],    # ~x5 & x6 & x5
+    [(6, 1)],                    # ~x6
+]
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "contradictions.bin")
+    write_formulas(path, [clauses])
+    with DNFFile(path) as dnf:
+        formula = dnf[0]
+        expected = count_models(formula, num_vars)
+
+        # 2. No assignment satisfies a contradictory clause, x = 1 included
+        packed = pack_formula(formula, num_vars)
+        assignments = np.arange(1 << num_vars, dtype=np.uint64)[:, None]
+        sat = satisfied(packed, assignments)
+        assert not sat[:, 0].any() and not sat[:, 3].any()
+        assert int(np.count_nonzero(sat.any(axis=1))) == expected
+
+        # The coverage index agrees with the mask scan on every assignment
+        alive = build_coverage_index(packed).alive(assignments)
+        bits = np.unpackbits(alive.astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        assert np.array_equal(bits[:, :packed.num_clauses].astype(bool), sat)
+
+        # 3. Both estimators, index and scan paths, against the exact count
+        for estimator in ("coverage", "first"):
+            for use_index in (False, True):
+                result = klm_estimate(formula, num_vars, samples=200000, estimator=estimator,
+                                      rng=np.random.default_rng(0), use_index=use_index)
+                print(f"{estimator} (index={use_index}): {result.estimate:.2f} (exact {expected})")
+                assert abs(result.estimate - expected) <= 0.02 * expected
+
+print("SUCCESS: contradictory clauses are never satisfied.")
+
+# 4. The MAE join keys on (hash, literals): the same clauses over 10 and
+#    20 variables are different formulas with different counts
+def rows(literals, values, first=0):
+    return dict(instance=["f.bin"] * len(values), formula=first + np.arange(len(values)),
+                hash=[7] * len(values), literals=literals, clauses=[1] * len(values),
+                value=values, samples=[-1] * len(values), seconds=[np.nan] * len(values))
+
+with tempfile.TemporaryDirectory() as tmp:
+    store = ResultStore(tmp)
+    store.append(*EXACT, **rows([10, 20], [512.0, 524288.0]))
+    store.append("monte", 0.1, 0.1, **rows([20], [524300.0]))
+    store.append("monte", 0.1, 0.1, **rows([10], [500.0], first=1))
+    table = mae_table(store, "monte", 0.1, 0.1)
+    assert table["literals"].tolist() == [10, 20]
+    assert table["mae"].tolist() == [12.0, 12.0]
+
+    # compact merges the parts without losing or duplicating a row
+    assert store.compact("monte", 0.1, 0.1) == 2
+    assert sorted(store.load("monte", 0.1, 0.1)["value"].tolist()) == [500.0, 524300.0]
+
+    # A re-run replaces its earlier rows instead of counting them twice
+    store.append("monte", 0.1, 0.1, **rows([10], [510.0], first=1))
+    assert sorted(store.load("monte", 0.1, 0.1)["value"].tolist()) == [510.0, 524300.0]
+    assert mae_table(store, "monte", 0.1, 0.1)["mae"].tolist() == [2.0, 12.0]
+    assert store.compact("monte", 0.1, 0.1) == 2
+    assert sorted(store.load("monte", 0.1, 0.1)["value"].tolist()) == [510.0, 524300.0]
+
+print("SUCCESS: the result store joins estimates on (hash, literals).")
@@ -1,48 +1,63 @@
+import argparse
 import sys
 import os
 import time
+import random
 import csv
+import tempfile
+import numpy as np
 import matplotlib.pyplot as plt
 
 # Fix import path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.utils import Metrics, TrackedInt
+from src.utils import Metrics, TrackedInt, Probe
 from src.quickselect import randomized_quickselect
 from src.median_of_3 import median_of_3_quickselect
 from src.median_of_medians import median_of_medians_quickselect
 from src.floyd_rivest import floyd_rivest_quickselect
 from src.introselect import introselect
+from src.fast_deterministic import fast_deterministic_select
+from src.tracked_array import TrackedArray
+from src.parallel_select import parallel_select
+from src.external_select import select_from_file, ScanStats
+from src.radix_select import radix_select
+from src.rolling_median import RollingMedian, rolling_median
+from src.segmented import segmented_select
+from src.order_statistic import IndexableSkiplist
+from src.selector import Selector
+from src.argselect import argselect, weighted_select
 
 from experiments.data_generator import (
     generate_uniform_random, 
     generate_sorted, 
-    generate_adversarial_sequence
+    generate_adversarial_sequence,
+    generate_low_cardinality,
+    generate_uniform_array,
+    generate_antiselect
 )
 
 # Ensure results directories exist
 os.makedirs("results/plots", exist_ok=True)
 os.makedirs("results/raw_data", exist_ok=True)
 
-def measure_performance(algo, data, k):
+def measure_performance(algo, data, k, probe=None):
     """
-    Double-Pass Measurement:
-    1. Runs with raw ints to measure accurate TIME.
-    2. Runs with TrackedInts to measure accurate COMPARISONS.
+    Single-Pass Measurement:
+    Runs once on raw ints with a Probe injected. The probe counts comparisons,
+    swaps and depth inside the kernels at (almost) no cost, so the same run
+    gives accurate TIME and COMPARISONS - no TrackedInt second pass.
+    
+    Pass your own `probe` to also read swaps / max_depth afterwards.
     """
-    # --- Pass 1: Measure Time (Raw Integers) ---
-    data_for_time = data[:] 
+    if probe is None:
+        probe = Probe()
+    data_for_run = data[:] 
     start = time.perf_counter()
-    algo(data_for_time, k)
+    algo(data_for_run, k, probe=probe)
     duration = time.perf_counter() - start
 
-    # --- Pass 2: Measure Comparisons (TrackedInts) ---
-    Metrics.reset()
-    data_for_comps = [TrackedInt(x) for x in data] 
-    algo(data_for_comps, k)
-    comparisons = Metrics.comparisons
-
-    return duration, comparisons
+    return duration, probe.comparisons
 
 def save_csv(filename, headers, rows):
     path = os.path.join("results/raw_data", filename)
@@ -251,12 +266,764 @@ def exp_practicality_check():
     plt.savefig("results/plots/Exp4_Practicality_Check.png")
     plt.close()
 
+# ==========================================
+# EXPERIMENT 5: Recursion-Free Kernels
+# All selectors on a 10^6 killer sequence, default recursion limit
+# ==========================================
+def exp_recursion_free():
+    print("\n--- Running Exp V: Recursion-Free Kernels (Killer, N=10^6) ---")
+    N = 1000000
+    k = N // 2
+    data = generate_adversarial_sequence(N)
+
+    algos = [
+        ("Rand QS", randomized_quickselect),
+        ("Median-3", median_of_3_quickselect),
+        ("MoM", median_of_medians_quickselect),
+        ("Introselect", introselect),
+    ]
+
+    # The kernels are loops now, so the interpreter default is enough.
+    print(f"  Recursion limit: {sys.getrecursionlimit()}")
+
+    csv_rows = []
+    for label, algo in algos:
+        data_for_time = data[:]
+        start = time.perf_counter()
+        algo(data_for_time, k)
+        duration = time.perf_counter() - start
+        csv_rows.append([label, N, duration])
+        print(f"  {label}: {duration:.3f}s")
+
+    save_csv("exp5_recursion_free.csv", ["Algorithm", "N", "Time"], csv_rows)
+
+# ==========================================
+# EXPERIMENT 6: Duplicate-Heavy Inputs
+# Few distinct values, where two-way partitions go quadratic
+# ==========================================
+def exp_low_cardinality():
+    print("\n--- Running Exp VI: Low Cardinality (16 distinct values) ---")
+    sizes = [1000, 5000, 10000, 20000]
+
+    algos = [
+        ("Rand QS", randomized_quickselect),
+        ("Median-3", median_of_3_quickselect),
+        ("MoM", median_of_medians_quickselect),
+        ("Introselect", introselect),
+    ]
+
+    csv_rows = []
+    for n in sizes:
+        data = generate_low_cardinality(n)
+        k = n // 2
+        for label, algo in algos:
+            t, c = measure_performance(algo, data, k)
+            csv_rows.append([label, n, t, c])
+        print(f"N={n} processed.")
+
+    save_csv("exp6_low_cardinality.csv", ["Algorithm", "N", "Time", "Comparisons"], csv_rows)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    for label, _ in algos:
+        rows = [r for r in csv_rows if r[0] == label]
+        ax1.plot(sizes, [r[2] for r in rows], marker='o', label=label)
+        ax2.plot(sizes, [r[3] for r in rows], marker='o', label=label)
+
+    ax1.set_title('Time on Low-Cardinality Data')
+    ax1.set_xlabel('N')
+    ax1.set_ylabel('Seconds')
+    ax1.legend()
+    ax1.grid(True)
+
+    ax2.set_title('Comparisons on Low-Cardinality Data')
+    ax2.set_xlabel('N')
+    ax2.set_ylabel('Count')
+    ax2.legend()
+    ax2.grid(True)
+
+    plt.tight_layout()
+    plt.savefig("results/plots/Exp6_Low_Cardinality.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 7: Instrumentation Overhead
+# Plain run vs Probe run vs the old TrackedInt pass
+# ==========================================
+def exp_probe_overhead():
+    print("\n--- Running Exp VII: Instrumentation Overhead (Uniform, N=50000) ---")
+    N = 50000
+    k = N // 2
+    data = generate_uniform_random(N)
+
+    algos = [
+        ("Rand QS", randomized_quickselect),
+        ("Median-3", median_of_3_quickselect),
+        ("MoM", median_of_medians_quickselect),
+        ("Floyd-Rivest", floyd_rivest_quickselect),
+        ("Introselect", introselect),
+    ]
+
+    csv_rows = []
+    for label, algo in algos:
+        # 1. Uninstrumented fast path
+        data_for_time = data[:]
+        start = time.perf_counter()
+        algo(data_for_time, k)
+        t_plain = time.perf_counter() - start
+
+        # 2. One instrumented run (what measure_performance does now)
+        probe = Probe()
+        t_probe, _ = measure_performance(algo, data, k, probe)
+
+        # 3. The old second pass: wrap every element, count via TrackedInt
+        Metrics.reset()
+        start = time.perf_counter()
+        data_for_comps = [TrackedInt(x) for x in data]
+        algo(data_for_comps, k)
+        t_tracked = time.perf_counter() - start
+
+        csv_rows.append([label, t_plain, t_probe, t_tracked,
+                         probe.comparisons, probe.swaps, probe.max_depth])
+        print(f"  {label}: plain {t_plain:.4f}s, probe {t_probe:.4f}s, "
+              f"old double pass {t_plain + t_tracked:.4f}s")
+
+    save_csv("exp7_probe_overhead.csv",
+             ["Algorithm", "Plain_Time", "Probe_Time", "TrackedInt_Time",
+              "Comparisons", "Swaps", "Max_Depth"], csv_rows)
+
+# ==========================================
+# EXPERIMENT 8: Convergence at Scale
+# Exp III repeated up to N=10^7 on a TrackedArray (bulk counting)
+# ==========================================
+def exp_convergence_large():
+    print("\n--- Running Exp VIII: Convergence at Scale (TrackedArray) ---")
+    sizes = [10**5, 10**6, 10**7]
+
+    csv_rows = []
+    for n in sizes:
+        data = generate_uniform_array(n)
+        k = n // 2
+        for label, algo in [("Quickselect", randomized_quickselect),
+                            ("Floyd-Rivest", floyd_rivest_quickselect)]:
+            arr = TrackedArray(data)
+            start = time.perf_counter()
+            algo(arr, k, probe=arr)
+            duration = time.perf_counter() - start
+            csv_rows.append([label, n, duration, arr.comparisons, arr.comparisons / n])
+        print(f"N={n} processed.")
+
+    save_csv("exp8_convergence_large.csv",
+             ["Algorithm", "N", "Time", "Comparisons", "C_per_N"], csv_rows)
+
+    plt.figure(figsize=(8, 5))
+    for label in ("Quickselect", "Floyd-Rivest"):
+        rows = [r for r in csv_rows if r[0] == label]
+        plt.plot([r[1] for r in rows], [r[4] for r in rows], marker='o', label=label)
+    plt.axhline(y=1.5, color='g', linestyle='--', alpha=0.5, label='Theoretical 1.5')
+    plt.axhline(y=3.38, color='b', linestyle='--', alpha=0.5, label='Theoretical 3.38')
+    plt.xscale('log')
+    plt.title('Comparisons per Element (C/N), TrackedArray')
+    plt.xlabel('N')
+    plt.ylabel('C / N')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp8_Convergence_Large.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 9: Parallel Speedup
+# parallel_select on 1..cores processes vs single-core Floyd-Rivest
+# ==========================================
+def exp_parallel_speedup(N=10**7):
+    print(f"\n--- Running Exp IX: Parallel Speedup (Uniform, N={N}) ---")
+    k = N // 2
+    data = generate_uniform_array(N)
+
+    # Baseline: the single-core selector on a plain list
+    data_list = data.tolist()
+    start = time.perf_counter()
+    expected = floyd_rivest_quickselect(data_list, k)
+    t_fr = time.perf_counter() - start
+    del data_list
+    print(f"  Floyd-Rivest (1 core): {t_fr:.3f}s")
+
+    cores = list(range(1, (os.cpu_count() or 1) + 1))
+    csv_rows = []
+    for workers in cores:
+        start = time.perf_counter()
+        result = parallel_select(data, k, workers=workers)
+        duration = time.perf_counter() - start
+        assert result == expected
+        csv_rows.append([workers, duration, t_fr / duration])
+        print(f"  {workers} worker(s): {duration:.3f}s ({t_fr / duration:.1f}x vs FR)")
+
+    save_csv("exp9_parallel_speedup.csv", ["Workers", "Time", "Speedup_vs_FR"], csv_rows)
+
+    t_one = csv_rows[0][1]
+    plt.figure(figsize=(8, 5))
+    plt.plot(cores, [r[2] for r in csv_rows], marker='o', label='vs Floyd-Rivest (1 core)')
+    plt.plot(cores, [t_one / r[1] for r in csv_rows], marker='s', label='vs parallel_select (1 worker)')
+    plt.plot(cores, cores, color='g', linestyle='--', alpha=0.5, label='Linear')
+    plt.title(f'Parallel Selection Speedup (N={N})')
+    plt.xlabel('Worker processes')
+    plt.ylabel('Speedup')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp9_Parallel_Speedup.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 10: Out-of-Core Selection
+# select_from_file on a raw int64 dump, written chunk by chunk
+# so N can exceed physical RAM
+# ==========================================
+def exp_out_of_core(N=2 * 10**8, path=None):
+    print(f"\n--- Running Exp X: Out-of-Core Selection (int64 file, N={N}) ---")
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+
+    chunk = 1 << 22
+    with open(path, "wb") as f:
+        for start in range(0, N, chunk):
+            generate_uniform_array(min(chunk, N - start)).tofile(f)
+    size_gb = os.path.getsize(path) / 1e9
+    print(f"  Wrote {size_gb:.2f} GB to {path}")
+
+    csv_rows = []
+    try:
+        for label, k in [("min", 0), ("median", N // 2), ("p99", int(N * 0.99))]:
+            stats = ScanStats()
+            start = time.perf_counter()
+            select_from_file(path, k, stats=stats)
+            duration = time.perf_counter() - start
+            throughput = stats.bytes_read / duration / 1e9
+            csv_rows.append([label, N, duration, stats.passes, stats.bytes_read,
+                             stats.band_size, throughput])
+            print(f"  {label}: {duration:.2f}s, {stats.passes} pass(es), "
+                  f"{stats.bytes_read / 1e9:.2f} GB read ({throughput:.2f} GB/s)")
+    finally:
+        os.remove(path)
+
+    save_csv("exp10_out_of_core.csv",
+             ["Rank", "N", "Time", "Passes", "Bytes_Read", "Band_Size", "GB_per_s"], csv_rows)
+
+# ==========================================
+# EXPERIMENT 11: Radix Select vs Floyd-Rivest
+# Time and memory traffic on bounded integers (0..10^6)
+# ==========================================
+def exp_radix_vs_floyd_rivest():
+    print("\n--- Running Exp XI: Radix Select vs Floyd-Rivest (Uniform ints) ---")
+    sizes = [10**4, 10**5, 10**6, 10**7]
+
+    csv_rows = []
+    for n in sizes:
+        data = generate_uniform_array(n)
+        k = n // 2
+
+        # Floyd-Rivest on a list: traffic ~ one 8-byte slot read per
+        # comparison, two reads + two writes per swap
+        probe = Probe()
+        t_fr, _ = measure_performance(floyd_rivest_quickselect, data.tolist(), k, probe)
+        fr_bytes = 8 * (probe.comparisons + 4 * probe.swaps)
+
+        # Radix select on the int64 array: bytes of keys scanned per pass
+        stats = ScanStats()
+        start = time.perf_counter()
+        radix_select(data, k, stats=stats)
+        t_radix = time.perf_counter() - start
+
+        csv_rows.append([n, t_fr, fr_bytes, t_radix, stats.bytes_read, stats.passes])
+        print(f"  N={n}: FR {t_fr:.4f}s / {fr_bytes / 1e6:.1f} MB, "
+              f"Radix {t_radix:.4f}s / {stats.bytes_read / 1e6:.1f} MB in {stats.passes} passes")
+
+    save_csv("exp11_radix_vs_fr.csv",
+             ["N", "FR_Time", "FR_Bytes", "Radix_Time", "Radix_Bytes", "Radix_Passes"], csv_rows)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    ax1.loglog(sizes, [r[1] for r in csv_rows], marker='o', label='Floyd-Rivest')
+    ax1.loglog(sizes, [r[3] for r in csv_rows], marker='s', label='Radix Select')
+    ax1.set_title('Time')
+    ax1.set_xlabel('N')
+    ax1.set_ylabel('Seconds')
+    ax1.legend()
+    ax1.grid(True)
+
+    ax2.loglog(sizes, [r[2] for r in csv_rows], marker='o', label='Floyd-Rivest (est.)')
+    ax2.loglog(sizes, [r[4] for r in csv_rows], marker='s', label='Radix Select')
+    ax2.set_title('Memory Traffic')
+    ax2.set_xlabel('N')
+    ax2.set_ylabel('Bytes')
+    ax2.legend()
+    ax2.grid(True)
+
+    plt.tight_layout()
+    plt.savefig("results/plots/Exp11_Radix_vs_FR.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 12: Rolling Median
+# Cost per sample over a window sweep: introselect per window,
+# vectorized np.median, and the indexable skiplist
+# ==========================================
+def exp_rolling_median(N=2 * 10**5):
+    print("\n--- Running Exp XII: Rolling Median (Window Size Sweep) ---")
+    windows = [10, 100, 1000, 10**4, 10**5]
+    # The O(W)-per-sample methods are timed on this many windows only
+    capped = 2000
+    values = generate_uniform_array(N).astype(float)
+
+    csv_rows = []
+    for w in windows:
+        outputs = N - w + 1
+
+        # Baseline: copy every window and re-run introselect on it
+        data = values.tolist()
+        m = min(outputs, capped)
+        start = time.perf_counter()
+        for i in range(m):
+            window = data[i:i + w]
+            introselect(window, w // 2)
+        t_naive = (time.perf_counter() - start) / m
+
+        # Vectorized: np.median over sliding window views
+        m = min(outputs, capped)
+        start = time.perf_counter()
+        rolling_median(values[:m + w - 1], w, method="vectorized")
+        t_vector = (time.perf_counter() - start) / m
+
+        # Skiplist: O(log W) push/evict/select per sample
+        rm = RollingMedian(w)
+        start = time.perf_counter()
+        for x in data[:w - 1]:
+            rm.push(x)
+        for x in data[w - 1:]:
+            rm.push(x)
+            rm.median()
+        t_skip = (time.perf_counter() - start) / outputs
+
+        csv_rows.append([w, t_naive, t_vector, t_skip])
+        print(f"  W={w}: per sample Naive {t_naive * 1e6:.1f}us, "
+              f"Vectorized {t_vector * 1e6:.1f}us, Skiplist {t_skip * 1e6:.1f}us")
+
+    save_csv("exp12_rolling_median.csv",
+             ["Window", "Naive_Introselect_s", "Vectorized_s", "Skiplist_s"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    plt.loglog(windows, [r[1] * 1e6 for r in csv_rows], marker='o', label='Introselect per Window')
+    plt.loglog(windows, [r[2] * 1e6 for r in csv_rows], marker='s', label='Vectorized np.median')
+    plt.loglog(windows, [r[3] * 1e6 for r in csv_rows], marker='^', label='Indexable Skiplist')
+    plt.title(f'Rolling Median Cost per Sample (N={N})')
+    plt.xlabel('Window Size W')
+    plt.ylabel('Microseconds per Sample')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp12_Rolling_Median.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 13: Hybrid Introselect
+# Introselect vs Floyd-Rivest vs Median of Medians up to N=10^7
+# ==========================================
+def exp_hybrid_introselect():
+    print("\n--- Running Exp XIII: Hybrid Introselect vs FR vs MoM ---")
+    sizes = [10**5, 10**6, 10**7]
+    # Median of Medians is only run up to this size (pure Python, ~20x slower)
+    mom_limit = 10**6
+    inputs = [("Uniform", generate_uniform_random),
+              ("Adversarial", generate_adversarial_sequence)]
+    algos = [("Introselect", introselect),
+             ("Floyd-Rivest", floyd_rivest_quickselect),
+             ("Median of Medians", median_of_medians_quickselect)]
+
+    csv_rows = []
+    for dist, gen in inputs:
+        for n in sizes:
+            data = gen(n)
+            k = n // 2
+            for label, algo in algos:
+                if algo is median_of_medians_quickselect and n > mom_limit:
+                    continue
+                probe = Probe()
+                t, c = measure_performance(algo, data, k, probe)
+                csv_rows.append([dist, label, n, t, c / n, probe.max_depth])
+                print(f"  {dist} N={n} {label}: {t:.3f}s, C/N={c / n:.2f}")
+            del data
+
+    save_csv("exp13_hybrid_introselect.csv",
+             ["Input", "Algorithm", "N", "Time", "C_per_N", "Max_Depth"], csv_rows)
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    for ax, (dist, _) in zip(axes, inputs):
+        for label, _ in algos:
+            rows = [r for r in csv_rows if r[0] == dist and r[1] == label]
+            ax.loglog([r[2] for r in rows], [r[3] for r in rows], marker='o', label=label)
+        ax.set_title(f'{dist} Input')
+        ax.set_xlabel('N')
+        ax.set_ylabel('Seconds')
+        ax.legend()
+        ax.grid(True)
+
+    plt.tight_layout()
+    plt.savefig("results/plots/Exp13_Hybrid_Introselect.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 14: Fast Deterministic Selection
+# Deterministic worst case at quickselect-like cost, vs MoM
+# ==========================================
+def exp_fast_deterministic():
+    print("\n--- Running Exp XIV: Fast Deterministic Selection vs MoM ---")
+    sizes = [10**4, 10**5, 10**6]
+    inputs = [("Uniform", generate_uniform_random),
+              ("Adversarial", generate_adversarial_sequence)]
+    algos = [("Quickselect", randomized_quickselect),
+             ("Median of Medians", median_of_medians_quickselect),
+             ("Fast Deterministic", fast_deterministic_select)]
+
+    csv_rows = []
+    for dist, gen in inputs:
+        for n in sizes:
+            data = gen(n)
+            k = n // 2
+            for label, algo in algos:
+                t, c = measure_performance(algo, data, k)
+                csv_rows.append([dist, label, n, t, c / n])
+                print(f"  {dist} N={n} {label}: {t:.3f}s, C/N={c / n:.2f}")
+
+    save_csv("exp14_fast_deterministic.csv",
+             ["Input", "Algorithm", "N", "Time", "C_per_N"], csv_rows)
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    for ax, (dist, _) in zip(axes, inputs):
+        for label, _ in algos:
+            rows = [r for r in csv_rows if r[0] == dist and r[1] == label]
+            ax.loglog([r[2] for r in rows], [r[3] for r in rows], marker='o', label=label)
+        ax.set_title(f'{dist} Input')
+        ax.set_xlabel('N')
+        ax.set_ylabel('Seconds')
+        ax.legend()
+        ax.grid(True)
+
+    plt.tight_layout()
+    plt.savefig("results/plots/Exp14_Fast_Deterministic.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 15: Per-Group Medians
+# segmented_select over one flat array vs Floyd-Rivest per group
+# ==========================================
+def exp_segmented_median():
+    print("\n--- Running Exp XV: Per-Group Medians (Segmented vs Per-List) ---")
+    group_counts = [10**3, 10**4, 10**5, 10**6]
+    # The per-list baseline is only run up to this many groups
+    loop_limit = 10**5
+
+    csv_rows = []
+    for g in group_counts:
+        # Per-endpoint style: many small groups of 1..40 samples
+        sizes = [random.randint(1, 40) for _ in range(g)]
+        values = generate_uniform_array(sum(sizes))
+        offsets = [0]
+        for size in sizes:
+            offsets.append(offsets[-1] + size)
+        ks = [size // 2 for size in sizes]
+
+        loop_rate = None
+        if g <= loop_limit:
+            lists = [values[offsets[i]:offsets[i + 1]].tolist() for i in range(g)]
+            start = time.perf_counter()
+            for group, k in zip(lists, ks):
+                floyd_rivest_quickselect(group, k)
+            loop_rate = g / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        segmented_select(values, offsets, ks)
+        seg_rate = g / (time.perf_counter() - start)
+
+        csv_rows.append([g, len(values), loop_rate, seg_rate])
+        loop_text = f"{loop_rate:,.0f}" if loop_rate else "skipped"
+        print(f"  G={g}: per-list FR {loop_text} groups/s, segmented {seg_rate:,.0f} groups/s")
+
+    save_csv("exp15_segmented_median.csv",
+             ["Groups", "Values", "PerList_FR_Groups_per_s", "Segmented_Groups_per_s"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    looped = [r for r in csv_rows if r[2]]
+    plt.loglog([r[0] for r in looped], [r[2] for r in looped], marker='o', label='floyd_rivest per list')
+    plt.loglog([r[0] for r in csv_rows], [r[3] for r in csv_rows], marker='s', label='segmented_select')
+    plt.title('Per-Group Median Throughput (1..40 values per group)')
+    plt.xlabel('Number of Groups')
+    plt.ylabel('Groups per Second')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp15_Segmented_Median.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 16: Dynamic Selection
+# Insert/delete/median rounds: skiplist vs re-running introselect
+# ==========================================
+def exp_dynamic_order_statistics():
+    print("\n--- Running Exp XVI: Dynamic Selection (Skiplist vs Introselect) ---")
+    sizes = [10**4, 10**5, 10**6]
+    rounds = 10**4
+
+    csv_rows = []
+    for n in sizes:
+        data = generate_uniform_random(n)
+        # One round: insert a value, delete the oldest inserted value
+        # (every other round), then ask for the median
+        new_values = generate_uniform_random(rounds)
+
+        start = time.perf_counter()
+        skiplist = IndexableSkiplist.build(data, expected_size=n + rounds)
+        t_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, x in enumerate(new_values):
+            skiplist.insert(x)
+            if i % 2:
+                skiplist.remove(new_values[i // 2])
+            skiplist.select(len(skiplist) // 2)
+        t_skip = (time.perf_counter() - start) / rounds
+
+        # Baseline: keep a plain list and re-run introselect after every update
+        # (timed on fewer rounds; each one is O(n))
+        baseline_rounds = min(rounds, max(10, 10**7 // n))
+        values = data[:]
+        start = time.perf_counter()
+        for i, x in enumerate(new_values[:baseline_rounds]):
+            values.append(x)
+            if i % 2:
+                values.remove(new_values[i // 2])
+            introselect(values, len(values) // 2)
+        t_intro = (time.perf_counter() - start) / baseline_rounds
+
+        csv_rows.append([n, t_build, t_skip, t_intro])
+        print(f"  N={n}: build {t_build:.2f}s, per round Skiplist {t_skip * 1e6:.1f}us, "
+              f"Introselect {t_intro * 1e6:.1f}us")
+
+    save_csv("exp16_dynamic_order_statistics.csv",
+             ["N", "Skiplist_Build_s", "Skiplist_Round_s", "Introselect_Round_s"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    plt.loglog(sizes, [r[2] * 1e6 for r in csv_rows], marker='o', label='IndexableSkiplist')
+    plt.loglog(sizes, [r[3] * 1e6 for r in csv_rows], marker='s', label='Introselect after each update')
+    plt.title('Update + Median Query Cost')
+    plt.xlabel('N')
+    plt.ylabel('Microseconds per Round')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp16_Dynamic_Order_Statistics.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 17: Antiselect Worst Case
+# C/N on adversary-built inputs (fixed seed) vs uniform input
+# ==========================================
+def exp_worst_case_antiselect(seed=7):
+    print("\n--- Running Exp XVII: Worst Case under the Antiselect Adversary ---")
+    sizes = [250, 500, 1000, 2000, 4000]
+    algos = [("Quickselect", randomized_quickselect),
+             ("Median of 3", median_of_3_quickselect),
+             ("Median of Medians", median_of_medians_quickselect),
+             ("Floyd-Rivest", floyd_rivest_quickselect),
+             ("Introselect", introselect),
+             ("Fast Deterministic", fast_deterministic_select)]
+
+    csv_rows = []
+    for label, algo in algos:
+        for n in sizes:
+            k = n // 2
+            # Attack and replay under the same seed (fixed-seed worst case)
+            data = generate_antiselect(algo, n, k, seed=seed)
+            random.seed(seed)
+            _, worst = measure_performance(algo, data, k)
+
+            random.seed(seed)
+            _, typical = measure_performance(algo, generate_uniform_random(n), k)
+
+            csv_rows.append([label, n, worst / n, typical / n])
+        print(f"  {label}: worst C/N at N={sizes[-1]}: {csv_rows[-1][2]:.1f} "
+              f"(uniform: {csv_rows[-1][3]:.1f})")
+
+    save_csv("exp17_antiselect_worst_case.csv",
+             ["Algorithm", "N", "Worst_C_per_N", "Uniform_C_per_N"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    for label, _ in algos:
+        rows = [r for r in csv_rows if r[0] == label]
+        plt.loglog([r[1] for r in rows], [r[2] for r in rows], marker='o', label=label)
+    plt.title(f'Adversarial Worst Case (Antiselect, seed={seed})')
+    plt.xlabel('N')
+    plt.ylabel('Comparisons / N')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp17_Antiselect_Worst_Case.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 18: Selector Session
+# Cost of repeated queries on one buffer with cached pivots
+# ==========================================
+def exp_selection_session(N=10**6, queries=1000):
+    print("\n--- Running Exp XVIII: Selector Session (Cached Pivots) ---")
+    data = generate_uniform_random(N)
+    ranks = [random.randrange(N) for _ in range(queries)]
+    # Query buckets: cost of the 1st, 2nd-10th, 11th-100th, ... query
+    buckets = [(0, 1), (1, 10), (10, 100), (100, 1000)]
+
+    probe = Probe()
+    session = Selector(data, probe=probe)
+    times, comps = [], []
+    for k in ranks:
+        before = probe.comparisons
+        start = time.perf_counter()
+        session.select(k)
+        times.append(time.perf_counter() - start)
+        comps.append(probe.comparisons - before)
+
+    # Baseline: introselect from scratch on the same buffer for every query
+    # (timed on the first 20 queries; every query costs about the same)
+    baseline = data[:]
+    probe = Probe()
+    start = time.perf_counter()
+    for k in ranks[:20]:
+        introselect(baseline, k, probe=probe)
+    t_intro = (time.perf_counter() - start) / 20
+    c_intro = probe.comparisons / 20
+
+    csv_rows = []
+    for lo, hi in buckets:
+        hi = min(hi, queries)
+        if lo >= hi:
+            continue
+        t_mean = sum(times[lo:hi]) / (hi - lo)
+        c_mean = sum(comps[lo:hi]) / (hi - lo)
+        csv_rows.append([f"{lo + 1}-{hi}", t_mean, c_mean, t_intro, c_intro])
+        print(f"  Queries {lo + 1}-{hi}: Selector {t_mean * 1e3:.2f}ms ({c_mean / N:.3f} C/N), "
+              f"Introselect {t_intro * 1e3:.2f}ms ({c_intro / N:.2f} C/N)")
+    print(f"  Known pivots after {queries} queries: {session.known_pivots}")
+
+    save_csv("exp18_selection_session.csv",
+             ["Queries", "Selector_Time", "Selector_Comparisons",
+              "Introselect_Time", "Introselect_Comparisons"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    plt.loglog(range(1, queries + 1), times, marker='.', linestyle='none', alpha=0.5,
+               label='Selector (cached pivots)')
+    plt.axhline(y=t_intro, color='r', linestyle='--', label='Introselect from scratch')
+    plt.title(f'Cost per Query on a Random Rank Sequence (N={N})')
+    plt.xlabel('Query Number')
+    plt.ylabel('Seconds')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp18_Selection_Session.png")
+    plt.close()
+
+# ==========================================
+# EXPERIMENT 19: Argselect & Weighted Median
+# Index and weighted selection vs np.argsort (+ cumsum)
+# ==========================================
+def exp_argselect_weighted(sizes=(10**4, 10**5, 10**6)):
+    print("\n--- Running Exp XIX: Argselect & Weighted Median vs np.argsort ---")
+    csv_rows = []
+    t_arg, t_argsort, t_weighted, t_cumsum = [], [], [], []
+    for n in sizes:
+        keys = generate_uniform_random(n)
+        weights = [random.random() for _ in range(n)]
+        k = n // 2
+
+        start = time.perf_counter()
+        i = argselect(keys, k)
+        t1 = time.perf_counter() - start
+
+        # NumPy baseline: convert the key list, sort every index, pick one
+        start = time.perf_counter()
+        j = int(np.argsort(np.asarray(keys))[k])
+        t2 = time.perf_counter() - start
+        assert keys[i] == keys[j]
+
+        start = time.perf_counter()
+        w = weighted_select(keys, weights, 0.5)
+        t3 = time.perf_counter() - start
+
+        # NumPy baseline: sort, cumulative weights, binary search for half the total
+        start = time.perf_counter()
+        order = np.argsort(np.asarray(keys))
+        cumulative = np.cumsum(np.asarray(weights)[order])
+        v = int(order[np.searchsorted(cumulative, 0.5 * cumulative[-1])])
+        t4 = time.perf_counter() - start
+        # Both must be a weighted median: W(< x) <= total/2 <= W(<= x), up to
+        # rounding of the float sums (the two can differ in summation order)
+        key_arr, weight_arr = np.asarray(keys), np.asarray(weights)
+        half = 0.5 * cumulative[-1]
+        tol = 1e-9 * cumulative[-1]
+        for label, idx in (("weighted_select", w), ("argsort+cumsum", v)):
+            below = weight_arr[key_arr < keys[idx]].sum()
+            upto = weight_arr[key_arr <= keys[idx]].sum()
+            assert below <= half + tol and upto >= half - tol, (
+                f"N={n}: {label} picked {keys[idx]} with W(<)={below}, W(<=)={upto}, "
+                f"half={half}")
+
+        t_arg.append(t1)
+        t_argsort.append(t2)
+        t_weighted.append(t3)
+        t_cumsum.append(t4)
+        csv_rows.append([n, t1, t2, t3, t4])
+        print(f"  N={n}: argselect {t1:.4f}s vs argsort {t2:.4f}s | "
+              f"weighted_select {t3:.4f}s vs argsort+cumsum {t4:.4f}s")
+
+    save_csv("exp19_argselect_weighted.csv",
+             ["N", "Argselect_Time", "Argsort_Time", "Weighted_Select_Time",
+              "Argsort_Cumsum_Time"], csv_rows)
+
+    plt.figure(figsize=(10, 6))
+    plt.loglog(sizes, t_arg, marker='o', label='argselect (introselect on indices)')
+    plt.loglog(sizes, t_argsort, marker='o', linestyle='--', label='np.argsort(keys)[k]')
+    plt.loglog(sizes, t_weighted, marker='s', label='weighted_select (q=0.5)')
+    plt.loglog(sizes, t_cumsum, marker='s', linestyle='--', label='argsort + cumsum + searchsorted')
+    plt.title('Index and Weighted Selection vs Sorting Indices')
+    plt.xlabel('Input Size (N)')
+    plt.ylabel('Seconds')
+    plt.legend()
+    plt.grid(True)
+    plt.savefig("results/plots/Exp19_Argselect_Weighted.png")
+    plt.close()
+
 if __name__ == "__main__":
-    sys.setrecursionlimit(50000)
-    
+    parser = argparse.ArgumentParser(description="Run the selection experiments.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Also run Exp IX (N=10^7 on up to cpu_count worker processes).")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="Also run Exp X (writes an 8*N byte file, 1.6 GB by default).")
+    parser.add_argument("--out-of-core-n", type=int, default=2 * 10**8,
+                        help="N for Exp X; pick 8*N above the machine's RAM to go out of core.")
+    parser.add_argument("--out-of-core-path", default=None,
+                        help="File Exp X writes (and removes afterwards); default: a temporary file.")
+    args = parser.parse_args()
+
     exp_random_vs_heuristic()
     exp_speed_vs_safety()
     exp_convergence()
     exp_practicality_check()
+    exp_recursion_free()
+    exp_low_cardinality()
+    exp_probe_overhead()
+    exp_convergence_large()
+    if args.parallel:
+        exp_parallel_speedup()
+    if args.out_of_core:
+        exp_out_of_core(N=args.out_of_core_n, path=args.out_of_core_path)
+    exp_radix_vs_floyd_rivest()
+    exp_rolling_median()
+    exp_hybrid_introselect()
+    exp_fast_deterministic()
+    exp_segmented_median()
+    exp_dynamic_order_statistics()
+    exp_worst_case_antiselect()
+    exp_selection_session()
+    exp_argselect_weighted()
     
     print("\nAnalysis complete. Check /results/plots folder.")
\ No newline at end of file
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 
 def generate_uniform_random(n: int, value_range: tuple = (0, 1000000)) -> list:
     """
@@ -7,6 +8,37 @@ def generate_uniform_random(n: int, value_range: tuple = (0, 1000000)) -> list:
     """
     return [random.randint(value_range[0], value_range[1]) for _ in range(n)]
 
+def generate_low_cardinality(n: int, distinct: int = 16) -> list:
+    """
+    Generates a list of n integers drawn from only `distinct` values.
+    Mimics heavily quantized production data (bucketed latencies, ratings...),
+    where most elements are duplicates of the pivot.
+    """
+    return [random.randrange(distinct) for _ in range(n)]
+
+def generate_uniform_array(n: int, value_range: tuple = (0, 1000000), seed: int = None) -> np.ndarray:
+    """
+    Same distribution as generate_uniform_random, but as an int64 NumPy array.
+    Use this for array backends (TrackedArray) where N reaches 10^7+.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(value_range[0], value_range[1], size=n, endpoint=True)
+
+def generate_gaussian(n: int, mean: float = 500000.0, std: float = 100000.0) -> list:
+    """
+    Generates a list of n normally distributed integers.
+    Values pile up around the mean, like most latency/size measurements.
+    """
+    return [round(random.gauss(mean, std)) for _ in range(n)]
+
+def generate_gaussian_array(n: int, mean: float = 500000.0, std: float = 100000.0,
+                            seed: int = None) -> np.ndarray:
+    """
+    Same distribution as generate_gaussian, but as an int64 NumPy array.
+    """
+    rng = np.random.default_rng(seed)
+    return np.rint(rng.normal(mean, std, size=n)).astype(np.int64)
+
 def generate_sorted(n: int) -> list:
     """
     Generates a list of n integers in ascending order.
@@ -52,4 +84,101 @@ def generate_adversarial_sequence(n: int) -> list:
         # Then swap front (0) to the current end (i)
         arr[0], arr[i] = arr[i], arr[0]
         
-    return arr
\ No newline at end of file
+    return arr
+
+class _GasAdversary:
+    """
+    McIlroy's "killer adversary" state, as in A Killer Adversary for
+    Quicksort (1999). Every element starts as GAS (an unknown value above
+    all solid ones). When two gas elements are compared, one of them is
+    FROZEN to the next solid value: the one the selector most recently
+    compared (its likely pivot), so the pivot ends up as small as possible.
+    """
+    def __init__(self, n: int):
+        self.gas = n
+        self.values = [n] * n
+        self.solid = 0
+        self.candidate = None
+        self.comparisons = 0
+
+    def compare(self, x: int, y: int) -> int:
+        """Returns <0, 0 or >0 like values[x] - values[y], freezing gas as needed."""
+        self.comparisons += 1
+        values = self.values
+        if values[x] == self.gas and values[y] == self.gas:
+            frozen = x if x == self.candidate else y
+            values[frozen] = self.solid
+            self.solid += 1
+        if values[x] == self.gas:
+            self.candidate = x
+        elif values[y] == self.gas:
+            self.candidate = y
+        return values[x] - values[y]
+
+class _GasItem:
+    """Element handed to the selector; every comparison asks the adversary."""
+    __slots__ = ('index', 'adversary')
+
+    def __init__(self, index: int, adversary: _GasAdversary):
+        self.index = index
+        self.adversary = adversary
+
+    def __lt__(self, other):
+        return self.adversary.compare(self.index, other.index) < 0
+
+    def __gt__(self, other):
+        return self.adversary.compare(self.index, other.index) > 0
+
+    def __le__(self, other):
+        return self.adversary.compare(self.index, other.index) <= 0
+
+    def __ge__(self, other):
+        return self.adversary.compare(self.index, other.index) >= 0
+
+    def __eq__(self, other):
+        return self.adversary.compare(self.index, other.index) == 0
+
+def generate_antiselect(selector, n: int, k: int = None, seed: int = None) -> list:
+    """
+    Generates a worst-case input for ANY selector from src/ (adaptive
+    'antiselect' adversary, after McIlroy's quicksort killer).
+
+    The selector is run once on n gas elements; the adversary decides every
+    comparison as it happens so that pivots come out as bad as possible.
+    The values it committed to form the returned list (gas left over
+    gets the largest values). Running the same selector on it replays the
+    exact same comparisons.
+
+    Randomized selectors are attacked under a fixed seed: reseed with the
+    same `seed` before replaying to get the worst case.
+
+        data = generate_antiselect(introselect, 10**4, seed=7)
+        random.seed(7)
+        introselect(data, len(data) // 2, probe=probe)
+
+    Args:
+        selector (callable): selector(arr, k) from src/.
+        n (int): Input size.
+        k (int, optional): Rank the selector is asked for (default: median).
+        seed (int, optional): Seed of `random` during the attack.
+    """
+    if n == 0:
+        return []
+    if k is None:
+        k = n // 2
+
+    adversary = _GasAdversary(n)
+    items = [_GasItem(i, adversary) for i in range(n)]
+    if seed is not None:
+        random.seed(seed)
+    selector(items, k)
+
+    # Gas never compared against other gas can take any order: give it
+    # distinct values above every solid one
+    values = adversary.values
+    next_value = adversary.solid
+    for i in range(n):
+        if values[i] == adversary.gas:
+            values[i] = next_value
+            next_value += 1
+    return values
\ No newline at end of file
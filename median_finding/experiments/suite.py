@@ -0,0 +1,360 @@
+"""
+Benchmark suite for the selection algorithms.
+
+Runs a matrix of backends x distributions x sizes x ranks, with warmups and
+repetitions, and writes JSON + CSV result files. Two result files can be
+compared to spot regressions. Needs only NumPy (no matplotlib).
+
+    python -m experiments.suite run --preset quick --name baseline
+    python -m experiments.suite run --preset full --name after
+    python -m experiments.suite compare results/suite/baseline.json results/suite/after.json
+"""
+import sys
+import os
+import csv
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tracemalloc
+import numpy as np
+
+# Fix import path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import Probe
+from src.quickselect import randomized_quickselect
+from src.median_of_3 import median_of_3_quickselect
+from src.median_of_medians import median_of_medians_quickselect
+from src.floyd_rivest import floyd_rivest_quickselect
+from src.introselect import introselect
+from src.fast_deterministic import fast_deterministic_select
+from src.tracked_array import TrackedArray
+from src.radix_select import radix_select
+
+from experiments.data_generator import (
+    generate_uniform_random,
+    generate_uniform_array,
+    generate_sorted,
+    generate_reverse_sorted,
+    generate_low_cardinality,
+    generate_gaussian,
+    generate_gaussian_array,
+    generate_adversarial_sequence
+)
+
+RESULTS_DIR = "results/suite"
+
+# --- Backends ---
+# "list":  plain Python lists; a separate Probe run counts comparisons.
+# "array": int64 NumPy arrays; kernels run on a TrackedArray (vectorized
+#          partitions), plus the comparison-free radix select and np.partition.
+LIST_ALGOS = {
+    "quickselect": randomized_quickselect,
+    "median_of_3": median_of_3_quickselect,
+    "median_of_medians": median_of_medians_quickselect,
+    "floyd_rivest": floyd_rivest_quickselect,
+    "introselect": introselect,
+    "fast_deterministic": fast_deterministic_select,
+}
+
+ARRAY_ALGOS = {
+    "quickselect": randomized_quickselect,
+    "floyd_rivest": floyd_rivest_quickselect,
+    "introselect": introselect,
+    "radix_select": None,
+    "np_partition": None,
+}
+
+DISTRIBUTIONS = ["uniform", "sorted", "reverse", "few_unique", "gaussian", "adversarial"]
+
+RANKS = {
+    "min": lambda n: 0,
+    "median": lambda n: n // 2,
+    "p99": lambda n: int(0.99 * (n - 1)),
+}
+
+PRESETS = {
+    "quick": {"list": [10**3, 10**4], "array": [10**4, 10**5], "repeat": 3, "warmup": 1},
+    "full": {"list": [10**3, 10**4, 10**5, 10**6],
+             "array": [10**5, 10**6, 10**7, 10**8], "repeat": 5, "warmup": 1},
+}
+
+# generate_adversarial_sequence is a Python loop; arrays beyond this are skipped
+ADVERSARIAL_ARRAY_MAX = 10**7
+
+def make_list(dist: str, n: int) -> list:
+    if dist == "uniform":
+        return generate_uniform_random(n)
+    if dist == "sorted":
+        return generate_sorted(n)
+    if dist == "reverse":
+        return generate_reverse_sorted(n)
+    if dist == "few_unique":
+        return generate_low_cardinality(n)
+    if dist == "gaussian":
+        return generate_gaussian(n)
+    if dist == "adversarial":
+        return generate_adversarial_sequence(n)
+    raise ValueError(f"Unknown distribution '{dist}'.")
+
+def make_array(dist: str, n: int, seed: int = None) -> np.ndarray:
+    if dist == "uniform":
+        return generate_uniform_array(n, seed=seed)
+    if dist == "sorted":
+        return np.arange(n, dtype=np.int64)
+    if dist == "reverse":
+        return np.arange(n, 0, -1, dtype=np.int64)
+    if dist == "few_unique":
+        return np.random.default_rng(seed).integers(0, 16, size=n)
+    if dist == "gaussian":
+        return generate_gaussian_array(n, seed=seed)
+    if dist == "adversarial":
+        return np.array(generate_adversarial_sequence(n), dtype=np.int64)
+    raise ValueError(f"Unknown distribution '{dist}'.")
+
+def _run_list(algo, data: list, k: int, probe=None):
+    arr = data[:]
+    return lambda: algo(arr, k, probe=probe)
+
+def _run_array(name: str, data: np.ndarray, k: int):
+    """Returns (run, counted): run() performs one selection on a fresh copy."""
+    if name == "radix_select":
+        return lambda: radix_select(data, k), None
+    if name == "np_partition":
+        return lambda: np.partition(data, k)[k].item(), None
+    arr = TrackedArray(data)
+    return lambda: ARRAY_ALGOS[name](arr, k, probe=arr), arr
+
+def measure(backend: str, name: str, data, k: int, expected, repeat: int, warmup: int,
+            budget: float) -> dict:
+    """
+    Times one (algorithm, input, rank) cell.
+    - `warmup` untimed runs, then `repeat` timed runs, each on a fresh copy
+      (the copy is made before the clock starts).
+    - One extra run under tracemalloc gives the peak memory of the selection.
+    - List backend: one extra Probe run gives the comparison count.
+    A cell whose first run already exceeds `budget` seconds is recorded
+    from that run alone and flagged as truncated; the Probe and tracemalloc
+    runs are skipped too, so its peak memory (and, on the list backend, its
+    comparison count) is None.
+    """
+    n = len(data)
+    times = []
+    comparisons = None
+    truncated = False
+    result = None
+    peak = None
+
+    for i in range(warmup + repeat):
+        if backend == "list":
+            run, counted = _run_list(LIST_ALGOS[name], data, k), None
+        else:
+            run, counted = _run_array(name, data, k)
+        start = time.perf_counter()
+        result = run()
+        duration = time.perf_counter() - start
+        if counted is not None:
+            comparisons = counted.comparisons
+        if i >= warmup or duration > budget:
+            times.append(duration)
+        if duration > budget:
+            truncated = True
+            break
+
+    if not truncated:
+        if backend == "list":
+            probe = Probe()
+            _run_list(LIST_ALGOS[name], data, k, probe)()
+            comparisons = probe.comparisons
+
+        # Peak memory of one selection (input copy excluded)
+        if backend == "list":
+            run = _run_list(LIST_ALGOS[name], data, k)
+        else:
+            run, _ = _run_array(name, data, k)
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if len(times) > 1:
+        q1, _, q3 = statistics.quantiles(times, n=4, method='inclusive')
+    else:
+        q1 = q3 = times[0]
+    return {
+        "median_s": statistics.median(times),
+        "q1_s": q1,
+        "q3_s": q3,
+        "iqr_s": q3 - q1,
+        "min_s": min(times),
+        "max_s": max(times),
+        "runs": len(times),
+        "comparisons_per_element": None if comparisons is None else comparisons / n,
+        "peak_bytes": peak,
+        "correct": result == expected,
+        "truncated": truncated,
+    }
+
+def run_suite(backends: list, sizes: dict, dists: list, ranks: list, repeat: int,
+              warmup: int, budget: float, seed: int) -> list:
+    records = []
+    for backend in backends:
+        algos = LIST_ALGOS if backend == "list" else ARRAY_ALGOS
+        # (algorithm, distribution, rank) cells that blew the budget skip larger sizes
+        skip = set()
+        for dist in dists:
+            for n in sizes[backend]:
+                if backend == "array" and dist == "adversarial" and n > ADVERSARIAL_ARRAY_MAX:
+                    continue
+                random.seed(seed)
+                if backend == "list":
+                    data = make_list(dist, n)
+                    ordered = sorted(data)
+                else:
+                    data = make_array(dist, n, seed)
+                    ordered = None
+
+                for rank in ranks:
+                    k = RANKS[rank](n)
+                    if backend == "list":
+                        expected = ordered[k]
+                    else:
+                        expected = np.partition(data, k)[k].item()
+
+                    for name in algos:
+                        if (name, dist, rank) in skip:
+                            continue
+                        stats = measure(backend, name, data, k, expected,
+                                        repeat, warmup, budget)
+                        if stats["truncated"]:
+                            skip.add((name, dist, rank))
+                        record = {"backend": backend, "algorithm": name,
+                                  "distribution": dist, "n": n, "rank": rank, "k": k}
+                        record.update(stats)
+                        records.append(record)
+                        print(f"  {backend:5} {name:18} {dist:11} N={n:<10} {rank:6} "
+                              f"median={stats['median_s']:.4f}s iqr={stats['iqr_s']:.4f}s"
+                              + ("" if stats["correct"] else "  WRONG RESULT"))
+                del data, ordered
+    return records
+
+def save_results(records: list, config: dict, name: str, out_dir: str = RESULTS_DIR) -> tuple:
+    """Writes <name>.json (records + environment) and <name>.csv (records)."""
+    os.makedirs(out_dir, exist_ok=True)
+    json_path = os.path.join(out_dir, f"{name}.json")
+    csv_path = os.path.join(out_dir, f"{name}.csv")
+
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": config,
+        "records": records,
+    }
+    with open(json_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+    if records:
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+
+    print(f"Saved results: {json_path}, {csv_path}")
+    return json_path, csv_path
+
+def _key(record: dict) -> tuple:
+    return (record["backend"], record["algorithm"], record["distribution"],
+            record["n"], record["rank"])
+
+def compare(base_path: str, new_path: str, threshold: float = 0.10) -> int:
+    """
+    Compares two result files cell by cell and prints the time ratios.
+    A cell is a regression when its median got slower by more than
+    `threshold` AND the two interquartile ranges do not overlap
+    (so run-to-run noise alone is not reported). Returns the regression count.
+    """
+    with open(base_path) as f:
+        base = {_key(r): r for r in json.load(f)["records"]}
+    with open(new_path) as f:
+        new = {_key(r): r for r in json.load(f)["records"]}
+
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        b, c = base[key], new[key]
+        ratio = c["median_s"] / b["median_s"] if b["median_s"] > 0 else float('inf')
+        if ratio > 1 + threshold and c["q1_s"] > b["q3_s"]:
+            verdict = "REGRESSION"
+        elif ratio < 1 - threshold and c["q3_s"] < b["q1_s"]:
+            verdict = "faster"
+        else:
+            verdict = ""
+        rows.append((key, b["median_s"], c["median_s"], ratio, verdict))
+
+    rows.sort(key=lambda r: r[3], reverse=True)
+    print(f"{'backend':7} {'algorithm':18} {'distribution':12} {'N':>10} {'rank':6} "
+          f"{'base':>9} {'new':>9} {'ratio':>6}")
+    for (backend, algo, dist, n, rank), t_base, t_new, ratio, verdict in rows:
+        print(f"{backend:7} {algo:18} {dist:12} {n:>10} {rank:6} "
+              f"{t_base:9.4f} {t_new:9.4f} {ratio:6.2f} {verdict}")
+
+    regressions = sum(1 for r in rows if r[4] == "REGRESSION")
+    missing = len(base.keys() ^ new.keys())
+    print(f"\n{len(rows)} cells compared, {regressions} regressions"
+          + (f", {missing} cells only in one file" if missing else ""))
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Selection algorithm benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmark matrix.")
+    run_p.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    run_p.add_argument("--backends", nargs="+", choices=["list", "array"],
+                       default=["list", "array"])
+    run_p.add_argument("--list-sizes", nargs="+", type=int)
+    run_p.add_argument("--array-sizes", nargs="+", type=int)
+    run_p.add_argument("--dists", nargs="+", choices=DISTRIBUTIONS, default=DISTRIBUTIONS)
+    run_p.add_argument("--ranks", nargs="+", choices=list(RANKS), default=list(RANKS))
+    run_p.add_argument("--repeat", type=int)
+    run_p.add_argument("--warmup", type=int)
+    run_p.add_argument("--budget", type=float, default=30.0,
+                       help="Seconds; a slower cell is run once and larger sizes are skipped.")
+    run_p.add_argument("--seed", type=int, default=42)
+    run_p.add_argument("--name", default=time.strftime("run_%Y%m%d_%H%M%S"))
+    run_p.add_argument("--out-dir", default=RESULTS_DIR)
+
+    cmp_p = sub.add_parser("compare", help="Compare two result files.")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        return 1 if compare(args.base, args.new, args.threshold) else 0
+
+    preset = PRESETS[args.preset]
+    sizes = {"list": args.list_sizes or preset["list"],
+             "array": args.array_sizes or preset["array"]}
+    repeat = args.repeat or preset["repeat"]
+    warmup = preset["warmup"] if args.warmup is None else args.warmup
+    config = {"preset": args.preset, "backends": args.backends, "sizes": sizes,
+              "distributions": args.dists, "ranks": args.ranks, "repeat": repeat,
+              "warmup": warmup, "budget": args.budget, "seed": args.seed}
+
+    print(f"--- Running selection suite '{args.name}' ({args.preset}) ---")
+    records = run_suite(args.backends, sizes, args.dists, args.ranks, repeat, warmup,
+                        args.budget, args.seed)
+    save_results(records, config, args.name, args.out_dir)
+    return 0 if all(r["correct"] for r in records) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
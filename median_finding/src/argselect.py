@@ -0,0 +1,114 @@
+import random
+from src.utils import KeyedProbe
+from src.introselect import introselect
+
+def argselect(values, k: int, keys=None, selector=introselect, probe=None) -> int:
+    """
+    Finds the INDEX of the k-th smallest element, e.g. of a list of
+    (latency, request_id) records, without wrapping or reordering them.
+
+    Only an index list is permuted; every comparison looks at keys[index]
+    through KeyedProbe, so any selector from src/ can be used unchanged.
+
+    Args:
+        values (sequence): The records (left untouched).
+        k (int): Rank of the element (0-based).
+        keys (sequence, optional): Sort key of every record (default: values).
+        selector (callable): Any selector(arr, k, probe=...) from src/.
+        probe (Probe, optional): Receives the comparison/swap counts.
+
+    Returns:
+        int: i such that keys[i] is the k-th smallest key.
+    """
+    if keys is None:
+        keys = values
+    if len(keys) != len(values):
+        raise ValueError("keys must have one entry per value.")
+    if not 0 <= k < len(values):
+        raise ValueError(f"k={k} is out of bounds.")
+
+    kernels = KeyedProbe(keys)
+    index = selector(list(range(len(values))), k, probe=kernels)
+    _merge_counts(probe, kernels)
+    return index
+
+def weighted_select(values, weights, q: float = 0.5, probe=None) -> int:
+    """
+    Finds the index of the weighted q-quantile: the smallest value x whose
+    cumulative weight W(<= x) reaches q * total weight.
+    q = 0.5 gives the weighted (lower) median.
+
+    Expected O(N), like Randomized Quickselect, but the side to keep is
+    decided by weight instead of by count:
+    1. Random pivot, three-way partition of the index list (KeyedProbe).
+    2. Sum the weights of the < and == blocks.
+    3. Keep the block where the cumulative weight crosses q * total.
+
+    Args:
+        values (sequence): Values (left untouched).
+        weights (sequence): Non-negative weight of every value.
+        q (float): Quantile in [0, 1].
+        probe (Probe, optional): Receives the comparison/swap counts.
+
+    Returns:
+        int: Index of the weighted quantile in values.
+    """
+    n = len(values)
+    if len(weights) != n:
+        raise ValueError("weights must have one entry per value.")
+    if n == 0:
+        raise ValueError("weighted_select needs at least one value.")
+    if not 0.0 <= q <= 1.0:
+        raise ValueError(f"q={q} must be between 0 and 1.")
+    if any(w < 0 for w in weights):
+        raise ValueError("weights must be non-negative.")
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("the total weight must be positive.")
+
+    kernels = KeyedProbe(values)
+    weight_of = weights.__getitem__
+    idx = list(range(n))
+    target = q * total
+    below = 0   # Weight of everything left of the window
+    low = 0
+    high = n - 1
+
+    while low < high:
+        # Random pivot moved to the end, as in randomized_quickselect
+        pivot_index = random.randint(low, high)
+        idx[pivot_index], idx[high] = idx[high], idx[pivot_index]
+        lt, gt = kernels.partition_three_way(idx, low, high)
+
+        w_less = sum(map(weight_of, idx[low:lt]))
+        w_equal = sum(map(weight_of, idx[lt:gt]))
+
+        if lt > low and below + w_less >= target:
+            high = lt - 1
+        elif below + w_less + w_equal >= target or gt > high:
+            # (gt > high only when rounding left the target just out of reach)
+            low = lt
+            break
+        else:
+            below += w_less + w_equal
+            low = gt
+
+    _merge_counts(probe, kernels)
+    return idx[low]
+
+def weighted_quantile(values, weights, q: float, probe=None):
+    """The value at weighted_select(values, weights, q)."""
+    return values[weighted_select(values, weights, q, probe)]
+
+def weighted_median(values, weights, probe=None):
+    """The (lower) weighted median of values."""
+    return weighted_quantile(values, weights, 0.5, probe)
+
+def _merge_counts(probe, kernels: KeyedProbe) -> None:
+    """Adds the counts of the internal KeyedProbe to a caller's Probe."""
+    if probe is None:
+        return
+    probe.comparisons += kernels.comparisons
+    probe.swaps += kernels.swaps
+    probe.partitions += kernels.partitions
+    probe.max_depth = max(probe.max_depth, kernels.max_depth)
@@ -0,0 +1,257 @@
+import math
+import numpy as np
+
+# Elements streamed from the file per step (32 MB of int64/float64)
+CHUNK_ELEMS = 1 << 22
+
+# Largest candidate band we are willing to hold in RAM (128 MB of int64/float64)
+BAND_LIMIT = 1 << 24
+
+# Sample size used to place the pivot brackets
+SAMPLE_SIZE = 1 << 16
+
+class ScanStats:
+    """
+    Memory traffic metrics for ONE scan-based selection.
+    Pass an instance as `stats=` to select_from_file (or radix_select)
+    to read them afterwards.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Resets all metrics to zero."""
+        self.bytes_read = 0   # Bytes scanned (file: copied out of the mapping)
+        self.passes = 0       # Full sequential passes over the candidates
+        self.band_size = 0    # Candidates held in RAM for the final selection
+
+    def __repr__(self):
+        return (f"ScanStats(bytes_read={self.bytes_read}, passes={self.passes}, "
+                f"band_size={self.band_size})")
+
+def select_from_file(path, k: int, dtype=np.int64, stats: ScanStats = None,
+                     band_limit: int = BAND_LIMIT, chunk_elems: int = CHUNK_ELEMS,
+                     seed: int = None):
+    """
+    Finds the k-th smallest value stored in a raw binary file (e.g. a metric
+    dump of int64 or float64 values) without loading the file into RAM.
+
+    Sample-based pivot brackets:
+    1. A random sample (read through the memory map) places two pivots a <= b
+       that very likely bracket rank k.
+    2. One sequential pass counts the values below a and keeps only the band
+       a <= x <= b in memory. It also keeps a small stride sample of every
+       region, in case the bracket missed.
+    3. If rank k falls inside a band that fit in memory, it is solved with
+       np.partition. Otherwise the region that holds rank k becomes the new
+       candidate range and its sample places the next bracket. Once a range
+       fits in `band_limit`, the next pass simply keeps all of it.
+    In practice this takes one sequential pass, two when the bracket misses.
+
+    Args:
+        path (str | Path): Binary file of native-endian `dtype` values.
+        k (int): Rank of the element (0-based).
+        dtype (np.dtype): Element type of the file.
+        stats (ScanStats, optional): Filled with bytes read, passes, band size.
+        band_limit (int): Max candidates held in RAM at once.
+        chunk_elems (int): Elements read per sequential step.
+        seed (int, optional): Seed for the samples.
+
+    Returns:
+        The value of the k-th smallest element.
+    """
+    if stats is None:
+        stats = ScanStats()
+    rng = np.random.default_rng(seed)
+
+    data = np.memmap(path, dtype=dtype, mode='r')
+    n = len(data)
+    if not 0 <= k < n:
+        raise ValueError(f"k={k} is out of bounds for file length {n}")
+
+    # --- Initial sample: sorted random positions, read through the mapping ---
+    positions = np.sort(rng.integers(0, n, size=min(n, SAMPLE_SIZE)))
+    sample = np.asarray(data[positions])
+    stats.bytes_read += sample.nbytes
+
+    # Candidate range: values inside `bounds`; `rank` is k among them
+    bounds = _Bounds()
+    rank = k
+    count = n
+    single_pivot = False
+
+    while True:
+        if count <= band_limit:
+            # Small enough: keep the whole candidate range this pass
+            a, b = None, None
+        else:
+            if len(sample) == 0:
+                # A region narrower than the last stride can get no sample at all
+                sample = _sample_pass(data, bounds, count, chunk_elems, stats)
+            a, b = _bracket(sample, rank, count, single_pivot)
+        previous = count
+        below, band, above, samples = _scan(data, bounds, a, b, count,
+                                            band_limit, chunk_elems, stats)
+
+        if rank < below:
+            bounds = bounds.narrow(hi=a, hi_open=True)
+            count = below
+            sample = samples[0]
+        elif rank < below + band.size_seen:
+            rank -= below
+            if a is not None and b is not None and a == b:
+                return a.item()
+            if band.values is not None:
+                stats.band_size = len(band.values)
+                return np.partition(band.values, rank)[rank].item()
+            # The band did not fit in memory: narrow to it and go again
+            bounds = bounds.narrow(lo=a, hi=b)
+            count = band.size_seen
+            sample = samples[1]
+        else:
+            rank -= below + band.size_seen
+            bounds = bounds.narrow(lo=b, lo_open=True)
+            count = above
+            sample = samples[2]
+
+        # A bracket that kept every candidate makes no progress;
+        # a single pivot always removes at least its own value.
+        single_pivot = count == previous
+
+class _Bounds:
+    """Value interval of the current candidates, each side open or closed."""
+    def __init__(self, lo=None, lo_open=False, hi=None, hi_open=False):
+        self.lo, self.lo_open = lo, lo_open
+        self.hi, self.hi_open = hi, hi_open
+
+    def narrow(self, lo=None, lo_open=False, hi=None, hi_open=False):
+        if lo is None:
+            lo, lo_open = self.lo, self.lo_open
+        if hi is None:
+            hi, hi_open = self.hi, self.hi_open
+        return _Bounds(lo, lo_open, hi, hi_open)
+
+    def select(self, chunk: np.ndarray) -> np.ndarray:
+        """Returns the elements of chunk inside the interval."""
+        if self.lo is None and self.hi is None:
+            return chunk
+        mask = np.ones(len(chunk), dtype=bool)
+        if self.lo is not None:
+            mask &= (chunk > self.lo) if self.lo_open else (chunk >= self.lo)
+        if self.hi is not None:
+            mask &= (chunk < self.hi) if self.hi_open else (chunk <= self.hi)
+        return chunk[mask]
+
+class _Band:
+    """The a <= x <= b values of one pass, dropped once they exceed the limit."""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.size_seen = 0
+        self.parts = []
+
+    def add(self, values: np.ndarray) -> None:
+        self.size_seen += len(values)
+        if self.parts is None:
+            return
+        if self.size_seen > self.limit:
+            self.parts = None
+        else:
+            self.parts.append(values)
+
+    @property
+    def values(self):
+        if self.parts is None:
+            return None
+        return np.concatenate(self.parts) if self.parts else np.empty(0)
+
+def _bracket(sample: np.ndarray, rank: int, count: int, single_pivot: bool) -> tuple:
+    """
+    Floyd-Rivest style bracket: the sample values around the expected position
+    of `rank`, widened by ~sqrt(s log n) so that the true element falls
+    between them with high probability.
+    """
+    s = len(sample)
+    if s == 0:
+        raise ValueError("cannot place a bracket from an empty sample")
+    pos = min(s - 1, int(rank * s / count))
+    if single_pivot:
+        a = np.partition(sample, pos)[pos]
+        return a, a
+    gap = int(math.sqrt(s * math.log(max(count, 2))))
+    lo = pos - gap
+    hi = pos + gap
+    sample = np.partition(sample, (max(lo, 0), min(hi, s - 1)))
+    # A bracket running off the sample stays open on that side
+    # (e.g. k = 0 keeps everything up to b instead of guessing a minimum)
+    a = sample[lo] if lo >= 0 else None
+    b = sample[hi] if hi < s else None
+    return a, b
+
+def _scan(data: np.memmap, bounds: _Bounds, a, b, count: int, band_limit: int,
+          chunk_elems: int, stats: ScanStats) -> tuple:
+    """
+    One sequential pass: counts candidates below a / above b, keeps the band
+    a <= x <= b (up to band_limit) and stride-samples each of the three regions.
+    A missing pivot (None) leaves that side of the band open.
+    """
+    below = 0
+    above = 0
+    band = _Band(band_limit)
+    samples = ([], [], [])
+    # Stride giving ~SAMPLE_SIZE sampled candidates over the whole pass
+    stride = max(1, count // SAMPLE_SIZE)
+    seen = 0
+
+    for start in range(0, len(data), chunk_elems):
+        chunk = np.asarray(data[start:start + chunk_elems])
+        stats.bytes_read += chunk.nbytes
+        chunk = bounds.select(chunk)
+
+        if a is None and b is None:
+            band.add(chunk)
+            continue
+
+        # Only the band is materialized; the outer regions are just
+        # counted and sampled through the strided view. The stride runs
+        # on across chunks, so the sample stays evenly spaced.
+        offset = (-seen) % stride
+        seen += len(chunk)
+        in_band = np.ones(len(chunk), dtype=bool)
+        strided = chunk[offset::stride]
+        if a is not None:
+            is_below = chunk < a
+            below += int(np.count_nonzero(is_below))
+            in_band &= ~is_below
+            samples[0].append(strided[is_below[offset::stride]])
+        if b is not None:
+            is_above = chunk > b
+            above += int(np.count_nonzero(is_above))
+            in_band &= ~is_above
+            samples[2].append(strided[is_above[offset::stride]])
+        band.add(chunk[in_band])
+        samples[1].append(strided[in_band[offset::stride]])
+
+    stats.passes += 1
+    samples = tuple(np.concatenate(parts) if parts else np.empty(0, dtype=data.dtype)
+                    for parts in samples)
+    return below, band, above, samples
+
+def _sample_pass(data: np.memmap, bounds: _Bounds, count: int, chunk_elems: int,
+                 stats: ScanStats) -> np.ndarray:
+    """
+    One sequential pass that only stride-samples the current candidates.
+    Never empty while count > 0, since the stride is at most count.
+    """
+    stride = max(1, count // SAMPLE_SIZE)
+    parts = []
+    seen = 0
+    for start in range(0, len(data), chunk_elems):
+        chunk = np.asarray(data[start:start + chunk_elems])
+        stats.bytes_read += chunk.nbytes
+        chunk = bounds.select(chunk)
+        # Stride over the candidates of the whole pass, not per chunk
+        parts.append(chunk[(-seen) % stride::stride])
+        seen += len(chunk)
+
+    stats.passes += 1
+    return np.concatenate(parts) if parts else np.empty(0, dtype=data.dtype)
@@ -0,0 +1,148 @@
+from src.utils import UNINSTRUMENTED
+
+# Windows smaller than this are insertion-sorted directly
+SMALL_WINDOW = 12
+
+def fast_deterministic_select(arr: list, k: int, probe=None) -> int:
+    """
+    Finds the k-th smallest element with Alexandrescu's adaptive
+    deterministic selection ("Fast Deterministic Selection", 2017).
+
+    Same O(N) worst-case guarantee as Median of Medians, but much cheaper:
+    - Groups are strided, not contiguous: group j is arr[j], arr[j+f], ...
+      Its sample is swapped into a block that is ALREADY in place, so no
+      group is sorted or copied and the pivot lands at a known index.
+    - The pivot sampler adapts to the rank we are looking for:
+        * k in the middle:   median of ninthers (repeated step: median of
+                             3 medians-of-3), pivot = median of the n/9 ninthers
+        * k near the start:  median of minima (k ranks roughly in the middle
+                             of the minima of 2k+1 groups)
+        * k near the end:    median of maxima (mirror image)
+      Every sampler discards a constant fraction of the window (>= 2/9 for
+      ninthers, ~1/2 for minima/maxima), which keeps T(N) linear.
+
+    Args:
+        arr (list): List of integers (or TrackedInts).
+        k (int): Rank of the element.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
+    """
+    if not 0 <= k < len(arr):
+        raise ValueError(f"k={k} is out of bounds.")
+
+    if probe is None:
+        probe = UNINSTRUMENTED
+
+    _adaptive_select(arr, 0, len(arr) - 1, k, probe, 1)
+    return arr[k]
+
+def _adaptive_select(arr: list, low: int, high: int, k: int, probe, depth: int) -> None:
+    """
+    QuickselectAdaptive on arr[low...high]; afterwards arr[k] holds its
+    k-th element. The only recursion is the pivot sample, which is at most
+    1/6 of its window, so the stack stays O(log6 N).
+    """
+    swap = probe.swap
+    partition_three_way = probe.partition_three_way
+
+    while high - low + 1 >= SMALL_WINDOW:
+        probe.enter(depth)
+        n = high - low + 1
+        r = k - low
+
+        # 1. Sample a pivot suited to the relative rank of k
+        if 12 * r < n:
+            pivot_index = _median_of_minima(arr, low, high, k, probe, depth)
+        elif 12 * (high - k) < n:
+            pivot_index = _median_of_maxima(arr, low, high, k, probe, depth)
+        else:
+            pivot_index = _median_of_ninthers(arr, low, high, probe, depth)
+
+        # 2. Three-way Partition around it
+        swap(arr, pivot_index, high)
+        lt, gt = partition_three_way(arr, low, high)
+
+        # 3. Narrow the window
+        if k < lt:
+            high = lt - 1
+        elif k >= gt:
+            low = gt
+        else:
+            return
+        depth += 1
+
+    probe.enter(depth)
+    probe.insertion_sort(arr, low, high)
+
+def _median_of_ninthers(arr: list, low: int, high: int, probe, depth: int) -> int:
+    """
+    Splits the window into 9 strided slices of f = n // 9 and, for every
+    group j (one element per slice), swaps its ninther into the middle slice
+    arr[low+4f+j]. The median of that slice is then selected in place and
+    its index returned.
+    At least 4 elements of every group are <= its ninther (and >= it),
+    so the pivot has >= 2n/9 elements on each side.
+    """
+    less = probe.less
+    swap = probe.swap
+
+    f = (high - low + 1) // 9
+    middle = low + 4 * f
+    for j in range(f):
+        base = low + j
+        a = _median3(arr, base, base + f, base + 2 * f, less)
+        b = _median3(arr, base + 3 * f, base + 4 * f, base + 5 * f, less)
+        c = _median3(arr, base + 6 * f, base + 7 * f, base + 8 * f, less)
+        swap(arr, middle + j, _median3(arr, a, b, c, less))
+
+    pivot_index = middle + f // 2
+    _adaptive_select(arr, middle, middle + f - 1, pivot_index, probe, depth + 1)
+    return pivot_index
+
+def _median_of_minima(arr: list, low: int, high: int, k: int, probe, depth: int) -> int:
+    """
+    For k close to low: moves the minimum of each of m = 2r+1 strided groups
+    (r = k - low) to arr[low...low+m-1] and selects rank r among them.
+    The pivot has >= r elements below it, so k stays on its left, and
+    ~r+1 of the minima (each with a whole group above it) are >= it,
+    so about half of the window is discarded.
+    """
+    less = probe.less
+    swap = probe.swap
+
+    r = k - low
+    m = 2 * r + 1
+    for j in range(m):
+        best = low + j
+        for pos in range(low + j + m, high + 1, m):
+            if less(arr[pos], arr[best]):
+                best = pos
+        swap(arr, low + j, best)
+
+    _adaptive_select(arr, low, low + m - 1, k, probe, depth + 1)
+    return k
+
+def _median_of_maxima(arr: list, low: int, high: int, k: int, probe, depth: int) -> int:
+    """Mirror image of _median_of_minima for k close to high."""
+    less = probe.less
+    swap = probe.swap
+
+    r = high - k
+    m = 2 * r + 1
+    for j in range(m):
+        best = high - j
+        for pos in range(high - j - m, low - 1, -m):
+            if less(arr[best], arr[pos]):
+                best = pos
+        swap(arr, high - j, best)
+
+    _adaptive_select(arr, high - m + 1, high, k, probe, depth + 1)
+    return k
+
+def _median3(arr: list, i: int, j: int, l: int, less) -> int:
+    """Index of the median of arr[i], arr[j], arr[l] (2-3 comparisons)."""
+    if less(arr[j], arr[i]):
+        i, j = j, i
+    # Now arr[i] <= arr[j]
+    if less(arr[l], arr[j]):
+        return i if less(arr[l], arr[i]) else l
+    return j
@@ -1,65 +1,111 @@
 import math
-import sys
 import random
-from src.utils import swap, partition_lomuto
-from src.median_of_medians import median_of_medians_quickselect
+from src.utils import UNINSTRUMENTED
+from src.median_of_medians import mom_select
 
-def introselect(arr: list, k: int) -> int:
+# Windows larger than this pick their pivot from a Floyd-Rivest sample
+# (same cut-off as floyd_rivest_quickselect)
+SAMPLE_THRESHOLD = 600
+
+def introselect(arr: list, k: int, probe=None) -> int:
     """
     Finds the k-th smallest element using Randomized Introselect.
-    
+
     Hybrid Approach:
-    1. Starts with Randomized Quickselect (Fastest Average Case).
-    2. Tracks recursion depth.
-    3. If depth > 2 * log(N), switches to Median-of-Medians (Guaranteed Safety).
-    
+    1. Large windows: Floyd-Rivest sampled pivot (a random sample is solved
+       first, so the pivot lands right next to rank k).
+    2. Small windows: Randomized Quickselect (Fastest Average Case).
+    3. Counts partition rounds (the depth a recursive version would reach).
+    4. If rounds > 2 * log(N), switches to Median-of-Medians (Guaranteed Safety),
+       in place on the window already narrowed down.
+
     Args:
         arr (list): List of integers (or TrackedInts).
         k (int): Rank.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
     """
     if not 0 <= k < len(arr):
         raise ValueError(f"k={k} is out of bounds.")
-        
-    sys_limit = sys.getrecursionlimit()
-    if sys_limit < len(arr) + 1000:
-        sys.setrecursionlimit(len(arr) + 2000)
+
+    if probe is None:
+        probe = UNINSTRUMENTED
+
+    return _introselect_window(arr, 0, len(arr) - 1, k, probe, 0)
+
+def _introselect_window(arr: list, low: int, high: int, k: int, probe, depth: int) -> int:
+    """
+    Introselect on arr[low...high]; afterwards arr[k] holds the answer.
+    Every window (including a sample window) gets its own depth budget.
+    """
+    swap = probe.swap
+    partition_three_way = probe.partition_three_way
 
     # Depth limit heuristic: 2 * log2(n)
     # If we go deeper than this, we assume we hit a pathological case.
-    depth_limit = 2 * int(math.log2(len(arr)))
-    
-    return _introselect_recursive(arr, 0, len(arr) - 1, k, depth_limit)
+    depth_limit = 2 * int(math.log2(high - low + 1))
+
+    # Each partition round narrows [low, high] in place; depth_limit counts
+    # the rounds instead of stack frames.
+    while low < high:
+        depth += 1
+        probe.enter(depth)
+
+        # --- SAFETY SWITCH ---
+        # If the round count exceeds the limit, switch to Median of Medians
+        # on the same window: no copy, and the partitioning done so far is kept
+        if depth_limit == 0:
+            return mom_select(arr, low, high, k, probe=probe)
+
+        if high - low > SAMPLE_THRESHOLD:
+            # --- Sampled pivot (large windows) ---
+            # Afterwards arr[k] is the sample's estimate of the answer
+            _select_sample(arr, low, high, k, probe, depth)
+            pivot_index = k
+        else:
+            # --- Randomized Logic (Primary Strategy) ---
+            # Pick a random pivot index
+            pivot_index = random.randint(low, high)
+
+        # Move pivot to the end for the partition
+        swap(arr, pivot_index, high)
+
+        # Three-way partition: duplicates of the pivot are settled at once
+        lt, gt = partition_three_way(arr, low, high)
+
+        # Narrow the window and decrement the depth budget
+        if k < lt:
+            high = lt - 1
+        elif k >= gt:
+            low = gt
+        else:
+            return arr[k]
+        depth_limit -= 1
+
+    return arr[low]
+
+def _select_sample(arr: list, low: int, high: int, k: int, probe, depth: int) -> None:
+    """
+    Floyd-Rivest sampling step on arr[low...high]: fills a window of
+    ~n^(2/3) slots around k with random elements of the whole window, then
+    selects inside it, so arr[k] ends up holding the sample's k-th element.
+    The random fill keeps the estimate honest on patterned (sorted or
+    adversarial) inputs, where the plain FR slice would be biased.
+    """
+    swap = probe.swap
 
-def _introselect_recursive(arr: list, low: int, high: int, k: int, depth_limit: int) -> int:
     n = high - low + 1
-    
-    # Base case
-    if n == 1:
-        return arr[low]
-        
-    # --- SAFETY SWITCH ---
-    # If recursion depth exceeds limit, switch to Median of Medians
-    if depth_limit == 0:
-        # Pass the specific sub-window to Median of Medians
-        # We slice here for simplicity in this project structure
-        subarray = arr[low : high+1]
-        result = median_of_medians_quickselect(subarray, k - low)
-        return result
-
-    # --- Randomized Logic (Primary Strategy) ---
-    # Pick a random pivot index
-    pivot_index = random.randint(low, high)
-    
-    # Move pivot to the end for standard Lomuto partition
-    swap(arr, pivot_index, high)
-    
-    # Partition
-    pivot_final_index = partition_lomuto(arr, low, high)
-    
-    # Recurse with decremented depth limit
-    if k == pivot_final_index:
-        return arr[k]
-    elif k < pivot_final_index:
-        return _introselect_recursive(arr, low, pivot_final_index - 1, k, depth_limit - 1)
-    else:
-        return _introselect_recursive(arr, pivot_final_index + 1, high, k, depth_limit - 1)
\ No newline at end of file
+    i = k - low + 1 # Rank relative to current window
+    z = math.log(n)
+
+    # Sample size and shift toward the target, as in floyd_rivest_quickselect
+    s = 0.5 * math.exp(2 * z / 3)
+    sign = 1 if i - n / 2 >= 0 else -1
+    sd = 0.5 * math.sqrt(z * s * (n - s) / n) * sign
+
+    new_left = max(low, int(k - i * s / n + sd))
+    new_right = min(high, int(k + (n - i) * s / n + sd))
+
+    for idx in range(new_left, new_right + 1):
+        swap(arr, idx, random.randint(low, high))
+
+    _introselect_window(arr, new_left, new_right, k, probe, depth)
\ No newline at end of file
@@ -1,13 +1,16 @@
-import sys
-from src.utils import swap, partition_lomuto
+from src.utils import UNINSTRUMENTED
 
-def median_of_3_quickselect(arr: list, k: int) -> int:
+def median_of_3_quickselect(arr: list, k: int, probe=None) -> int:
     """
     Finds the k-th smallest element using Deterministic Median-of-3 Quickselect.
     
+    Runs as a loop over the [low, high] window (O(1) stack depth), so even
+    killer sequences that force ~N partition rounds cannot overflow the stack.
+    
     Args:
         arr (list): A list of integers (or TrackedInts).
         k (int): The rank of the element to find.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
 
     Returns:
         int: The value of the k-th smallest element.
@@ -15,38 +18,43 @@ def median_of_3_quickselect(arr: list, k: int) -> int:
     if not 0 <= k < len(arr):
         raise ValueError(f"k={k} is out of bounds.")
 
-    # Increase recursion limit for safety
-    sys_limit = sys.getrecursionlimit()
-    if sys_limit < len(arr) + 100:
-        sys.setrecursionlimit(len(arr) + 1000)
+    if probe is None:
+        probe = UNINSTRUMENTED
+    swap = probe.swap
+    less = probe.less
+    partition_three_way = probe.partition_three_way
 
-    return _mo3_recursive(arr, 0, len(arr) - 1, k)
+    low = 0
+    high = len(arr) - 1
+    depth = 0
 
-def _mo3_recursive(arr: list, low: int, high: int, k: int) -> int:
-    if low == high:
-        return arr[low]
+    while low < high:
+        depth += 1
+        probe.enter(depth)
 
-    # --- Median of 3 Logic Start ---
-    mid = (low + high) // 2
-    
-    # Sort low, mid, high in-place
-    if arr[high] < arr[low]:
-        swap(arr, low, high)
-    if arr[mid] < arr[low]:
-        swap(arr, low, mid)
-    if arr[high] < arr[mid]:
-        swap(arr, mid, high)
+        # --- Median of 3 Logic Start ---
+        mid = (low + high) // 2
         
-    # Now arr[low] <= arr[mid] <= arr[high]
-    # arr[mid] is our pivot. Swap it to 'high' to use Lomuto partition.
-    swap(arr, mid, high)
-    # --- Median of 3 Logic End ---
-
-    pivot_final_index = partition_lomuto(arr, low, high)
-
-    if k == pivot_final_index:
-        return arr[k]
-    elif k < pivot_final_index:
-        return _mo3_recursive(arr, low, pivot_final_index - 1, k)
-    else:
-        return _mo3_recursive(arr, pivot_final_index + 1, high, k)
\ No newline at end of file
+        # Sort low, mid, high in-place
+        if less(arr[high], arr[low]):
+            swap(arr, low, high)
+        if less(arr[mid], arr[low]):
+            swap(arr, low, mid)
+        if less(arr[high], arr[mid]):
+            swap(arr, mid, high)
+            
+        # Now arr[low] <= arr[mid] <= arr[high]
+        # arr[mid] is our pivot. Swap it to 'high' for the partition.
+        swap(arr, mid, high)
+        # --- Median of 3 Logic End ---
+
+        lt, gt = partition_three_way(arr, low, high)
+
+        if k < lt:
+            high = lt - 1
+        elif k >= gt:
+            low = gt
+        else:
+            return arr[k]
+
+    return arr[low]
\ No newline at end of file
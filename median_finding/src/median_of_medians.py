@@ -1,7 +1,6 @@
-import sys
-from src.utils import swap, partition_lomuto
+from src.utils import UNINSTRUMENTED
 
-def median_of_medians_quickselect(arr: list, k: int) -> int:
+def median_of_medians_quickselect(arr: list, k: int, probe=None) -> int:
     """
     Finds the k-th smallest element using Median of Medians (MoM).
     Guarantees O(N) worst-case time complexity, but with high constant factors.
@@ -9,58 +8,96 @@ def median_of_medians_quickselect(arr: list, k: int) -> int:
     Args:
         arr (list): A list of integers (or TrackedInts).
         k (int): The rank of the element to find.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
     """
     if not 0 <= k < len(arr):
         raise ValueError(f"k={k} is out of bounds.")
 
-    # MoM is recursion-heavy.
-    sys_limit = sys.getrecursionlimit()
-    if sys_limit < len(arr) + 1000:
-        sys.setrecursionlimit(len(arr) + 2000)
+    return mom_select(arr, 0, len(arr) - 1, k, probe)
 
-    return _mom_recursive(arr, 0, len(arr) - 1, k)
-
-def _mom_recursive(arr: list, low: int, high: int, k: int) -> int:
+def mom_select(arr: list, low: int, high: int, k: int, probe=None) -> int:
     """
+    Median of Medians restricted to the window arr[low...high], in place.
+    Returns the k-th smallest element of the window (k is an absolute index,
+    low <= k <= high); afterwards arr[k] holds it. Nothing outside the window
+    is touched and no copy is made, so introselect can hand over the window
+    it was already partitioning.
+
     Standard Selection logic, but uses MoM to pick the pivot.
-    """
-    if low == high:
-        return arr[low]
-    
-    # 1. Select Pivot using Median of Medians
-    # This function guarantees the pivot is roughly in the middle 30-70% range
-    pivot_index = _select_pivot_mom(arr, low, high)
-    
-    # 2. Move pivot to end for Lomuto partition
-    swap(arr, pivot_index, high)
     
-    # 3. Standard Partition
-    pivot_final_index = partition_lomuto(arr, low, high)
+    Classic MoM recurses twice: once to find the median of the group medians
+    (the pivot) and once into the side of the partition holding k. The second
+    one is a tail call, so it becomes a loop narrowing [low, high].
+    The first one is replaced by an explicit stack of suspended frames:
+    we push (low, high, k), then solve the much smaller "median of the
+    medians" window. When that window is solved, its answer sits at its own
+    index k, which is exactly the pivot index the parent frame needs.
     
-    # 4. Recurse
-    if k == pivot_final_index:
-        return arr[k]
-    elif k < pivot_final_index:
-        return _mom_recursive(arr, low, pivot_final_index - 1, k)
-    else:
-        return _mom_recursive(arr, pivot_final_index + 1, high, k)
+    Every pushed window is 5x smaller than its parent, so the stack never
+    holds more than log5(N) frames.
+    `depth` tracks how deep the recursive formulation would be at each step.
+    """
+    if not low <= k <= high:
+        raise ValueError(f"k={k} is outside the window [{low}, {high}].")
+
+    if probe is None:
+        probe = UNINSTRUMENTED
+    swap = probe.swap
+    partition_three_way = probe.partition_three_way
+
+    stack = []          # Suspended (low, high, k, depth) frames waiting for a pivot
+    pivot_index = None  # Set when a child frame has just delivered a pivot
+    depth = 1
+
+    while True:
+        probe.enter(depth)
+        if pivot_index is None:
+            if high - low < 5:
+                # Base case: sort the tiny window, arr[k] is now in place
+                _insertion_sort_median(arr, low, high, probe)
+            else:
+                # 1. Select Pivot using Median of Medians
+                # Gather group medians at the front, then solve that window first
+                num_groups = _move_group_medians(arr, low, high, probe)
+                stack.append((low, high, k, depth))
+                high = low + num_groups - 1
+                k = low + num_groups // 2
+                depth += 1
+                continue
+        else:
+            # 2. Move pivot to end for the partition
+            swap(arr, pivot_index, high)
+            
+            # 3. Three-way Partition (< pivot | == pivot | > pivot)
+            lt, gt = partition_three_way(arr, low, high)
+            pivot_index = None
+            
+            # 4. Narrow the window (replaces the tail recursion)
+            #    If k falls in the equal block, this frame is solved.
+            if k < lt:
+                high = lt - 1
+                depth += 1
+                continue
+            elif k >= gt:
+                low = gt
+                depth += 1
+                continue
 
-def _select_pivot_mom(arr: list, low: int, high: int) -> int:
+        # The current frame is solved: arr[k] holds its k-th element
+        if not stack:
+            return arr[k]
+        # Hand the answer back to the parent frame as its pivot
+        pivot_index = k
+        low, high, k, depth = stack.pop()
+
+def _move_group_medians(arr: list, low: int, high: int, probe) -> int:
     """
-    Finds the 'Median of Medians' of the subarray arr[low...high].
-    Returns the INDEX of that median.
+    Step 1 of Median of Medians on the subarray arr[low...high]:
+    divides it into groups of 5 and swaps the median of every group to the
+    beginning of the window: arr[low], arr[low+1], ... arr[low + num_groups - 1].
+    Returns num_groups.
     """
     n = high - low + 1
-    
-    # Base case for small arrays: just sort and pick median
-    # 5 is the magic number for MoM analysis, but practically < 10 is fine.
-    if n <= 5:
-        return _insertion_sort_median(arr, low, high)
-        
-    # --- Step 1: Divide into groups of 5 and find medians ---
-    # We will swap the medians of these groups to the beginning of the array:
-    # arr[low], arr[low+1], ... arr[low + num_groups - 1]
-    
     num_groups = (n + 4) // 5 # Ceiling division
     
     for i in range(num_groups):
@@ -68,46 +105,20 @@ def _select_pivot_mom(arr: list, low: int, high: int) -> int:
         group_end = min(low + (i * 5) + 4, high)
         
         # Find median of this specific group
-        median_idx = _insertion_sort_median(arr, group_start, group_end)
+        median_idx = _insertion_sort_median(arr, group_start, group_end, probe)
         
         # Move the found median to the 'storage area' at the start of array
-        swap(arr, low + i, median_idx)
-        
-    # --- Step 2: Recursively find the median of the medians ---
-    # The medians are now stored in arr[low ... low + num_groups - 1]
-    # We need the median of THIS range.
-    mom_val = _mom_recursive(arr, low, low + num_groups - 1, low + (num_groups // 2))
-    # We need the INDEX of this value within the current window [low...high].
-    
-    for i in range(low, high + 1):
-        if arr[i] == mom_val: # This uses the safer __eq__ now
-            return i
+        probe.swap(arr, low + i, median_idx)
 
-def _insertion_sort_median(arr: list, low: int, high: int) -> int:
+    return num_groups
+
+def _insertion_sort_median(arr: list, low: int, high: int, probe) -> int:
     """
     Helper: Sorts the small range arr[low...high] and returns the index of the median.
-    Using simple insertion sort (or bubble sort) since N <= 5.
+    Using simple insertion sort since N <= 5. The probe counts its shifts as
+    swaps, so no extra bubble-sort pass is needed to keep swap counts honest.
     """
-    # Simple sort for the small window
-    for i in range(low + 1, high + 1):
-        key_val = arr[i]
-        j = i - 1
-        # Note: We compare values but we must be careful not to lose TrackedInt wrappers
-        # if you were reconstructing. Here we just swap in place.
-        while j >= low and arr[j] > key_val:
-            swap(arr, j, j + 1) # Use swap to increment metric counters
-            j -= 1
-        # Since we swapped element-by-element, the hole is at j+1
-        # But our swap helper is naive. 
-        # For strict correctness with 'swap' counting, bubble sort is easier for small N.
-        
-    # Re-implementing with Bubble Sort for strict swap counting 
-    # (Insertion sort logic above with `swap` is tricky to align with strict indices)
-    # Since N is max 5, performance difference is negligible.
-    for i in range(low, high + 1):
-        for j in range(low, high - i + low):
-            if arr[j] > arr[j + 1]:
-                swap(arr, j, j + 1)
+    probe.insertion_sort(arr, low, high)
                 
     # Return the index of the middle element
     return low + (high - low) // 2
\ No newline at end of file
@@ -0,0 +1,165 @@
+import math
+import os
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from src.floyd_rivest import floyd_rivest_quickselect
+
+# Shards are capped so each worker task has bounded temporaries
+MAX_SHARD = 1 << 22
+
+# Below this many candidates the band is gathered and solved on one core
+GATHER_THRESHOLD = 1 << 16
+
+# Worker-side view of the shared buffer (set once per process by _attach)
+_SHM = None
+_BUFFER = None
+
+def parallel_select(values, k: int, workers: int = None, seed: int = None):
+    """
+    Finds the k-th smallest element of a large array using a process pool.
+
+    The data is copied once into shared memory and split into shards.
+    Each round:
+    1. Sample: draw a global sample (proportional from every shard) and pick
+       two pivots a <= b that bracket rank k, as in Floyd-Rivest's sampling step.
+    2. Count: every worker rearranges its shard in place into
+       [x < a | a <= x <= b | x > b] and reports the three counts.
+    3. Narrow: the counts tell which band holds rank k. Only that band of
+       every shard stays active; all other elements are discarded.
+    Once the candidates fit comfortably on one core, they are gathered and
+    finished with floyd_rivest_quickselect.
+
+    Args:
+        values (array-like): 1-D numeric data (NumPy array or list).
+        k (int): Rank of the element (0-based).
+        workers (int, optional): Number of processes (default: all cores).
+        seed (int, optional): Seed for the pivot sample.
+
+    Returns:
+        The value of the k-th smallest element.
+    """
+    values = np.asarray(values)
+    if values.ndim != 1:
+        raise ValueError("parallel_select expects a 1-D array.")
+    n = len(values)
+    if not 0 <= k < n:
+        raise ValueError(f"k={k} is out of bounds for array length {n}")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        buffer = np.ndarray(n, dtype=values.dtype, buffer=shm.buf)
+        buffer[:] = values
+
+        with Pool(workers, initializer=_attach,
+                  initargs=(shm.name, values.dtype.str, n)) as pool:
+            result = _select_rounds(pool, buffer, k, workers, rng)
+
+        # Drop our view before the block is released
+        del buffer
+        return result
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _select_rounds(pool, buffer: np.ndarray, k: int, workers: int, rng) -> object:
+    """
+    The sample / count / narrow loop on the shared buffer.
+    Shards are (start, length) ranges of the buffer that still hold candidates.
+    """
+    n = len(buffer)
+    num_shards = max(workers, math.ceil(n / MAX_SHARD))
+    bounds = np.linspace(0, n, num_shards + 1).astype(np.int64)
+    shards = [(int(s), int(e - s)) for s, e in zip(bounds[:-1], bounds[1:]) if e > s]
+
+    total = n
+    single_pivot = False
+
+    while total > GATHER_THRESHOLD:
+        a, b = _pick_pivots(buffer, shards, total, k, rng, single_pivot)
+
+        counts = pool.map(_partition_shard, [(start, length, a, b) for start, length in shards])
+        below = sum(c[0] for c in counts)
+        middle = sum(c[1] for c in counts)
+
+        if k < below:
+            shards = [(start, lo) for (start, _), (lo, _, _) in zip(shards, counts)]
+            new_total = below
+        elif k < below + middle:
+            if a == b:
+                return a.item()
+            shards = [(start + lo, mid) for (start, _), (lo, mid, _) in zip(shards, counts)]
+            k -= below
+            new_total = middle
+        else:
+            shards = [(start + lo + mid, hi) for (start, _), (lo, mid, hi) in zip(shards, counts)]
+            k -= below + middle
+            new_total = total - below - middle
+
+        shards = [(start, length) for start, length in shards if length > 0]
+
+        # A bracket that kept everything (heavy duplicates between a and b)
+        # makes no progress; fall back to a single pivot next round.
+        single_pivot = new_total == total
+        total = new_total
+
+    # --- Gather the surviving band and finish on one core ---
+    candidates = np.concatenate([buffer[start:start + length] for start, length in shards])
+    return floyd_rivest_quickselect(candidates.tolist(), k)
+
+def _pick_pivots(buffer: np.ndarray, shards: list, total: int, k: int, rng,
+                 single_pivot: bool) -> tuple:
+    """
+    Floyd-Rivest sampling step over all shards.
+    Returns pivots (a, b) such that rank k very likely lies between them.
+    """
+    s = min(total, max(1000, int(total ** (2 / 3))))
+
+    # Proportional sample: every shard contributes by its share of candidates
+    parts = []
+    for start, length in shards:
+        m = max(1, round(s * length / total))
+        parts.append(buffer[start + rng.integers(0, length, size=m)])
+    sample = np.concatenate(parts)
+    s = len(sample)
+
+    # Position of rank k inside the sample, plus a safety gap on both sides
+    pos = min(s - 1, int(k * s / total))
+    if single_pivot:
+        a = np.partition(sample, pos)[pos]
+        return a, a
+
+    gap = int(math.sqrt(s * math.log(total)))
+    lo = max(0, pos - gap)
+    hi = min(s - 1, pos + gap)
+    sample = np.partition(sample, (lo, hi))
+    return sample[lo], sample[hi]
+
+def _attach(name: str, dtype: str, n: int) -> None:
+    """Pool initializer: map the shared buffer into this worker."""
+    global _SHM, _BUFFER
+    _SHM = shared_memory.SharedMemory(name=name)
+    _BUFFER = np.ndarray(n, dtype=np.dtype(dtype), buffer=_SHM.buf)
+
+def _partition_shard(task: tuple) -> tuple:
+    """
+    Worker: rearranges buffer[start:start+length] into
+    [x < a | a <= x <= b | x > b] in place and returns the three counts.
+    """
+    start, length, a, b = task
+    shard = _BUFFER[start:start + length]
+
+    is_below = shard < a
+    is_above = shard > b
+    below = shard[is_below]
+    middle = shard[~(is_below | is_above)]
+    above = shard[is_above]
+
+    shard[:len(below)] = below
+    shard[len(below):len(below) + len(middle)] = middle
+    shard[len(below) + len(middle):] = above
+
+    return len(below), len(middle), len(above)
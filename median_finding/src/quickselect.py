@@ -1,17 +1,20 @@
 import random
-from src.utils import swap, partition_lomuto
-import sys
+from src.utils import UNINSTRUMENTED
 
-def randomized_quickselect(arr: list, k: int) -> int:
+def randomized_quickselect(arr: list, k: int, probe=None) -> int:
     """
     Finds the k-th smallest element in an unordered list using Randomized Quickselect.
     
-    This is a wrapper function to handle edge cases and recursion limits.
+    Quickselect only ever continues into ONE side of the partition, so the
+    recursion is a tail call. We run it as a loop that narrows [low, high]
+    in place: O(1) stack depth, no matter how unlucky the pivots are.
     
     Args:
         arr (list): A list of integers (or TrackedInts).
         k (int): The rank of the element to find (0-based index). 
                  k=0 is the minimum, k=n-1 is the maximum.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
+                 Omit it for the uninstrumented fast path.
 
     Returns:
         int: The value of the k-th smallest element.
@@ -19,35 +22,35 @@ def randomized_quickselect(arr: list, k: int) -> int:
     if not 0 <= k < len(arr):
         raise ValueError(f"k={k} is out of bounds for array length {len(arr)}")
 
-    # Increase recursion limit for deep recursion on large datasets
-    # Standard Python limit is 1000, which breaks on N=10,000 sorted inputs
-    sys_limit = sys.getrecursionlimit()
-    if sys_limit < len(arr) + 100:
-        sys.setrecursionlimit(len(arr) + 1000)
+    if probe is None:
+        probe = UNINSTRUMENTED
+    swap = probe.swap
+    partition_three_way = probe.partition_three_way
 
-    return _quickselect_recursive(arr, 0, len(arr) - 1, k)
+    low = 0
+    high = len(arr) - 1
+    depth = 0
 
-def _quickselect_recursive(arr: list, low: int, high: int, k: int) -> int:
-    """
-    Internal recursive function for Quickselect.
-    """
-    # Base case: if the list contains only one element
-    if low == high:
-        return arr[low]
-
-    # 1. Random Selection: Pick a random pivot index between low and high
-    pivot_index = random.randint(low, high)
-
-    # 2. Move pivot to the end to use standard Lomuto partition
-    swap(arr, pivot_index, high)
-
-    # 3. Partition the array
-    pivot_final_index = partition_lomuto(arr, low, high)
-
-    # 4. Decision: Recurse Left, Right, or Return
-    if k == pivot_final_index:
-        return arr[k]
-    elif k < pivot_final_index:
-        return _quickselect_recursive(arr, low, pivot_final_index - 1, k)
-    else:
-        return _quickselect_recursive(arr, pivot_final_index + 1, high, k)
\ No newline at end of file
+    # Loop until the window collapses onto k
+    while low < high:
+        depth += 1
+        probe.enter(depth)
+
+        # 1. Random Selection: Pick a random pivot index between low and high
+        pivot_index = random.randint(low, high)
+
+        # 2. Move pivot to the end, where the partition expects it
+        swap(arr, pivot_index, high)
+
+        # 3. Partition the array into < pivot | == pivot | > pivot
+        lt, gt = partition_three_way(arr, low, high)
+
+        # 4. Decision: Narrow Left, Right, or Return if k is in the equal block
+        if k < lt:
+            high = lt - 1
+        elif k >= gt:
+            low = gt
+        else:
+            return arr[k]
+
+    return arr[low]
\ No newline at end of file
@@ -0,0 +1,93 @@
+import numpy as np
+from src.external_select import ScanStats
+
+# Bits per digit: 2^11 histogram bins stay in L1/L2 cache
+DIGIT_BITS = 11
+
+SIGN_BIT = np.uint64(1 << 63)
+
+def radix_select(arr, k: int, stats: ScanStats = None, digit_bits: int = DIGIT_BITS):
+    """
+    Finds the k-th smallest element with MSD radix select (no comparisons).
+
+    Keys are mapped to uint64 with an order-preserving bit transform, so
+    signed integers and floats work too. Each pass:
+    1. Histograms the current digit of every candidate with np.bincount.
+    2. Walks the cumulative counts to find the bucket holding rank k.
+    3. Keeps only that bucket and moves on to the next digit.
+    Bits shared by ALL candidates are skipped, so bounded data such as
+    generate_uniform_random (0..10^6, 20 significant bits) takes 2 passes.
+
+    Args:
+        arr (list | np.ndarray): Integers or floats.
+        k (int): Rank of the element (0-based).
+        stats (ScanStats, optional): Filled with bytes read and passes.
+        digit_bits (int): Bits examined per pass.
+
+    Returns:
+        The value of the k-th smallest element.
+    """
+    values = np.asarray(arr)
+    if not 0 <= k < len(values):
+        raise ValueError(f"k={k} is out of bounds for array length {len(values)}")
+    if stats is None:
+        stats = ScanStats()
+
+    keys = _to_ordered_keys(values)
+    mask = np.uint64((1 << digit_bits) - 1)
+
+    while True:
+        # Skip the prefix shared by every remaining key
+        varying = int(keys.min() ^ keys.max()).bit_length()
+        if varying == 0:
+            break
+        shift = np.uint64(max(0, varying - digit_bits))
+
+        digits = ((keys >> shift) & mask).astype(np.intp)
+        counts = np.bincount(digits, minlength=1 << digit_bits)
+        stats.bytes_read += keys.nbytes
+        stats.passes += 1
+
+        # Bucket holding rank k, and k's rank inside that bucket
+        cumulative = np.cumsum(counts)
+        bucket = int(np.searchsorted(cumulative, k, side='right'))
+        if bucket > 0:
+            k -= int(cumulative[bucket - 1])
+
+        keys = keys[digits == bucket]
+
+    stats.band_size = len(keys)
+    return _from_ordered_key(keys[0], values.dtype)
+
+def _to_ordered_keys(values: np.ndarray) -> np.ndarray:
+    """
+    Maps values to uint64 keys whose unsigned order equals the value order.
+    - unsigned ints: unchanged
+    - signed ints:   flip the sign bit (negatives now sort first)
+    - floats:        IEEE-754 trick: negatives get all bits flipped,
+                     non-negatives get the sign bit set (NaNs sort last)
+    """
+    kind = values.dtype.kind
+    if kind == 'u' or kind == 'b':
+        return values.astype(np.uint64)
+    if kind == 'i':
+        return values.astype(np.int64).view(np.uint64) ^ SIGN_BIT
+    if kind == 'f':
+        bits = values.astype(np.float64).view(np.uint64)
+        negative = (bits & SIGN_BIT) != 0
+        return np.where(negative, ~bits, bits | SIGN_BIT)
+    raise TypeError(f"radix_select needs integer or float keys, got {values.dtype}.")
+
+def _from_ordered_key(key: np.uint64, dtype: np.dtype):
+    """Inverse of _to_ordered_keys for a single key."""
+    return _from_ordered_keys(np.array([key], dtype=np.uint64), dtype)[0].item()
+
+def _from_ordered_keys(keys: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """Inverse of _to_ordered_keys: uint64 keys back to values of dtype."""
+    kind = dtype.kind
+    if kind == 'i':
+        keys = (keys ^ SIGN_BIT).view(np.int64)
+    elif kind == 'f':
+        negative = (keys & SIGN_BIT) == 0
+        keys = np.where(negative, ~keys, keys & ~SIGN_BIT).view(np.float64)
+    return keys.astype(dtype)
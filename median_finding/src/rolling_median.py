@@ -0,0 +1,116 @@
+from collections import deque
+import numpy as np
+from src.order_statistic import IndexableSkiplist
+
+# Batch API: windows up to this size use the vectorized NumPy path
+VECTORIZED_MAX_WINDOW = 512
+
+# Elements materialized per block by the vectorized path (64 MB of float64)
+BLOCK_ELEMS = 1 << 23
+
+class RollingMedian:
+    """
+    Streaming median over the last `window` samples.
+
+    Keeps the samples in arrival order (deque) and in sorted order
+    (IndexableSkiplist), so push, pop and any rank query are O(log W)
+    instead of re-running a selector over a copy of the window.
+
+        rm = RollingMedian(1000)
+        for x in stream:
+            rm.push(x)
+            current = rm.median()
+    """
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError(f"window={window} must be at least 1.")
+        self.window = window
+        self._fifo = deque()
+        self._sorted = IndexableSkiplist(window)
+
+    def __len__(self):
+        return len(self._fifo)
+
+    def push(self, value):
+        """
+        Adds the newest sample. If the window is full, the oldest sample is
+        evicted and returned; otherwise returns None.
+        """
+        self._fifo.append(value)
+        self._sorted.insert(value)
+        if len(self._fifo) > self.window:
+            return self.pop()
+        return None
+
+    def pop(self):
+        """Removes and returns the oldest sample in the window."""
+        if not self._fifo:
+            raise IndexError("pop from an empty window")
+        oldest = self._fifo.popleft()
+        self._sorted.remove(oldest)
+        return oldest
+
+    def select(self, k: int):
+        """The k-th smallest sample currently in the window (0-based)."""
+        return self._sorted[k]
+
+    def rank(self, value) -> int:
+        """Number of samples in the window strictly smaller than value."""
+        return self._sorted.rank(value)
+
+    def median(self):
+        """Median of the window (mean of the two middle samples if even)."""
+        n = len(self._fifo)
+        if n == 0:
+            raise IndexError("median of an empty window")
+        if n % 2:
+            return self._sorted[n // 2]
+        return (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2
+
+def rolling_median(values, window: int, method: str = "auto") -> np.ndarray:
+    """
+    Batch API: the median of every full window of `values`.
+
+    Returns an array of len(values) - window + 1 medians (same convention as
+    np.median over numpy.lib.stride_tricks.sliding_window_view).
+    - "vectorized": np.median over blocks of window views.
+      It is O(W) per output, but runs in C.
+    - "skiplist": one RollingMedian pass, O(log W) per output.
+    - "auto": vectorized up to VECTORIZED_MAX_WINDOW, skiplist beyond.
+
+    Args:
+        values (array-like): 1-D samples.
+        window (int): Window size W.
+        method (str): "auto", "vectorized" or "skiplist".
+    """
+    values = np.asarray(values)
+    if values.ndim != 1:
+        raise ValueError("rolling_median expects a 1-D array.")
+    if not 1 <= window <= len(values):
+        raise ValueError(f"window={window} must be between 1 and {len(values)}.")
+    if method not in ("auto", "vectorized", "skiplist"):
+        raise ValueError(f"Unknown method {method!r}.")
+
+    if method == "vectorized" or (method == "auto" and window <= VECTORIZED_MAX_WINDOW):
+        return _rolling_median_vectorized(values, window)
+    return _rolling_median_streaming(values, window)
+
+def _rolling_median_vectorized(values: np.ndarray, window: int) -> np.ndarray:
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    rows_per_block = max(1, BLOCK_ELEMS // window)
+    out = np.empty(len(windows))
+    for start in range(0, len(windows), rows_per_block):
+        block = windows[start:start + rows_per_block]
+        out[start:start + len(block)] = np.median(block, axis=1)
+    return out
+
+def _rolling_median_streaming(values: np.ndarray, window: int) -> np.ndarray:
+    rm = RollingMedian(window)
+    samples = values.tolist()
+    for x in samples[:window - 1]:
+        rm.push(x)
+    out = np.empty(len(samples) - window + 1)
+    for i, x in enumerate(samples[window - 1:]):
+        rm.push(x)
+        out[i] = rm.median()
+    return out
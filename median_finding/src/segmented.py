@@ -0,0 +1,146 @@
+import numpy as np
+from src.radix_select import radix_select, _to_ordered_keys, _from_ordered_keys
+
+# Groups larger than this are solved one at a time with radix_select;
+# all smaller groups share one vectorized segmented sort
+LARGE_GROUP = 4096
+
+# Elements of small groups handled per vectorized step (bounds temporaries)
+CHUNK_ELEMS = 1 << 22
+
+def segmented_select(values, offsets, k, large_group: int = LARGE_GROUP) -> np.ndarray:
+    """
+    Finds the k-th smallest element of EVERY group of a flat array at once,
+    e.g. per-endpoint latency percentiles over millions of small groups.
+
+    Group g is values[offsets[g]:offsets[g+1]] (CSR layout), so calling a
+    selector once per Python list (and paying its call overhead per group)
+    is avoided:
+    - Small groups: one segmented sort per chunk. Each value is mapped to an
+      order-preserving uint64 key and packed with its group number into a
+      single key, so one np.sort orders every group at once; the answers
+      are read at start + k and decoded from the low bits.
+    - Large groups: radix_select on the group's slice (linear, no sort).
+
+    Args:
+        values (array-like): 1-D integers or floats, grouped contiguously.
+        offsets (array-like): G+1 non-decreasing group boundaries.
+        k (int | array-like): Rank inside each group (0-based), one per group
+                              or a single rank for all of them.
+        large_group (int): Size above which a group is solved on its own.
+
+    Returns:
+        np.ndarray: The G selected elements (same dtype as values).
+    """
+    values = np.asarray(values)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if values.ndim != 1:
+        raise ValueError("segmented_select expects a 1-D array of values.")
+    if offsets.ndim != 1 or len(offsets) == 0:
+        raise ValueError("offsets must be a 1-D array of G+1 boundaries.")
+    sizes = np.diff(offsets)
+    if np.any(sizes < 0) or offsets[0] < 0 or offsets[-1] > len(values):
+        raise ValueError("offsets must be non-decreasing and within the values array.")
+
+    k = np.broadcast_to(np.asarray(k, dtype=np.int64), sizes.shape)
+    bad = np.flatnonzero((k < 0) | (k >= sizes))
+    if len(bad):
+        g = bad[0]
+        raise ValueError(f"k={k[g]} is out of bounds for group {g} of size {sizes[g]}")
+
+    starts = offsets[:-1]
+    out = np.empty(len(sizes), dtype=values.dtype)
+
+    large = sizes > large_group
+    small = np.flatnonzero(~large)
+    if len(small):
+        out[small] = _select_small(values, starts[small], sizes[small], k[small])
+    for g in np.flatnonzero(large):
+        out[g] = radix_select(values[starts[g]:starts[g] + sizes[g]], int(k[g]))
+    return out
+
+def segmented_quantile(values, offsets, q: float, large_group: int = LARGE_GROUP) -> np.ndarray:
+    """
+    The q-quantile of every group, using the lower nearest rank
+    k = floor(q * (size - 1)) (np.quantile with method='lower').
+    Every group must be non-empty.
+    """
+    if not 0.0 <= q <= 1.0:
+        raise ValueError(f"q={q} must be between 0 and 1.")
+    sizes = np.diff(np.asarray(offsets, dtype=np.int64))
+    k = np.floor(q * (sizes - 1)).astype(np.int64)
+    return segmented_select(values, offsets, k, large_group)
+
+def group_by_labels(labels) -> tuple:
+    """
+    Groups equal labels together.
+
+    Returns:
+        tuple: (keys, order, offsets) where values[order] is grouped by label,
+               keys[g] is the label of group g, and offsets are its boundaries.
+    """
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    grouped = labels[order]
+    if len(grouped) == 0:
+        return grouped, order, np.zeros(1, dtype=np.int64)
+    boundaries = np.flatnonzero(grouped[1:] != grouped[:-1]) + 1
+    offsets = np.concatenate(([0], boundaries, [len(grouped)])).astype(np.int64)
+    return grouped[offsets[:-1]], order, offsets
+
+def grouped_select(values, labels, k) -> tuple:
+    """segmented_select keyed by labels. Returns (keys, results)."""
+    keys, order, offsets = group_by_labels(labels)
+    return keys, segmented_select(np.asarray(values)[order], offsets, k)
+
+def grouped_quantile(values, labels, q: float) -> tuple:
+    """segmented_quantile keyed by labels. Returns (keys, results)."""
+    keys, order, offsets = group_by_labels(labels)
+    return keys, segmented_quantile(np.asarray(values)[order], offsets, q)
+
+def _select_small(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray,
+                  k: np.ndarray) -> np.ndarray:
+    """Vectorized selection over many small groups, CHUNK_ELEMS elements at a time."""
+    out = np.empty(len(sizes), dtype=values.dtype)
+    ends = np.cumsum(sizes)
+    first = 0
+    while first < len(sizes):
+        base = ends[first] - sizes[first]
+        last = max(first + 1, int(np.searchsorted(ends, base + CHUNK_ELEMS, side='right')))
+        out[first:last] = _select_chunk(values, starts[first:last], sizes[first:last],
+                                        k[first:last])
+        first = last
+    return out
+
+def _select_chunk(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray,
+                  k: np.ndarray) -> np.ndarray:
+    num_groups = len(sizes)
+    local_starts = np.cumsum(sizes) - sizes
+    total = int(local_starts[-1] + sizes[-1])
+
+    # Gather the groups into one contiguous run (a plain slice when they
+    # already are contiguous), tagged with group numbers
+    shift = starts - local_starts
+    if np.all(shift == shift[0]):
+        gathered = values[shift[0]:shift[0] + total]
+    else:
+        gathered = values[np.arange(total, dtype=np.int64) + np.repeat(shift, sizes)]
+    group_ids = np.repeat(np.arange(num_groups, dtype=np.uint64), sizes)
+
+    keys = _to_ordered_keys(gathered)
+    lowest = keys.min() if total else np.uint64(0)
+    keys -= lowest
+    value_bits = int(keys.max()).bit_length() if total else 0
+    group_bits = max(num_groups - 1, 0).bit_length()
+
+    if value_bits + group_bits > 64:
+        # Too wide to pack: sort by (group, key) the slow way
+        order = np.lexsort((keys, group_ids))
+        return gathered[order[local_starts + k]]
+
+    # Pack (group, key) into one uint64: a single sort orders every group,
+    # and the answers are decoded straight from the low bits
+    packed = np.sort((group_ids << np.uint64(value_bits)) | keys)
+    mask = np.uint64((1 << value_bits) - 1)
+    picked = (packed[local_starts + k] & mask) + lowest
+    return _from_ordered_keys(picked, values.dtype)
@@ -0,0 +1,111 @@
+import math
+import random
+from bisect import bisect_right
+from src.utils import UNINSTRUMENTED
+from src.median_of_medians import mom_select
+from src.introselect import SAMPLE_THRESHOLD, _select_sample
+
+class Selector:
+    """
+    Selection session over ONE buffer, for several rank queries in a row.
+
+    Every partition leaves fixed points behind: after a three-way partition
+    of a window, everything left of `lt` is <= everything from `lt` on (and
+    the same at `gt`). The session keeps these CUTS in a sorted list. A
+    later select(k) bisects the cuts for the nearest known pivots around k
+    and only partitions the bracket between them, so follow-up queries
+    cost a fraction of the first:
+
+        s = Selector(latencies)
+        p50 = s.select(len(s) // 2)          # ~full introselect
+        p90, p99 = s.select_many([...])      # only their brackets
+
+    The pivot choice is introselect's (Floyd-Rivest sample on large windows,
+    random pivot on small ones, in-place Median of Medians past the depth
+    budget), so each query keeps its guarantees.
+
+    Args:
+        values (iterable): The data; copied into a list the session owns.
+        probe (Probe, optional): Counts comparisons, swaps and depth.
+    """
+    def __init__(self, values, probe=None):
+        self.arr = list(values)
+        self.probe = UNINSTRUMENTED if probe is None else probe
+        # Sorted cut positions c: max(arr[:c]) <= min(arr[c:])
+        self._cuts = [0, len(self.arr)]
+        # Starts of brackets known to be in final order (single or all-equal)
+        self._solved = set()
+
+    def __len__(self):
+        return len(self.arr)
+
+    @property
+    def known_pivots(self) -> int:
+        """Number of established cuts (excluding both ends of the buffer)."""
+        return len(self._cuts) - 2
+
+    def select(self, k: int):
+        """Returns the k-th smallest element (0-based) of the buffer."""
+        if not 0 <= k < len(self.arr):
+            raise ValueError(f"k={k} is out of bounds.")
+
+        # Nearest known pivots around k: the bracket [low, high]
+        i = bisect_right(self._cuts, k)
+        low = self._cuts[i - 1]
+        high = self._cuts[i] - 1
+        if low in self._solved:
+            return self.arr[k]
+        return self._narrow(low, high, k)
+
+    def select_many(self, ks) -> list:
+        """select() for every rank in ks, in the given order."""
+        return [self.select(k) for k in ks]
+
+    def _narrow(self, low: int, high: int, k: int):
+        """introselect's loop on one bracket, recording every cut it makes."""
+        arr = self.arr
+        probe = self.probe
+        swap = probe.swap
+        partition_three_way = probe.partition_three_way
+
+        depth_limit = 2 * int(math.log2(high - low + 1))
+        depth = 0
+        while low < high:
+            depth += 1
+            probe.enter(depth)
+
+            if depth_limit == 0:
+                # MoM leaves arr[k] in its final place inside the bracket
+                mom_select(arr, low, high, k, probe=probe)
+                self._add_block(k, k + 1)
+                return arr[k]
+
+            if high - low > SAMPLE_THRESHOLD:
+                _select_sample(arr, low, high, k, probe, depth)
+                pivot_index = k
+            else:
+                pivot_index = random.randint(low, high)
+
+            swap(arr, pivot_index, high)
+            lt, gt = partition_three_way(arr, low, high)
+            # [lt, gt) holds copies of the pivot: already in final place
+            self._add_block(lt, gt)
+
+            if k < lt:
+                high = lt - 1
+            elif k >= gt:
+                low = gt
+            else:
+                return arr[k]
+            depth_limit -= 1
+
+        self._add_block(low, low + 1)
+        return arr[low]
+
+    def _add_block(self, start: int, end: int) -> None:
+        """Records that arr[start:end] is final: cuts at both ends, all equal inside."""
+        for cut in (start, end):
+            i = bisect_right(self._cuts, cut)
+            if self._cuts[i - 1] != cut:
+                self._cuts.insert(i, cut)
+        self._solved.add(start)
@@ -1,34 +1,70 @@
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
-import random
-from utils import Metrics, TrackedInt
-from introselect import introselect
+from src.utils import Probe
+from src.introselect import introselect
+from src import external_select
+from src.external_select import select_from_file
 
 # 1. Generate Random Data
 raw_data = [3,2,1,4,5,0]
 k = 3
 
 
-# 2. Wrap data in TrackedInt to count comparisons
-tracked_data = [TrackedInt(x) for x in raw_data]
+# 2. Create a Probe to count comparisons, swaps and depth
+probe = Probe()
 
-# 3. Reset Metrics
-Metrics.reset()
+# 3. Run Algorithm (the probe is injected, the data stays plain ints)
+result = introselect(raw_data[:], k, probe=probe)
 
-# 4. Run Algorithm
-result_obj = introselect(tracked_data, k)
-
-# 5. Verify correctness against Python's built-in sort
+# 4. Verify correctness against Python's built-in sort
 sorted_raw = sorted(raw_data)
 expected = sorted_raw[k]
 
-print(f"Algorithm Found: {result_obj.value}")
+print(f"Algorithm Found: {result}")
 print(f"Correct Answer:  {expected}")
-print(f"Comparisons:     {Metrics.comparisons}")
-print(f"Swaps:           {Metrics.swaps}")
+print(f"Comparisons:     {probe.comparisons}")
+print(f"Swaps:           {probe.swaps}")
+print(f"Max Depth:       {probe.max_depth}")
+
+assert result == expected
+print("SUCCESS: Introselect works.")
+
+# 5. Out-of-core selection against np.partition, with a band and chunks
+#    small enough to force several passes and narrow regions
+import numpy as np
+
+rng = np.random.default_rng(0)
+cases = {
+    "random": rng.integers(0, 10**9, 1000),
+    "duplicates": rng.integers(0, 3, 1000),
+    "sorted": np.arange(1000),
+    "reverse": np.arange(1000)[::-1],
+}
+with tempfile.TemporaryDirectory() as tmp:
+    for name, values in cases.items():
+        path = os.path.join(tmp, f"{name}.bin")
+        values.astype(np.int64).tofile(path)
+        expected = np.sort(values)
+        for k in (0, 1, len(values) // 2, len(values) - 1):
+            for band_limit, chunk_elems in ((1, 1), (3, 7), (64, 100)):
+                result = select_from_file(path, k, band_limit=band_limit,
+                                          chunk_elems=chunk_elems, seed=k)
+                assert result == expected[k], (name, k, band_limit, chunk_elems, result)
 
-assert result_obj.value == expected
-print("SUCCESS: Randomized Quickselect works.")
\ No newline at end of file
+    # A tiny sample leaves narrow regions without any stride sample
+    sample_size = external_select.SAMPLE_SIZE
+    external_select.SAMPLE_SIZE = 8
+    try:
+        for name, values in cases.items():
+            path = os.path.join(tmp, f"{name}.bin")
+            expected = np.sort(values)
+            for k in (0, len(values) // 3, len(values) - 1):
+                result = select_from_file(path, k, band_limit=2, chunk_elems=16, seed=k)
+                assert result == expected[k], (name, k, result)
+    finally:
+        external_select.SAMPLE_SIZE = sample_size
+print("SUCCESS: select_from_file matches np.partition.")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import numpy as np
+from src.utils import Probe
+
+class TrackedArray(Probe):
+    """
+    Array-backed tracked sequence for the 'Comparison Count' experiments.
+
+    Raw values live in one typed NumPy buffer (8 bytes per element, instead of
+    a TrackedInt object plus a list slot per element). The array is also its
+    own Probe: partitions run vectorized over the window and add their
+    comparisons and swaps to the counters in bulk.
+
+        arr = TrackedArray(data)
+        randomized_quickselect(arr, k, probe=arr)
+        arr.comparisons, arr.swaps, arr.max_depth
+
+    Bulk counts are what the scalar kernel would have done on the same window:
+    - partition_three_way: exact. Comparisons follow from the block sizes;
+      the exchanges of a cell with itself that the scalar loop skips are
+      found from where its two read pointers meet (_self_exchanges).
+    - partition_hoare: exact as well. Both scans only ever read cells no
+      pointer has passed yet, so where they stop follows from two vectorized
+      masks; the pairs are swapped with fancy indexing, leaving the array
+      and the returned index exactly as the scalar kernel would.
+    """
+    def __init__(self, values, dtype=None):
+        super().__init__()
+        self.data = np.array(values, dtype=dtype)
+        if self.data.ndim != 1:
+            raise ValueError("TrackedArray expects a 1-D sequence.")
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TrackedArray(self.data[index])
+        return self.data[index].item()
+
+    def __setitem__(self, index, value):
+        self.data[index] = value
+
+    def __repr__(self):
+        return f"TrackedArray({self.data!r})"
+
+    def tolist(self) -> list:
+        return self.data.tolist()
+
+    # --- Probe interface (falls back to the scalar Probe for plain lists) ---
+
+    def swap(self, arr, i: int, j: int) -> None:
+        if not isinstance(arr, TrackedArray):
+            return super().swap(arr, i, j)
+        if i != j:
+            self.swaps += 1
+            buf = arr.data
+            buf[i], buf[j] = buf[j], buf[i]
+
+    def partition_three_way(self, arr, low: int, high: int) -> tuple:
+        if not isinstance(arr, TrackedArray):
+            return super().partition_three_way(arr, low, high)
+        window = arr.data[low:high + 1]
+        pivot = window[-1]
+        smaller = window[window < pivot]
+        larger = window[window > pivot]
+        n = len(window)
+        lt = low + len(smaller)
+        gt = high + 1 - len(larger)
+
+        # Counted before the write-back below reorders the window
+        self_exchanges = _self_exchanges(window, pivot)
+        # Write back < pivot | == pivot | > pivot
+        window[:len(smaller)] = smaller
+        window[lt - low:gt - low] = pivot
+        window[gt - low:] = larger
+
+        self.comparisons += n + (n - len(smaller))
+        self.swaps += len(smaller) + len(larger) - self_exchanges
+        self.partitions += 1
+        return lt, gt
+
+    def partition_hoare(self, arr, left: int, right: int, k: int) -> int:
+        if not isinstance(arr, TrackedArray):
+            return super().partition_hoare(arr, left, right, k)
+        buf = arr.data
+        t = buf[k]
+        swaps = 0
+        if left != k:
+            swaps += 1
+            buf[left], buf[k] = buf[k], buf[left]
+        if buf[right] > t:
+            swaps += 1
+            buf[right], buf[left] = buf[left], buf[right]
+        if left >= right:
+            self.comparisons += 2
+            self.swaps += swaps
+            self.partitions += 1
+            return left
+
+        # The scans only read cells neither pointer has passed, so their stops
+        # are fixed by the interior as it is now: i stops on the next value
+        # >= t, j on the next value <= t. Round m swaps (stop_i[m], stop_j[m])
+        # until the stops cross; the first round swaps (left, right).
+        interior = buf[left + 1:right]
+        stop_i = left + 1 + np.flatnonzero(interior >= t)
+        stop_j = left + 1 + np.flatnonzero(interior <= t)[::-1]
+        paired = min(len(stop_i), len(stop_j))
+        crossed = np.flatnonzero(stop_i[:paired] >= stop_j[:paired])
+        rounds = (crossed[0] if len(crossed) else paired) + 1
+
+        # Cells the last swap wrote bound the crossing scans
+        prev_i = stop_i[rounds - 2] if rounds > 1 else left
+        prev_j = stop_j[rounds - 2] if rounds > 1 else right
+        i = min(stop_i[rounds - 1], prev_j) if rounds - 1 < len(stop_i) else prev_j
+        j = max(stop_j[rounds - 1], prev_i) if rounds - 1 < len(stop_j) else prev_i
+
+        lo = np.concatenate(([left], stop_i[:rounds - 1]))
+        hi = np.concatenate(([right], stop_j[:rounds - 1]))
+        buf[lo], buf[hi] = buf[hi], buf[lo].copy()
+        comparisons = 2 + (i - left) + (right - j)   # Scan steps telescope
+        swaps += rounds
+
+        if buf[left] == t:
+            if left != j:
+                swaps += 1
+                buf[left], buf[j] = buf[j], buf[left]
+        else:
+            j += 1
+            if right != j:
+                swaps += 1
+                buf[right], buf[j] = buf[j], buf[right]
+        self.comparisons += int(comparisons)
+        self.swaps += swaps
+        self.partitions += 1
+        return int(j)
+
+    def insertion_sort(self, arr, low: int, high: int) -> None:
+        if not isinstance(arr, TrackedArray):
+            return super().insertion_sort(arr, low, high)
+        # Groups are tiny: sort a Python copy with the counting kernel
+        group = arr.data[low:high + 1].tolist()
+        super().insertion_sort(group, 0, len(group) - 1)
+        arr.data[low:high + 1] = group
+
+def _self_exchanges(window: np.ndarray, pivot) -> int:
+    """
+    Exchanges of a cell with itself the scalar three-way loop would make.
+
+    Smaller elements are exchanged in place until the first element >= pivot
+    is read. The loop reads from the front until it meets a larger element,
+    then from the back until it meets a non-larger one, and so on; a larger
+    element is exchanged in place only if it is the very last one read.
+    """
+    n = len(window)
+    leading = int(np.argmax(window >= pivot))   # The pivot itself ends the run
+    larger = window > pivot
+    a = np.flatnonzero(larger)                  # Where front runs end
+    b = np.flatnonzero(~larger)[::-1]           # Where back runs end
+    if len(a) == 0:
+        return leading
+    r = min(len(a), len(b))
+    # Front run k reads up to a[k] unless it reaches the cells the back
+    # runs have taken (b[k-1] onwards); back run k likewise stops at a[k] + 1.
+    prev_b = np.concatenate(([n], b[:r - 1]))
+    front_meets = a[:r] >= prev_b - 1
+    back_meets = b[:r] <= a[:r] + 1
+    meets = np.flatnonzero(np.column_stack((front_meets, back_meets)).ravel())
+    if len(meets):
+        k, back = divmod(int(meets[0]), 2)
+        last_larger = b[k] != a[k] + 1 if back else a[k] == prev_b[k] - 1
+    elif r == len(a):
+        last_larger = False                     # No larger element is left to read
+    elif a[r] >= b[r - 1] - 1:
+        last_larger = a[r] == b[r - 1] - 1
+    else:
+        last_larger = True                      # The back run reads only larger ones
+    return leading + int(last_larger)
@@ -1,23 +1,27 @@
-import sys
+import operator
 
 class Metrics:
     """
-    Global singleton to track operation counts across recursive calls.
+    Global comparison counter bumped by TrackedInt.
+
+    Only wrapped data pays for it. The selectors themselves never touch it;
+    to count inside a run, pass a Probe instead (see below).
     """
     comparisons = 0
-    swaps = 0
 
     @classmethod
     def reset(cls):
         """Resets all metrics to zero."""
         cls.comparisons = 0
-        cls.swaps = 0
 
 class TrackedInt:
     """
     A wrapper around an integer to automatically count comparisons.
-    Use this for the 'Comparison Count' experiments.
+    Useful for custom element types; the experiments use a Probe instead.
+    __slots__ drops the per-instance __dict__ (~3x less memory per element).
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
@@ -40,28 +44,26 @@ class TrackedInt:
     def __eq__(self, other):
         Metrics.comparisons += 1
         return self.value == other.value
-    
+
     def __repr__(self):
         return str(self.value)
 
 def swap(arr: list, i: int, j: int) -> None:
     """
     Swaps two elements in a list in-place.
-    
+
     Args:
         arr (list): The list containing elements.
         i (int): Index of the first element.
         j (int): Index of the second element.
     """
-    if i != j:
-        Metrics.swaps += 1
-        arr[i], arr[j] = arr[j], arr[i]
+    arr[i], arr[j] = arr[j], arr[i]
 
 def partition_lomuto(arr: list, low: int, high: int) -> int:
     """
     Partitions the array around the last element (arr[high]).
     Elements smaller than pivot go left; larger go right.
-    
+
     Args:
         arr (list): The list to partition.
         low (int): The starting index.
@@ -72,12 +74,370 @@ def partition_lomuto(arr: list, low: int, high: int) -> int:
     """
     pivot = arr[high]
     i = low
-    
+
     for j in range(low, high):
         # If current element is smaller than or equal to pivot
         if arr[j] < pivot: # This triggers Metrics.comparisons if using TrackedInt
-            swap(arr, i, j)
+            arr[i], arr[j] = arr[j], arr[i]
+            i += 1
+
+    arr[i], arr[high] = arr[high], arr[i]
+    return i
+
+
+def partition_three_way(arr: list, low: int, high: int) -> tuple:
+    """
+    Three-way (Dutch National Flag) partition around the last element (arr[high]).
+    Elements smaller than pivot go left, larger go right, and every element
+    EQUAL to the pivot ends up in one contiguous middle block.
+
+    Unlike Lomuto, duplicates of the pivot are settled in a single pass, so
+    inputs with few distinct values no longer degrade to O(N^2).
+    Only '<' is used, so TrackedInts count every comparison.
+
+    Args:
+        arr (list): The list to partition.
+        low (int): The starting index.
+        high (int): The ending index (pivot).
+
+    Returns:
+        tuple: (lt, gt) such that
+               arr[low:lt] < pivot, arr[lt:gt] == pivot, arr[gt:high+1] > pivot.
+    """
+    pivot = arr[high]
+    lt = low       # arr[low:lt]   < pivot
+    i = low        # arr[lt:i]    == pivot, arr[i:gt] not yet seen
+    gt = high + 1  # arr[gt:high+1] > pivot
+
+    while i < gt:
+        x = arr[i]
+        if x < pivot:
+            arr[i] = arr[lt]
+            arr[lt] = x
+            lt += 1
+            i += 1
+        elif pivot < x:
+            gt -= 1
+            arr[i] = arr[gt]
+            arr[gt] = x
+        else:
+            i += 1
+
+    return lt, gt
+
+def partition_hoare(arr: list, left: int, right: int, k: int) -> int:
+    """
+    Floyd-Rivest (Algorithm 489) partition of arr[left...right] around the
+    value currently stored at arr[k].
+
+    Args:
+        arr (list): The list to partition.
+        left (int): The starting index.
+        right (int): The ending index.
+        k (int): Index of the pivot value.
+
+    Returns:
+        int: j, the final index of the pivot value:
+             arr[left:j] <= arr[j] <= arr[j+1:right+1].
+    """
+    t = arr[k]
+    i = left
+    j = right
+
+    # Swap pivots to ends to prepare for partition
+    arr[left], arr[k] = arr[k], arr[left]
+    if arr[right] > t:
+        arr[right], arr[left] = arr[left], arr[right]
+
+    # Standard Hoare-like partition logic specific to FR
+    while i < j:
+        # Move i right and j left
+        arr[i], arr[j] = arr[j], arr[i]
+        i += 1
+        j -= 1
+        while arr[i] < t:
             i += 1
-            
-    swap(arr, i, high)
-    return i
\ No newline at end of file
+        while arr[j] > t:
+            j -= 1
+
+    # Adjust pivots after partition
+    if arr[left] == t:
+        arr[left], arr[j] = arr[j], arr[left]
+    else:
+        j += 1
+        arr[right], arr[j] = arr[j], arr[right]
+    return j
+
+def insertion_sort(arr: list, low: int, high: int) -> None:
+    """
+    Sorts the small range arr[low...high] in-place (used for groups of 5).
+    """
+    for i in range(low + 1, high + 1):
+        key_val = arr[i]
+        j = i - 1
+        while j >= low and key_val < arr[j]:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key_val
+
+class _Uninstrumented:
+    """
+    The default 'probe' every selector falls back to: the plain kernels above,
+    with nothing counted. Selectors look these up once per call, so the
+    uninstrumented fast path costs the same as calling the functions directly.
+    """
+    swap = staticmethod(swap)
+    less = staticmethod(operator.lt)
+    partition_three_way = staticmethod(partition_three_way)
+    partition_hoare = staticmethod(partition_hoare)
+    insertion_sort = staticmethod(insertion_sort)
+
+    @staticmethod
+    def enter(depth: int) -> None:
+        pass
+
+UNINSTRUMENTED = _Uninstrumented()
+
+class Probe:
+    """
+    Operation counters for ONE instrumented run.
+
+    Pass an instance as `probe=` to any selector. The selector then routes its
+    swaps, comparisons, partitions and depth changes through these methods.
+    Nothing is global, so several runs can be measured side by side:
+
+        probe = Probe()
+        introselect(data, k, probe=probe)
+        probe.comparisons, probe.swaps, probe.max_depth
+
+    Counts are kept in plain ints and added in bulk per kernel call. The
+    three-way partition derives its comparisons from the block sizes it
+    returns, so an instrumented run costs about the same as a plain one and
+    can be timed. Swaps count only exchanges of two different cells, in
+    every kernel, so three-way and Hoare selectors are measured alike.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Resets all metrics to zero."""
+        self.comparisons = 0
+        self.swaps = 0
+        self.partitions = 0
+        # Depth the textbook recursive formulation would reach
+        self.max_depth = 0
+
+    def __repr__(self):
+        return (f"Probe(comparisons={self.comparisons}, swaps={self.swaps}, "
+                f"partitions={self.partitions}, max_depth={self.max_depth})")
+
+    def enter(self, depth: int) -> None:
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def swap(self, arr: list, i: int, j: int) -> None:
+        if i != j:
+            self.swaps += 1
+            arr[i], arr[j] = arr[j], arr[i]
+
+    def less(self, a, b) -> bool:
+        self.comparisons += 1
+        return a < b
+
+    def partition_three_way(self, arr: list, low: int, high: int) -> tuple:
+        # The loop of partition_three_way, counting an exchange only when
+        # it moves two different cells (as swap() does)
+        pivot = arr[high]
+        lt = low
+        i = low
+        gt = high + 1
+        swaps = 0
+        while i < gt:
+            x = arr[i]
+            if x < pivot:
+                if i != lt:
+                    swaps += 1
+                    arr[i] = arr[lt]
+                    arr[lt] = x
+                lt += 1
+                i += 1
+            elif pivot < x:
+                gt -= 1
+                if i != gt:
+                    swaps += 1
+                    arr[i] = arr[gt]
+                    arr[gt] = x
+            else:
+                i += 1
+        n = high - low + 1
+        # Every element is tested with '<' once; all but the smaller ones
+        # are tested a second time.
+        self.comparisons += n + (n - (lt - low))
+        self.swaps += swaps
+        self.partitions += 1
+        return lt, gt
+
+    def partition_hoare(self, arr: list, left: int, right: int, k: int) -> int:
+        comparisons = 2
+        swaps = 0
+        t = arr[k]
+        i = left
+        j = right
+        if left != k:
+            swaps += 1
+            arr[left], arr[k] = arr[k], arr[left]
+        if arr[right] > t:
+            swaps += 1
+            arr[right], arr[left] = arr[left], arr[right]
+        while i < j:
+            swaps += 1
+            arr[i], arr[j] = arr[j], arr[i]
+            i += 1
+            j -= 1
+            start_i, start_j = i, j
+            while arr[i] < t:
+                i += 1
+            while arr[j] > t:
+                j -= 1
+            # Each scan makes one comparison per step plus the failing one
+            comparisons += (i - start_i) + (start_j - j) + 2
+        if arr[left] == t:
+            if left != j:
+                swaps += 1
+                arr[left], arr[j] = arr[j], arr[left]
+        else:
+            j += 1
+            if right != j:
+                swaps += 1
+                arr[right], arr[j] = arr[j], arr[right]
+        self.comparisons += comparisons
+        self.swaps += swaps
+        self.partitions += 1
+        return j
+
+    def insertion_sort(self, arr: list, low: int, high: int) -> None:
+        comparisons = 0
+        shifts = 0
+        for i in range(low + 1, high + 1):
+            key_val = arr[i]
+            j = i - 1
+            while j >= low:
+                comparisons += 1
+                if not key_val < arr[j]:
+                    break
+                arr[j + 1] = arr[j]
+                j -= 1
+            shifts += i - 1 - j
+            arr[j + 1] = key_val
+        # A shift is an adjacent exchange, so it is counted as a swap
+        self.comparisons += comparisons
+        self.swaps += shifts
+
+class KeyedProbe(Probe):
+    """
+    A Probe whose kernels move INDICES and compare keys[index].
+
+    Any selector run on an index list with this probe permutes only the
+    index list (never the data) and returns the index of the k-th element:
+
+        idx = list(range(len(keys)))
+        i = introselect(idx, k, probe=KeyedProbe(keys))   # keys[i] is k-th
+
+    The kernels are the ones above with keys[...] looked up at each
+    comparison, and they count exactly like Probe.
+    """
+    def __init__(self, keys):
+        super().__init__()
+        self.keys = keys
+
+    def less(self, a, b) -> bool:
+        self.comparisons += 1
+        return self.keys[a] < self.keys[b]
+
+    def partition_three_way(self, arr: list, low: int, high: int) -> tuple:
+        keys = self.keys
+        pivot = keys[arr[high]]
+        lt = low
+        i = low
+        gt = high + 1
+        swaps = 0
+        while i < gt:
+            x = arr[i]
+            key = keys[x]
+            if key < pivot:
+                if i != lt:
+                    swaps += 1
+                    arr[i] = arr[lt]
+                    arr[lt] = x
+                lt += 1
+                i += 1
+            elif pivot < key:
+                gt -= 1
+                if i != gt:
+                    swaps += 1
+                    arr[i] = arr[gt]
+                    arr[gt] = x
+            else:
+                i += 1
+        n = high - low + 1
+        self.comparisons += n + (n - (lt - low))
+        self.swaps += swaps
+        self.partitions += 1
+        return lt, gt
+
+    def partition_hoare(self, arr: list, left: int, right: int, k: int) -> int:
+        keys = self.keys
+        comparisons = 2
+        swaps = 0
+        t = keys[arr[k]]
+        i = left
+        j = right
+        if left != k:
+            swaps += 1
+            arr[left], arr[k] = arr[k], arr[left]
+        if keys[arr[right]] > t:
+            swaps += 1
+            arr[right], arr[left] = arr[left], arr[right]
+        while i < j:
+            swaps += 1
+            arr[i], arr[j] = arr[j], arr[i]
+            i += 1
+            j -= 1
+            start_i, start_j = i, j
+            while keys[arr[i]] < t:
+                i += 1
+            while keys[arr[j]] > t:
+                j -= 1
+            comparisons += (i - start_i) + (start_j - j) + 2
+        if keys[arr[left]] == t:
+            if left != j:
+                swaps += 1
+                arr[left], arr[j] = arr[j], arr[left]
+        else:
+            j += 1
+            if right != j:
+                swaps += 1
+                arr[right], arr[j] = arr[j], arr[right]
+        self.comparisons += comparisons
+        self.swaps += swaps
+        self.partitions += 1
+        return j
+
+    def insertion_sort(self, arr: list, low: int, high: int) -> None:
+        keys = self.keys
+        comparisons = 0
+        shifts = 0
+        for i in range(low + 1, high + 1):
+            x = arr[i]
+            key = keys[x]
+            j = i - 1
+            while j >= low:
+                comparisons += 1
+                if not key < keys[arr[j]]:
+                    break
+                arr[j + 1] = arr[j]
+                j -= 1
+            shifts += i - 1 - j
+            arr[j + 1] = x
+        self.comparisons += comparisons
+        self.swaps += shifts
\ No newline at end of file